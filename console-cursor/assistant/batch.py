@@ -0,0 +1,105 @@
+"""
+Batch mode: run many commands against a single index and report each result
+as a JSON line.
+"""
+
+import json
+import time
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Iterable, List, TextIO, Tuple
+
+from .tools.output_capture import ThreadLocalStdout, strip_ansi
+
+# Commands that only read the index, so they can run side by side. Anything
+# else (run, edit, ...) waits for earlier commands and runs on its own.
+CONCURRENT_PREFIXES = (
+    "find ",
+    "analyze ",
+    "fix ",
+    "goto ",
+    "refs ",
+    "importers ",
+    "search ",
+    "dependents ",
+)
+
+
+def read_commands(stream: TextIO) -> List[Tuple[int, str]]:
+    """(line number, command) pairs, skipping blank lines and # comments"""
+    commands = []
+    for number, line in enumerate(stream, 1):
+        command = line.strip()
+        if command and not command.startswith("#"):
+            commands.append((number, command))
+    return commands
+
+
+class BatchRunner:
+    """Runs commands through a CodeAssistant and writes JSON lines to ``out``.
+
+    Consecutive read-only commands are run concurrently on a thread pool;
+    every other command is a barrier that runs alone, after everything
+    before it has finished. Results are written as they complete, tagged
+    with the line number of their command.
+    """
+
+    def __init__(self, assistant, stdout: ThreadLocalStdout, out: TextIO, jobs: int):
+        self.assistant = assistant
+        self.stdout = stdout
+        self.out = out
+        self.jobs = max(1, jobs)
+        self.failures = 0
+        self._out_lock = threading.Lock()
+
+    def run(self, commands: Iterable[Tuple[int, str]]) -> int:
+        """Run all commands and return how many of them failed"""
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            pending = []
+            for number, command in commands:
+                if command.startswith(CONCURRENT_PREFIXES):
+                    pending.append(
+                        pool.submit(self._execute, number, command, exclusive=False)
+                    )
+                    continue
+                wait(pending)
+                pending = []
+                self._execute(number, command, exclusive=True)
+            wait(pending)
+        return self.failures
+
+    def _execute(self, number: int, command: str, exclusive: bool):
+        lock = self.assistant.index_lock
+        guard = lock.write() if exclusive else lock.read()
+        started = time.perf_counter()
+        error = None
+        with guard, self.stdout.capture() as buffer:
+            try:
+                self.assistant.process_request(command)
+            except Exception as e:
+                error = str(e)
+                print(traceback.format_exc())
+        output = strip_ansi(buffer.getvalue())
+
+        # Tools report problems by printing ❌ lines rather than raising
+        ok = error is None and not any(
+            line.startswith("❌") for line in output.splitlines()
+        )
+        result = {
+            "line": number,
+            "command": command,
+            "ok": ok,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            "output": output,
+        }
+        if error is not None:
+            result["error"] = error
+        self._emit(result)
+
+    def _emit(self, result: dict):
+        with self._out_lock:
+            if not result["ok"]:
+                self.failures += 1
+            self.out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            self.out.flush()
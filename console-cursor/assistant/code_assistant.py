@@ -2,31 +2,115 @@
 Core CodeAssistant class that manages the interaction with the user and coordinates tools.
 """
 
+import io
 import os
+import sys
+import atexit
+import pstats
+import cProfile
 import traceback
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, TextIO
 
-from .tools.indexer import ProjectIndexer
+from .tools.indexer import ProjectIndexer, FIND_PAGE_SIZE
 from .tools.analyzer import ProjectAnalyzer
 from .tools.executor import CommandExecutor
 from .tools.bug_finder import BugFinder
 from .tools.file_editor import FileEditor
+from .tools.replacer import ProjectReplacer
+from .tools.watcher import ProjectWatcher
+from .tools.output_capture import redirect_stdout_per_thread
+from .tools.rw_lock import ReadWriteLock
+from .tools.analysis_cache import AnalysisStore, analysis_cache
+from .tools.index_cache import default_cache_dir
+from .tools.tracing import tracer
+from .tools.semantic_index import SemanticIndex, load_embedder
 from .models.file_info import FileInfo
 
+# Functions listed by `profile <command>`
+PROFILE_TOP_FUNCTIONS = 25
+
 
 class CodeAssistant:
-    def __init__(self, target_dir: str):
+    def __init__(
+        self,
+        target_dir: str,
+        use_cache: bool = True,
+        workers: int = 1,
+        watch: bool = False,
+        lazy_content: bool = False,
+        content_budget: int = 64 * 1024 * 1024,
+        max_file_size: int = 2 * 1024 * 1024,
+        run_timeout: Optional[float] = None,
+        warm_run: bool = False,
+        interactive: bool = True,
+        diff_algorithm: str = "myers",
+        trace_path: Optional[str] = None,
+        embedder: str = "hashing",
+        semantic_mmap: bool = False,
+    ):
         self.target_dir = os.path.abspath(target_dir)
         self.project_index = {}
         self.project_summary = ""
         self.history = []
+        # Guards project_index: commands read it, the watcher and edits write it
+        self.index_lock = ReadWriteLock()
+        self.watch_on_start = watch
+        # False when driven by batch input, so tools never wait on input()
+        self.interactive = interactive
+
+        # Chrome trace of the whole session, written on exit
+        self.trace_path = trace_path
+        if trace_path:
+            tracer.start_timeline()
+            atexit.register(self.write_trace)
+
+        # Analysis results are shared on disk between runs and projects
+        if use_cache:
+            try:
+                analysis_cache.attach_store(AnalysisStore())
+                atexit.register(analysis_cache.flush)
+            except Exception as e:
+                print(f"⚠️ Analysis cache unavailable: {str(e)}")
 
         # Initialize tools
-        self.indexer = ProjectIndexer(self.target_dir)
+        self.indexer = ProjectIndexer(
+            self.target_dir,
+            use_cache=use_cache,
+            workers=workers,
+            lazy_content=lazy_content,
+            content_budget=content_budget,
+            max_file_size=max_file_size,
+            semantic_index=SemanticIndex(
+                self.target_dir, load_embedder(embedder), mmap=semantic_mmap
+            ),
+        )
+        # Edits since the last search are stored for the next session
+        atexit.register(self.indexer.semantic_index.save_if_changed)
         self.analyzer = ProjectAnalyzer(self.target_dir)
-        self.executor = CommandExecutor(self.target_dir)
-        self.bug_finder = BugFinder(self.target_dir)
-        self.file_editor = FileEditor(self.target_dir)
+        self.executor = CommandExecutor(
+            self.target_dir, default_timeout=run_timeout, warm=warm_run
+        )
+        self.bug_finder = BugFinder(
+            self.target_dir, interactive=interactive, indexer=self.indexer
+        )
+        self.file_editor = FileEditor(
+            self.target_dir,
+            indexer=self.indexer,
+            interactive=interactive,
+            diff_algorithm=diff_algorithm,
+        )
+        self.replacer = ProjectReplacer(
+            self.target_dir,
+            self.indexer,
+            self.file_editor,
+            workers=self.indexer.workers,
+            interactive=interactive,
+        )
+        self.watcher = ProjectWatcher(
+            self.target_dir,
+            self.apply_file_changes,
+            ignore_rules=self.indexer.ignore_rules,
+        )
 
     def run(self):
         """Main loop for the code assistant"""
@@ -37,6 +121,9 @@ class CodeAssistant:
         self.project_index = self.indexer.index_project()
         self.project_summary = self.analyzer.analyze_project(self.project_index)
 
+        if self.watch_on_start:
+            self.start_watching()
+
         while True:
             try:
                 user_input = input(
@@ -47,7 +134,8 @@ class CodeAssistant:
                     print("Goodbye! 👋")
                     break
 
-                self.process_request(user_input)
+                with self.index_lock.write():
+                    self.process_request(user_input)
 
             except KeyboardInterrupt:
                 print("\nGoodbye! 👋")
@@ -56,17 +144,90 @@ class CodeAssistant:
                 print(f"❌ Error: {str(e)}")
                 print(traceback.format_exc())
 
+        self.watcher.stop()
+        self.executor.shutdown()
+
+    def prepare_index(self):
+        """Index the project and build the lazy structures up front.
+
+        Afterwards commands only read shared state, so they can run
+        concurrently under the read side of index_lock.
+        """
+        self.project_index = self.indexer.index_project()
+        if not self.indexer.search_index.ready:
+            self.indexer.search_index.build(self.project_index)
+        self.indexer.get_symbols(self.project_index)
+
+    def run_batch(self, stream: TextIO, jobs: int = 4) -> int:
+        """Run commands from a stream against one index, printing JSON lines.
+
+        Progress and messages go to stderr so stdout only carries results.
+        Returns the number of failed commands.
+        """
+        from .batch import BatchRunner, read_commands
+
+        out = sys.stdout
+        with redirect_stdout_per_thread(sys.stderr) as stdout:
+            self.prepare_index()
+            runner = BatchRunner(self, stdout, out, jobs)
+            try:
+                failures = runner.run(read_commands(stream))
+            finally:
+                self.executor.shutdown()
+
+        print(f"✅ Batch finished, {failures} failed", file=sys.stderr)
+        return failures
+
+    def serve(self, socket_path: Optional[str] = None):
+        """Keep the index resident and answer clients over a Unix socket"""
+        from .daemon import AssistantDaemon
+        from .rpc import default_socket_path
+
+        socket_path = socket_path or default_socket_path(self.target_dir)
+        with redirect_stdout_per_thread(sys.stdout) as stdout:
+            print(f"🤖 Code Assistant daemon for: {self.target_dir}")
+            self.prepare_index()
+            # Clients expect answers about the current state of the files
+            self.start_watching()
+            try:
+                AssistantDaemon(self, socket_path, stdout).serve_forever()
+            except KeyboardInterrupt:
+                print("\nGoodbye! 👋")
+            finally:
+                self.watcher.stop()
+                self.executor.shutdown()
+
     def process_request(self, request: str):
         """Process the user request and call appropriate tools"""
         self.history.append({"role": "user", "content": request})
+        # Only what this command changes is re-analyzed afterwards, not files
+        # the watcher picked up in between
+        self.indexer.take_changed_paths()
+        with tracer.span("command", request=request):
+            self._dispatch(request)
+            self.reanalyze_dependents(self.indexer.take_changed_paths())
+
+        # Keep what this command computed even if the process is killed later
+        analysis_cache.flush()
 
-        # Simple command parsing
+    def _dispatch(self, request: str):
+        """Simple command parsing"""
         if request.startswith("find "):
             query = request[5:]
             self.indexer.find_in_codebase(self.project_index, query)
+        elif request.lower() == "more" or request.startswith("more "):
+            count = request[5:].strip()
+            if count and not count.isdigit():
+                print("❌ Usage: more [count]")
+            else:
+                self.indexer.show_more(int(count) if count else FIND_PAGE_SIZE)
+        elif request.startswith("search "):
+            self.indexer.semantic_search(self.project_index, request[7:].strip())
         elif request.startswith("fix "):
             file_path = request[4:]
-            self.bug_finder.analyze_and_fix_bugs(file_path)
+            self.bug_finder.analyze_and_fix_bugs(file_path, self.project_index)
+        elif request.startswith("run& "):
+            self.executor.start_background(request[5:])
         elif request.startswith("run "):
             command = request[4:]
             self.executor.execute_code(command)
@@ -79,9 +240,46 @@ class CodeAssistant:
                 )
             else:
                 print("❌ Usage: edit <file_path> <instructions>")
+        elif request.startswith("replace "):
+            self.replacer.replace(request[8:], self.project_index)
         elif request.startswith("analyze "):
             file_path = request[8:]
             self.analyzer.analyze_file(file_path, self.project_index)
+        elif request.startswith("goto "):
+            symbols = self.indexer.get_symbols(self.project_index)
+            symbols.show_definitions(request[5:].strip())
+        elif request.startswith("refs "):
+            symbols = self.indexer.get_symbols(self.project_index)
+            symbols.show_references(request[5:].strip())
+        elif request.startswith("importers "):
+            symbols = self.indexer.get_symbols(self.project_index)
+            symbols.show_importers(request[10:].strip())
+        elif request.startswith("dependents "):
+            graph = self.indexer.get_dependency_graph(self.project_index)
+            graph.show_dependents(request[11:].strip())
+        elif request.lower() == "jobs":
+            self.executor.show_jobs()
+        elif request.startswith("attach ") or request.startswith("kill "):
+            action, job_id = request.split(" ", 1)
+            if job_id.strip().isdigit():
+                getattr(self.executor, action)(int(job_id))
+            else:
+                print(f"❌ Usage: {action} <job_id>")
+        elif request.lower() == "rules":
+            print(self.bug_finder.rules.timing_report())
+        elif request.lower() == "stats":
+            print(analysis_cache.stats_report())
+        elif request.lower() == "profile":
+            print(tracer.report())
+        elif request.lower() == "profile reset":
+            tracer.reset()
+            print("✅ Profile cleared")
+        elif request.startswith("profile "):
+            self.profile_command(request[8:].strip())
+        elif request.lower() == "watch":
+            self.start_watching()
+        elif request.lower() == "unwatch":
+            self.stop_watching()
         elif request.lower() == "help":
             self.show_help()
         else:
@@ -103,22 +301,133 @@ class CodeAssistant:
                 print("For specific actions, try commands like:")
                 self.show_help()
 
+    def reanalyze_dependents(self, changed: List[str]):
+        """Re-check changed files and every file importing them, in order"""
+        if not changed:
+            return
+        graph = self.indexer.get_dependency_graph(self.project_index)
+        order = [
+            path
+            for path in graph.invalidation_order(changed)
+            if path in self.project_index
+        ]
+        dependents = [path for path in order if path not in changed]
+        edited = [path for path in changed if path in self.project_index]
+        if not dependents and not any(
+            self.project_index[path].language == "python" for path in edited
+        ):
+            return
+        print(
+            f"\n🔁 Re-analyzing {len(edited)} changed and {len(dependents)} "
+            f"dependent files:"
+        )
+        print(f"  {' -> '.join(order)}")
+        self.bug_finder.reanalyze(self.project_index, order)
+
+    def profile_command(self, request: str):
+        """Run one command under cProfile and show where its time went"""
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Another profiler is active, e.g. a concurrent profile command
+            print(f"❌ Could not start the profiler: {str(e)}")
+            return
+        try:
+            self._dispatch(request)
+        finally:
+            profiler.disable()
+
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        print(f"\n📊 Profile of '{request}':")
+        print(stream.getvalue().rstrip())
+
+        path = os.path.join(default_cache_dir(), "last-command.prof")
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            profiler.dump_stats(path)
+            print(f"Full profile saved to {path} (open with `python -m pstats`)")
+        except OSError as e:
+            print(f"⚠️ Could not save profile: {str(e)}")
+
+    def write_trace(self):
+        """Write the session timeline to trace_path"""
+        try:
+            count = tracer.write_trace(self.trace_path)
+        except OSError as e:
+            print(f"❌ Error writing trace: {str(e)}", file=sys.stderr)
+            return
+        # stderr, since batch mode keeps stdout for results
+        print(
+            f"📊 Trace with {count} events written to {self.trace_path}",
+            file=sys.stderr,
+        )
+
     def show_help(self):
         """Display available commands"""
         print("\n📚 Available commands:")
         print("  find <query>              - Search for code or files in the project")
+        print("  find /<regex>/            - Search with a regular expression")
+        print("  more [count]              - Show the next matches of the last search")
+        print("  search <description>      - Find functions and classes by meaning")
         print("  fix <file_path>           - Analyze and fix bugs in a file")
         print(
             "  run <command>             - Execute a command in the project directory"
         )
+        print("  run& <command>            - Execute a command as a background job")
+        print("  jobs                      - List background jobs")
+        print("  attach <job_id>           - Follow a job's output (Ctrl-C detaches)")
+        print("  kill <job_id>             - Stop a running job")
         print("  edit <file_path> <instr>  - Edit a file based on instructions")
+        print("  replace /<regex>/ <text>  - Replace regex matches in all files")
+        print("  replace <name> <new_name> - Rename an identifier in all Python files")
         print("  analyze <file_path>       - Analyze a specific file")
+        print("  goto <symbol>             - Show where a symbol is defined")
+        print("  refs <symbol>             - Show where a symbol is referenced")
+        print("  importers <module>        - Show which files import a module")
+        print("  dependents <file_path>    - Show files re-checked when a file changes")
+        print("  rules                     - Show time spent per anti-pattern rule")
+        print("  stats                     - Show analysis cache hit rates")
+        print("  profile                   - Show time spent per phase and counters")
+        print("  profile <command>         - Run a command under cProfile")
+        print("  watch / unwatch           - Keep the index in sync with disk changes")
         print("  help                      - Show this help message")
         print("  exit                      - Exit the assistant")
         print("\nYou can also ask general questions about the codebase.")
 
+    def start_watching(self):
+        """Keep project_index updated as files change on disk"""
+        if self.watcher.running:
+            print("👀 Already watching for file changes")
+            return
+        self.watcher.start()
+        print(f"👀 Watching for file changes ({self.watcher.backend_name})")
+
+    def stop_watching(self):
+        """Stop the background file watcher"""
+        if not self.watcher.running:
+            print("Not watching for file changes")
+            return
+        self.watcher.stop()
+        print("Stopped watching for file changes")
+
+    def apply_file_changes(self, rel_paths):
+        """Apply a batch of file system changes to the index"""
+        with self.index_lock.write():
+            updated, removed = self.indexer.refresh_paths(
+                self.project_index, rel_paths
+            )
+        if updated or removed:
+            print(f"\n🔄 Index updated: {updated} changed, {removed} removed")
+
     def handle_file_creation(self, request: str):
         """Handle requests to create new files"""
+        if not self.interactive:
+            print("❌ Creating files is not available in batch mode")
+            return
+
         print("To create a new file, please specify:")
         file_path = input("File path (relative to project): ")
 
@@ -129,12 +438,18 @@ class CodeAssistant:
         full_path = os.path.join(self.target_dir, file_path)
 
         # Check if file already exists
+        old_content = None
         if os.path.exists(full_path):
             print(f"⚠️ File already exists: {file_path}")
             overwrite = input("Overwrite? (yes/no): ")
             if overwrite.lower() not in ["yes", "y"]:
                 print("File creation cancelled")
                 return
+            try:
+                with open(full_path, "r", encoding="utf-8") as f:
+                    old_content = f.read()
+            except (OSError, UnicodeDecodeError):
+                pass
 
         # Create directories if needed
         os.makedirs(os.path.dirname(full_path), exist_ok=True)
@@ -154,6 +469,8 @@ class CodeAssistant:
             with open(full_path, "w", encoding="utf-8") as f:
                 f.write(content)
             print(f"✅ File created: {file_path}")
+            if old_content is not None:
+                self.file_editor.show_changes(old_content, content)
 
             # Update the index
             _, ext = os.path.splitext(file_path)
@@ -161,11 +478,9 @@ class CodeAssistant:
 
             file_info = FileInfo(path=file_path, content=content, language=language)
 
-            # Extract code structure for Python files
-            if language == "python":
-                self.indexer.extract_python_structure(file_info)
+            self.indexer.extract_structure(file_info)
 
-            self.project_index[file_path] = file_info
+            self.indexer.add_to_index(self.project_index, file_info)
 
         except Exception as e:
             print(f"❌ Error creating file: {str(e)}")
@@ -0,0 +1,220 @@
+"""
+Daemon mode: keep the project index resident and serve it to local clients
+over a Unix socket.
+"""
+
+import os
+import re
+import json
+import signal
+import inspect
+import socket
+import itertools
+import threading
+import traceback
+import socketserver
+from typing import Any, Callable, Dict, Optional
+
+from .rpc import (
+    INVALID_PARAMS,
+    INVALID_REQUEST,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    SERVER_ERROR,
+    RPCError,
+)
+from .tools.output_capture import ThreadLocalStdout, strip_ansi
+
+# Matches returned by find when the client does not ask for a limit
+DEFAULT_FIND_LIMIT = 100
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class AssistantDaemon:
+    """Serves find/analyze/fix/structure requests from one shared index.
+
+    Every request runs under the read side of the assistant's index lock,
+    so any number of clients are served concurrently while the file watcher
+    applies changes under the write side.
+    """
+
+    def __init__(self, assistant, socket_path: str, stdout: ThreadLocalStdout):
+        self.assistant = assistant
+        self.socket_path = socket_path
+        self.stdout = stdout
+        self.methods: Dict[str, Callable[..., Any]] = {
+            "ping": self.ping,
+            "find": self.find,
+            "analyze": self.analyze,
+            "fix": self.fix,
+            "structure": self.structure,
+            "shutdown": self.shutdown,
+        }
+        self._server: Optional[_Server] = None
+
+    def serve_forever(self):
+        """Listen on the socket until shutdown is requested"""
+        self._claim_socket()
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    response = daemon.handle_line(line)
+                    if response is not None:
+                        data = json.dumps(response).encode("utf-8")
+                        self.wfile.write(data + b"\n")
+                        self.wfile.flush()
+
+        self._server = _Server(self.socket_path, Handler)
+        os.chmod(self.socket_path, 0o600)
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: self.shutdown())
+        print(f"🛰️ Daemon listening on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            self._server = None
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+    def _claim_socket(self):
+        """Remove a stale socket, refusing to replace a live daemon"""
+        if not os.path.exists(self.socket_path):
+            os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)
+        else:
+            raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+        finally:
+            probe.close()
+
+    def handle_line(self, line: bytes) -> Optional[dict]:
+        """Decode one request, dispatch it and build the response"""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return self._error(None, PARSE_ERROR, "Parse error")
+        if not isinstance(request, dict) or not isinstance(
+            request.get("method"), str
+        ):
+            return self._error(None, INVALID_REQUEST, "Invalid request")
+
+        request_id = request.get("id")
+        method = self.methods.get(request["method"])
+        if method is None:
+            return self._error(
+                request_id, METHOD_NOT_FOUND, f"Unknown method: {request['method']}"
+            )
+        params = request.get("params") or {}
+        if not isinstance(params, dict):
+            return self._error(request_id, INVALID_PARAMS, "params must be an object")
+
+        try:
+            inspect.signature(method).bind(**params)
+        except TypeError as e:
+            return self._error(request_id, INVALID_PARAMS, str(e))
+
+        try:
+            with self.assistant.index_lock.read():
+                result = method(**params)
+        except RPCError as e:
+            return self._error(request_id, e.code, e.message)
+        except Exception as e:
+            traceback.print_exc()
+            return self._error(request_id, SERVER_ERROR, str(e))
+
+        # Requests without an id are notifications and get no response
+        if "id" not in request:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def _error(self, request_id, code: int, message: str) -> dict:
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "error": {"code": code, "message": message},
+        }
+
+    def _captured(self, action: Callable[[], None]) -> Dict[str, Any]:
+        """Run a printing tool and return what it printed"""
+        with self.stdout.capture() as buffer:
+            action()
+        output = strip_ansi(buffer.getvalue())
+        ok = not any(line.startswith("❌") for line in output.splitlines())
+        return {"ok": ok, "output": output}
+
+    # --- methods ------------------------------------------------------------
+
+    def ping(self) -> Dict[str, Any]:
+        return {"target_dir": self.assistant.target_dir}
+
+    def find(self, query: str, limit: int = DEFAULT_FIND_LIMIT) -> Dict[str, Any]:
+        """Matches as {path, line, text}; /pattern/ queries are regexes"""
+        if isinstance(limit, bool) or not isinstance(limit, int) or limit < 1:
+            raise RPCError(INVALID_PARAMS, "limit must be a positive integer")
+        search_index = self.assistant.indexer.search_index
+        project_index = self.assistant.project_index
+        if len(query) > 2 and query.startswith("/") and query.endswith("/"):
+            matches = search_index.search_regex(project_index, query[1:-1])
+        else:
+            matches = search_index.search(project_index, query)
+
+        try:
+            results = [
+                {"path": path, "line": line, "text": text}
+                for path, line, text in itertools.islice(matches, limit + 1)
+            ]
+        except re.error as e:
+            raise RPCError(INVALID_PARAMS, f"Invalid regular expression: {e}")
+        return {"matches": results[:limit], "truncated": len(results) > limit}
+
+    def analyze(self, path: str) -> Dict[str, Any]:
+        assistant = self.assistant
+        return self._captured(
+            lambda: assistant.analyzer.analyze_file(path, assistant.project_index)
+        )
+
+    def fix(self, path: str) -> Dict[str, Any]:
+        assistant = self.assistant
+        return self._captured(
+            lambda: assistant.bug_finder.analyze_and_fix_bugs(
+                path, assistant.project_index
+            )
+        )
+
+    def structure(self, path: Optional[str] = None) -> Dict[str, Any]:
+        """Functions, classes and imports of a file, or the project overview"""
+        assistant = self.assistant
+        if path is None:
+            return self._captured(
+                lambda: assistant.analyzer.show_project_structure(
+                    assistant.project_index
+                )
+            )
+
+        file_info = assistant.project_index.get(os.path.normpath(path))
+        if file_info is None:
+            raise RPCError(INVALID_PARAMS, f"File not in the index: {path}")
+        return {
+            "path": file_info.path,
+            "language": file_info.language,
+            "imports": list(file_info.imports),
+            "functions": [function.to_dict() for function in file_info.functions],
+            "classes": [cls.to_dict() for cls in file_info.classes],
+        }
+
+    def shutdown(self) -> Dict[str, Any]:
+        # serve_forever has to be stopped from another thread
+        threading.Thread(target=self._server.shutdown, daemon=True).start()
+        return {"stopping": True}
@@ -0,0 +1,159 @@
+"""
+Compact records for functions and classes extracted from source files.
+"""
+
+import sys
+from typing import Any, Dict, Iterable, Tuple
+
+# Docstrings shared between records; past this many new texts are not added
+MAX_INTERNED_DOCSTRINGS = 1 << 18
+
+# Canonical copy of the docstrings seen since the project was last indexed in
+# full, so identical docstrings are shared
+_docstrings: Dict[str, str] = {}
+
+
+def intern_docstring(text: str) -> str:
+    """Return the shared copy of a docstring"""
+    if not text:
+        return ""
+    shared = _docstrings.get(text)
+    if shared is not None:
+        return shared
+    if len(_docstrings) < MAX_INTERNED_DOCSTRINGS:
+        _docstrings[text] = text
+    return text
+
+
+def clear_interned_docstrings():
+    """Forget shared docstrings, e.g. those of edits made before a re-index"""
+    _docstrings.clear()
+
+
+class _Record:
+    """Base for slotted records that also support dict-style access"""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.__slots__
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict copy (e.g. for JSON), converting nested records too"""
+        result = {}
+        for key in self.__slots__:
+            value = getattr(self, key)
+            if isinstance(value, tuple):
+                value = [v.to_dict() if isinstance(v, _Record) else v for v in value]
+            result[key] = value
+        return result
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, k) == getattr(other, k) for k in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def __getstate__(self):
+        return tuple(getattr(self, k) for k in self.__slots__)
+
+    def __setstate__(self, state):
+        for key, value in zip(self.__slots__, state):
+            object.__setattr__(self, key, value)
+        # Pickled copies get their own strings; share them again on load
+        self._intern()
+
+    def _intern(self):
+        pass
+
+
+class FunctionInfo(_Record):
+    """A function or method: name, line, arguments, docstring and decorators"""
+
+    __slots__ = ("name", "line", "args", "docstring", "decorators", "is_async")
+
+    def __init__(
+        self,
+        name: str,
+        line: int,
+        args: Iterable[str],
+        docstring: str,
+        decorators: Iterable[str] = (),
+        is_async: bool = False,
+    ):
+        self.name = name
+        self.line = line
+        self.args = tuple(args)
+        self.docstring = docstring
+        self.decorators = tuple(decorators)
+        self.is_async = is_async
+        self._intern()
+
+    def moved(self, delta: int) -> "FunctionInfo":
+        """Copy shifted by delta lines"""
+        if not delta:
+            return self
+        return FunctionInfo(
+            self.name,
+            self.line + delta,
+            self.args,
+            self.docstring,
+            self.decorators,
+            self.is_async,
+        )
+
+    def _intern(self):
+        self.name = sys.intern(self.name)
+        self.args = tuple(sys.intern(arg) for arg in self.args)
+        self.docstring = intern_docstring(self.docstring)
+        self.decorators = tuple(sys.intern(d) for d in self.decorators)
+
+
+class ClassInfo(_Record):
+    """A class: name, line, methods, docstring and decorators"""
+
+    __slots__ = ("name", "line", "methods", "docstring", "decorators")
+
+    def __init__(
+        self,
+        name: str,
+        line: int,
+        methods: Iterable[FunctionInfo],
+        docstring: str,
+        decorators: Iterable[str] = (),
+    ):
+        self.name = name
+        self.line = line
+        self.methods = tuple(methods)
+        self.docstring = docstring
+        self.decorators = tuple(decorators)
+        self._intern()
+
+    def moved(self, delta: int) -> "ClassInfo":
+        """Copy shifted by delta lines, methods included"""
+        if not delta:
+            return self
+        return ClassInfo(
+            self.name,
+            self.line + delta,
+            [method.moved(delta) for method in self.methods],
+            self.docstring,
+            self.decorators,
+        )
+
+    def _intern(self):
+        self.name = sys.intern(self.name)
+        self.docstring = intern_docstring(self.docstring)
+        self.decorators = tuple(sys.intern(d) for d in self.decorators)
@@ -2,17 +2,76 @@
 Data models for the Code Assistant.
 """
 
-from dataclasses import dataclass, field
-from typing import List, Dict, Any
+import sys
+from typing import List, Optional
+
+from .code_symbols import FunctionInfo, ClassInfo
 
 
-@dataclass
 class FileInfo:
-    """Information about a file in the project."""
-
-    path: str
-    content: str
-    language: str
-    functions: List[Dict[str, Any]] = field(default_factory=list)
-    classes: List[Dict[str, Any]] = field(default_factory=list)
-    imports: List[str] = field(default_factory=list)
+    """Information about a file in the project.
+
+    ``content`` is either held in memory or, once ``make_lazy`` has been
+    called, read on demand from a ``ContentStore``.
+    """
+
+    __slots__ = (
+        "path",
+        "language",
+        "functions",
+        "classes",
+        "imports",
+        "store",
+        "_content",
+    )
+
+    def __init__(
+        self,
+        path: str,
+        content: Optional[str] = None,
+        language: str = "",
+        functions: Optional[List[FunctionInfo]] = None,
+        classes: Optional[List[ClassInfo]] = None,
+        imports: Optional[List[str]] = None,
+        store=None,
+    ):
+        self.path = path
+        self.language = sys.intern(language)
+        self.functions = functions if functions is not None else []
+        self.classes = classes if classes is not None else []
+        self.imports = imports if imports is not None else []
+        self.store = store
+        self._content = content
+
+    @property
+    def content(self) -> str:
+        if self._content is not None:
+            return self._content
+        if self.store is not None:
+            return self.store.read(self.path)
+        return ""
+
+    @content.setter
+    def content(self, value: str):
+        if self.store is not None:
+            self.store.put(self.path, value)
+        else:
+            self._content = value
+
+    @property
+    def is_lazy(self) -> bool:
+        return self.store is not None and self._content is None
+
+    def make_lazy(self, store):
+        """Hand the content over to store and keep only metadata in memory"""
+        if self._content is not None:
+            store.put(self.path, self._content)
+            self._content = None
+        self.store = store
+
+    def __repr__(self) -> str:
+        return (
+            f"FileInfo(path={self.path!r}, language={self.language!r}, "
+            f"functions={len(self.functions)}, classes={len(self.classes)}, "
+            f"imports={len(self.imports)})"
+        )
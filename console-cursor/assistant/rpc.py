@@ -0,0 +1,74 @@
+"""
+JSON-RPC 2.0 over a Unix socket, one JSON object per line, shared by the
+daemon and its client.
+"""
+
+import os
+import json
+import socket
+import hashlib
+import itertools
+from typing import Any, Optional
+
+from .tools.index_cache import default_cache_dir
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+
+def default_socket_path(target_dir: str) -> str:
+    """Per-project socket in the cache directory"""
+    key = hashlib.sha1(os.path.abspath(target_dir).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(default_cache_dir(), f"daemon-{key}.sock")
+
+
+class RPCError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class RPCClient:
+    """Blocking client for one daemon connection"""
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        self.socket_path = socket_path
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(socket_path)
+        self._file = self._sock.makefile("rwb")
+        self._ids = itertools.count(1)
+
+    def call(self, method: str, **params) -> Any:
+        """Call a method and return its result, raising RPCError on failure"""
+        request = {
+            "jsonrpc": "2.0",
+            "id": next(self._ids),
+            "method": method,
+            "params": params,
+        }
+        self._file.write(json.dumps(request).encode("utf-8") + b"\n")
+        self._file.flush()
+
+        line = self._file.readline()
+        if not line:
+            raise RPCError(SERVER_ERROR, "Connection closed by the daemon")
+        response = json.loads(line)
+        error = response.get("error")
+        if error is not None:
+            raise RPCError(error.get("code", SERVER_ERROR), error.get("message", ""))
+        return response.get("result")
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,236 @@
+"""
+Content-addressed cache of per-file analysis results, shared by all tools.
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .index_cache import default_cache_dir
+from .tracing import tracer
+
+# Entries kept in memory per kind unless the kind sets its own limit
+DEFAULT_MEMORY_ENTRIES = 4096
+# Rows kept on disk; the oldest writes are dropped beyond this
+MAX_DISK_ENTRIES = 200_000
+# Pending writes that trigger a flush to disk
+FLUSH_THRESHOLD = 512
+
+
+class _Kind:
+    """LRU and counters for one kind of result"""
+
+    __slots__ = (
+        "name",
+        "persist",
+        "max_entries",
+        "entries",
+        "hits",
+        "disk_hits",
+        "misses",
+    )
+
+    def __init__(self, name: str, persist: bool, max_entries: int):
+        self.name = name
+        self.persist = persist
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+
+class AnalysisStore:
+    """SQLite table of pickled results keyed by (kind, version, content hash).
+
+    Keys only depend on content, so one store is shared by every project.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(default_cache_dir(), "analysis.sqlite3")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " kind TEXT, version TEXT, hash TEXT, value BLOB,"
+            " PRIMARY KEY (kind, version, hash))"
+        )
+        self._db.commit()
+
+    def get(self, kind: str, version: str, hash_value: str) -> Optional[bytes]:
+        row = self._db.execute(
+            "SELECT value FROM results WHERE kind = ? AND version = ? AND hash = ?",
+            (kind, version, hash_value),
+        ).fetchone()
+        return row[0] if row else None
+
+    def put_many(self, rows: List[Tuple[str, str, str, bytes]]):
+        """Write rows and drop the oldest ones beyond MAX_DISK_ENTRIES"""
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)", rows
+            )
+            (count,) = self._db.execute("SELECT COUNT(*) FROM results").fetchone()
+            if count > MAX_DISK_ENTRIES:
+                self._db.execute(
+                    "DELETE FROM results WHERE rowid IN "
+                    "(SELECT rowid FROM results ORDER BY rowid LIMIT ?)",
+                    (count - MAX_DISK_ENTRIES,),
+                )
+
+    def describe(self) -> str:
+        (count,) = self._db.execute("SELECT COUNT(*) FROM results").fetchone()
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        return (
+            f"{count:,} results on disk "
+            f"({size / (1024 * 1024):.1f} MB, {self.path})"
+        )
+
+    def close(self):
+        self._db.close()
+
+
+class AnalysisCache:
+    """Memory LRU per kind of result, optionally backed by an AnalysisStore.
+
+    Results are keyed by the content hash of the analysed file and a version
+    string naming everything else the result depends on (tool version,
+    configuration, rule set), so a change to either is simply a miss. Kinds
+    that are cheap to recompute but expensive to store, such as parse trees,
+    stay in memory only.
+    """
+
+    def __init__(self):
+        self._kinds: Dict[str, _Kind] = {}
+        self._store: Optional[AnalysisStore] = None
+        self._pending: List[Tuple[str, str, str, bytes]] = []
+        self._lock = threading.RLock()
+
+    def register(
+        self,
+        kind: str,
+        persist: bool = True,
+        max_entries: int = DEFAULT_MEMORY_ENTRIES,
+    ):
+        """Declare a kind of result and how it is kept"""
+        with self._lock:
+            self._kinds[kind] = _Kind(kind, persist, max_entries)
+
+    def attach_store(self, store: Optional[AnalysisStore]):
+        """Back persistent kinds with a store, or detach it with None"""
+        with self._lock:
+            self.flush()
+            self._store = store
+
+    def clear(self):
+        """Forget results held in memory and reset the counters"""
+        with self._lock:
+            for name, kind in self._kinds.items():
+                self._kinds[name] = _Kind(name, kind.persist, kind.max_entries)
+
+    def get_or_compute(
+        self, kind: str, version: str, hash_value: str, compute: Callable[[], Any]
+    ) -> Any:
+        """Cached result for this content, computing and storing it on a miss"""
+        found, value = self.lookup(kind, version, hash_value)
+        if found:
+            return value
+        value = compute()
+        self.put(kind, version, hash_value, value)
+        return value
+
+    def lookup(self, kind: str, version: str, hash_value: str) -> Tuple[bool, Any]:
+        """(True, result) on a hit, (False, None) on a miss"""
+        key = (version, hash_value)
+        with self._lock:
+            entry = self._kinds[kind]
+            if key in entry.entries:
+                entry.entries.move_to_end(key)
+                entry.hits += 1
+                tracer.add("analysis_cache.hits")
+                return True, entry.entries[key]
+
+            if entry.persist and self._store is not None:
+                try:
+                    data = self._store.get(kind, version, hash_value)
+                    value = pickle.loads(data) if data is not None else None
+                except Exception:
+                    data = None
+                if data is not None:
+                    entry.disk_hits += 1
+                    tracer.add("analysis_cache.disk_hits")
+                    self._remember(entry, key, value)
+                    return True, value
+
+            entry.misses += 1
+            tracer.add("analysis_cache.misses")
+            return False, None
+
+    def put(self, kind: str, version: str, hash_value: str, value: Any):
+        with self._lock:
+            entry = self._kinds[kind]
+            self._remember(entry, (version, hash_value), value)
+            if entry.persist and self._store is not None:
+                data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                self._pending.append((kind, version, hash_value, data))
+                if len(self._pending) >= FLUSH_THRESHOLD:
+                    self.flush()
+
+    def flush(self):
+        """Write pending results to the store"""
+        with self._lock:
+            if not self._pending or self._store is None:
+                self._pending = []
+                return
+            rows, self._pending = self._pending, []
+            try:
+                with tracer.span("analysis_cache.flush", rows=len(rows)):
+                    self._store.put_many(rows)
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not save analysis cache: {str(e)}")
+
+    def stats_report(self) -> str:
+        """Hit rates per kind of result"""
+        with self._lock:
+            lines = ["📊 Analysis cache:"]
+            lines.append(
+                f"  {'kind':<14} {'cached':>7} {'hits':>7} {'disk':>7} "
+                f"{'misses':>7} {'hit rate':>9}"
+            )
+            for kind in self._kinds.values():
+                lookups = kind.hits + kind.disk_hits + kind.misses
+                rate = (kind.hits + kind.disk_hits) / lookups if lookups else 0.0
+                lines.append(
+                    f"  {kind.name:<14} {len(kind.entries):>7} {kind.hits:>7} "
+                    f"{kind.disk_hits:>7} {kind.misses:>7} {rate:>8.1%}"
+                )
+            if self._store is not None:
+                lines.append(f"  {self._store.describe()}")
+            else:
+                lines.append("  Results are kept in memory only")
+            return "\n".join(lines)
+
+    def _after_fork(self):
+        """Drop the lock and the SQLite connection inherited by a forked worker"""
+        self._lock = threading.RLock()
+        self._store = None
+        self._pending = []
+
+    def _remember(self, entry: _Kind, key: Tuple[str, str], value: Any):
+        entry.entries[key] = value
+        entry.entries.move_to_end(key)
+        while len(entry.entries) > entry.max_entries:
+            entry.entries.popitem(last=False)
+
+
+# Shared by the indexer, analyzer, bug finder and editor
+analysis_cache = AnalysisCache()
+os.register_at_fork(after_in_child=analysis_cache._after_fork)
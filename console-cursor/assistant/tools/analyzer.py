@@ -3,16 +3,19 @@ Tool for analyzing project structure and individual files.
 """
 
 import os
-import ast
 from typing import Dict, List, Any
 
 from ..models.file_info import FileInfo
+from .python_structure import python_structure
+from .language_parsers import source_outline
+from .tracing import traced
 
 
 class ProjectAnalyzer:
     def __init__(self, target_dir: str):
         self.target_dir = target_dir
 
+    @traced("analyzer.project")
     def analyze_project(self, project_index: Dict[str, FileInfo]) -> str:
         """Analyze the project to understand its structure and purpose"""
         print("🔍 Analyzing project...")
@@ -64,6 +67,7 @@ class ProjectAnalyzer:
         print(f"📊 {project_summary}")
         return project_summary
 
+    @traced("analyzer.file")
     def analyze_file(self, file_path: str, project_index: Dict[str, FileInfo]):
         """Analyze a specific file"""
         # Normalize path
@@ -133,25 +137,19 @@ class ProjectAnalyzer:
                 lines = content.split("\n")
                 print(f"Lines: {len(lines)}")
 
-                # For Python files, try to extract more info
+                # For source files, try to extract more info
                 if language == "python":
-                    try:
-                        tree = ast.parse(content)
-                        functions = [
-                            node
-                            for node in ast.walk(tree)
-                            if isinstance(node, ast.FunctionDef)
-                        ]
-                        classes = [
-                            node
-                            for node in ast.walk(tree)
-                            if isinstance(node, ast.ClassDef)
-                        ]
-
-                        print(f"Functions: {len(functions)}")
-                        print(f"Classes: {len(classes)}")
-                    except SyntaxError:
+                    structure, error = python_structure(content)
+                    if error is None:
+                        print(f"Functions: {len(structure.functions)}")
+                        print(f"Classes: {len(structure.classes)}")
+                    else:
                         print("⚠️ Could not parse Python file (syntax error)")
+                else:
+                    outline = source_outline(language, content)
+                    if outline is not None:
+                        print(f"Functions: {len(outline.functions)}")
+                        print(f"Classes: {len(outline.classes)}")
 
             except Exception as e:
                 print(f"❌ Error analyzing file: {str(e)}")
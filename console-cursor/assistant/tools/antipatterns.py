@@ -0,0 +1,316 @@
+"""
+Pluggable anti-pattern rules that run in a single pass over each file.
+"""
+
+import io
+import re
+import ast
+import time
+import hashlib
+import inspect
+import tokenize
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Type
+
+# Bump whenever a built-in rule changes what it reports, so cached findings
+# are recomputed
+RULES_VERSION = 2
+
+# References to a group by number or name, which merging would break
+_GROUP_REFERENCE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+
+class Finding(NamedTuple):
+    line: int
+    rule: str
+    message: str
+
+
+class RuleEngine:
+    """Runs registered rules over a file with one pass per rule kind.
+
+    * AST rules are dispatched by node type during one walk of the tree.
+    * Token rules are dispatched by token type during one tokenize pass.
+    * Regex rules are merged into a single compiled pattern and matched in
+      one scan of the source. Each rule matches inside a lookahead, so rules
+      whose matches overlap are all reported. Patterns that can't be pasted
+      into another (named groups, group references, global inline flags)
+      get a scan of their own.
+
+    A rule returns a message (or True for its default message) to report a
+    finding at the node or token, and None/False otherwise. Adding rules
+    adds per-node checks but never another traversal.
+    """
+
+    def __init__(self):
+        self._ast_rules: Dict[Type[ast.AST], List[Tuple[str, str, Callable]]] = {}
+        self._token_rules: Dict[int, List[Tuple[str, str, Callable]]] = {}
+        self._regex_rules: List[Tuple[str, str, str]] = []
+        self._separate_regex_rules: List[Tuple[str, re.Pattern, str]] = []
+        self._regex: Optional[re.Pattern] = None
+        self.timings: Dict[str, float] = {}
+        self.files_checked = 0
+        self._fingerprint: Optional[str] = None
+
+    def ast_rule(self, name: str, node_types, message: str = ""):
+        """Register ``check(node)`` for the given AST node types"""
+        if not isinstance(node_types, tuple):
+            node_types = (node_types,)
+
+        def register(check: Callable):
+            for node_type in node_types:
+                self._ast_rules.setdefault(node_type, []).append(
+                    (name, message, check)
+                )
+            self.timings.setdefault(name, 0.0)
+            self._fingerprint = None
+            return check
+
+        return register
+
+    def token_rule(self, name: str, token_types, message: str = ""):
+        """Register ``check(token)`` for the given token types"""
+        if not isinstance(token_types, tuple):
+            token_types = (token_types,)
+
+        def register(check: Callable):
+            for token_type in token_types:
+                self._token_rules.setdefault(token_type, []).append(
+                    (name, message, check)
+                )
+            self.timings.setdefault(name, 0.0)
+            self._fingerprint = None
+            return check
+
+        return register
+
+    def regex_rule(self, name: str, pattern: str, message: str):
+        """Register a line-oriented regex; most of them share one compiled pass"""
+        try:
+            regex = re.compile(pattern, re.MULTILINE)
+        except re.error as e:
+            raise ValueError(f"Invalid pattern for rule {name}: {str(e)}") from e
+        if (
+            regex.groupindex
+            or regex.flags != re.compile("", re.MULTILINE).flags
+            or _GROUP_REFERENCE.search(pattern)
+        ):
+            self._separate_regex_rules.append((name, regex, message))
+            self.timings.setdefault(name, 0.0)
+        else:
+            self._regex_rules.append((name, pattern, message))
+            self._regex = None
+        self._fingerprint = None
+
+    def fingerprint(self) -> str:
+        """Identifies the registered rules, for caching their findings.
+
+        Covers each rule's name, message and pattern or check source; a
+        change in a helper that a check calls needs RULES_VERSION bumped.
+        """
+        if self._fingerprint is None:
+            parts = [str(RULES_VERSION)]
+            for rules in (self._ast_rules, self._token_rules):
+                for kind, entries in rules.items():
+                    parts.extend(
+                        f"{kind}:{name}:{text}:{_check_source(check)}"
+                        for name, text, check in entries
+                    )
+            parts.extend(f"{name}:{pattern}" for name, pattern, _ in self._regex_rules)
+            parts.extend(
+                f"{name}:{regex.pattern}"
+                for name, regex, _ in self._separate_regex_rules
+            )
+            digest = hashlib.sha1("\n".join(sorted(parts)).encode("utf-8"))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def check(self, content: str, tree: Optional[ast.AST] = None) -> List[Finding]:
+        """Run all rules over one file and return findings sorted by line"""
+        findings = []
+        if tree is not None and self._ast_rules:
+            findings.extend(self._check_ast(tree))
+        if self._token_rules:
+            findings.extend(self._check_tokens(content))
+        if self._regex_rules:
+            findings.extend(self._check_regex(content))
+        for name, regex, message in self._separate_regex_rules:
+            findings.extend(self._check_separate_regex(content, name, regex, message))
+        self.files_checked += 1
+        return sorted(findings)
+
+    def timing_report(self) -> str:
+        """Time spent per rule so far, slowest first"""
+        lines = [f"⏱️ Rule timings over {self.files_checked} files:"]
+        for name, seconds in sorted(
+            self.timings.items(), key=lambda item: item[1], reverse=True
+        ):
+            lines.append(f"  {seconds * 1000:9.2f} ms  {name}")
+        return "\n".join(lines)
+
+    def _check_ast(self, tree: ast.AST) -> List[Finding]:
+        findings = []
+        rules = self._ast_rules
+        timings = self.timings
+        started = time.perf_counter()
+        for node in ast.walk(tree):
+            for name, message, check in rules.get(type(node), ()):
+                rule_started = time.perf_counter()
+                result = check(node)
+                timings[name] += time.perf_counter() - rule_started
+                if result:
+                    line = getattr(result, "lineno", None) or node.lineno
+                    text = result if isinstance(result, str) else message
+                    findings.append(Finding(line, name, text))
+        timings["(ast traversal)"] = timings.get("(ast traversal)", 0.0) + (
+            time.perf_counter() - started
+        )
+        return findings
+
+    def _check_tokens(self, content: str) -> List[Finding]:
+        findings = []
+        rules = self._token_rules
+        timings = self.timings
+        started = time.perf_counter()
+        try:
+            for token in tokenize.generate_tokens(io.StringIO(content).readline):
+                for name, message, check in rules.get(token.type, ()):
+                    rule_started = time.perf_counter()
+                    result = check(token)
+                    timings[name] += time.perf_counter() - rule_started
+                    if result:
+                        text = result if isinstance(result, str) else message
+                        findings.append(Finding(token.start[0], name, text))
+        except (tokenize.TokenError, SyntaxError):
+            pass
+        timings["(tokenize)"] = timings.get("(tokenize)", 0.0) + (
+            time.perf_counter() - started
+        )
+        return findings
+
+    def _check_regex(self, content: str) -> List[Finding]:
+        if self._regex is None:
+            patterns = [pattern for _, pattern, _ in self._regex_rules]
+            # The first lookahead finds positions where any rule matches, the
+            # optional ones record every rule that matches there
+            self._regex = re.compile(
+                f"(?=(?:{'|'.join(patterns)}))"
+                + "".join(
+                    f"(?=(?P<r{i}>{pattern}))?" for i, pattern in enumerate(patterns)
+                ),
+                re.MULTILINE,
+            )
+
+        findings = []
+        started = time.perf_counter()
+        line = 1
+        position = 0
+        # Where each rule's last match ended; like a scan for that rule alone,
+        # a rule does not match again inside its own match
+        ends = [0] * len(self._regex_rules)
+        for match in self._regex.finditer(content):
+            line += content.count("\n", position, match.start())
+            position = match.start()
+            for i, (name, _, message) in enumerate(self._regex_rules):
+                start, end = match.span(f"r{i}")
+                if start >= 0 and start >= ends[i]:
+                    ends[i] = max(end, start + 1)
+                    findings.append(Finding(line, name, message))
+        elapsed = time.perf_counter() - started
+
+        # The scan is shared, so its cost is reported once for all regex rules
+        key = f"(regex: {len(self._regex_rules)} merged rules)"
+        self.timings[key] = self.timings.get(key, 0.0) + elapsed
+        return findings
+
+    def _check_separate_regex(
+        self, content: str, name: str, regex: re.Pattern, message: str
+    ) -> List[Finding]:
+        findings = []
+        started = time.perf_counter()
+        line = 1
+        position = 0
+        for match in regex.finditer(content):
+            line += content.count("\n", position, match.start())
+            position = match.start()
+            findings.append(Finding(line, name, message))
+        self.timings[name] += time.perf_counter() - started
+        return findings
+
+
+def _check_source(check: Callable) -> str:
+    """Source of a rule's check, or its bytecode if the source is unavailable"""
+    try:
+        return inspect.getsource(check)
+    except (OSError, TypeError):
+        code = getattr(check, "__code__", None)
+        if code is not None:
+            return code.co_code.hex()
+        return getattr(check, "__qualname__", type(check).__name__)
+
+
+def _is_mutable_literal(node: ast.AST) -> bool:
+    if isinstance(node, (ast.List, ast.Dict, ast.Set)):
+        return True
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in ("list", "dict", "set")
+        and not node.args
+        and not node.keywords
+    )
+
+
+def register_default_rules(engine: RuleEngine):
+    """Built-in Python anti-pattern rules"""
+
+    @engine.ast_rule(
+        "mutable-default-argument",
+        (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda),
+        "Possible mutable default argument (can cause unexpected behavior)",
+    )
+    def mutable_default(node):
+        defaults = node.args.defaults + [d for d in node.args.kw_defaults if d]
+        for default in defaults:
+            if _is_mutable_literal(default):
+                return default
+        return None
+
+    @engine.ast_rule(
+        "bare-except",
+        ast.ExceptHandler,
+        "Bare except clause (should specify exceptions to catch)",
+    )
+    def bare_except(node):
+        return node.type is None
+
+    @engine.ast_rule("comparison-to-none", ast.Compare)
+    def comparison_to_none(node):
+        operands = [node.left] + node.comparators
+        for i, op in enumerate(node.ops):
+            if not isinstance(op, (ast.Eq, ast.NotEq)):
+                continue
+            pair = (operands[i], operands[i + 1])
+            if any(isinstance(o, ast.Constant) and o.value is None for o in pair):
+                if isinstance(op, ast.Eq):
+                    return "Using '== None' instead of 'is None'"
+                return "Using '!= None' instead of 'is not None'"
+        return None
+
+    @engine.token_rule(
+        "statement-semicolon",
+        tokenize.OP,
+        "Statement separated by a semicolon (put statements on separate lines)",
+    )
+    def statement_semicolon(token):
+        return token.string == ";"
+
+    engine.regex_rule(
+        "debugger-call",
+        r"^[ \t]*(?:import\s+i?pdb\b|(?:i?pdb\.)?set_trace\(|breakpoint\(\))",
+        "Debugger call left in the code",
+    )
+
+
+# Shared engine used by BugFinder; in-house rules can be registered on it
+default_engine = RuleEngine()
+register_default_rules(default_engine)
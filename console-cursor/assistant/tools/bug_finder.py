@@ -3,20 +3,96 @@ Tool for finding and fixing bugs in the codebase.
 """
 
 import os
-import ast
 import json
+import hashlib
 import subprocess
-import re
-from typing import Dict, List, Any
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, List, Any, Optional
 
 from ..models.file_info import FileInfo
+from .python_structure import parse_python, python_structure
+from .index_cache import content_hash
+from .analysis_cache import analysis_cache
+from .antipatterns import default_engine
+from .result_stream import TopN
+from .tracing import tracer, traced
+
+# Upper bound on files handed to a single pylint process
+PYLINT_BATCH_SIZE = 50
+
+# Issues listed per severity in a project report; the rest are only counted
+REPORT_LIMITS = {"high": 20, "medium": 5, "low": 0}
+
+# duplicate-code compares each file with the others in the same pylint run,
+# so its messages would depend on how files happened to be batched
+PYLINT_ARGS = ("--output-format=json", "--disable=duplicate-code")
+
+# Files whose content changes what pylint reports
+PYLINT_CONFIG_FILES = (
+    ".pylintrc",
+    "pylintrc",
+    "pyproject.toml",
+    "setup.cfg",
+    "tox.ini",
+)
+
+# Pylint messages for a file are cached by its path and content, and by the
+# content of every project file it imports, directly or not, since messages
+# such as import errors and missing names depend on those. A file is linted
+# again once it, one of its imports or its location changes.
+analysis_cache.register("pylint")
+analysis_cache.register("antipatterns")
+
+
+def pylint_config_key(target_dir: str, pylint_version: str) -> str:
+    """Fingerprint of the project, the pylint version and its config"""
+    digest = hashlib.sha1(pylint_version.encode("utf-8"))
+    digest.update(" ".join(PYLINT_ARGS).encode("utf-8"))
+    digest.update(os.path.abspath(target_dir).encode("utf-8"))
+    for name in PYLINT_CONFIG_FILES:
+        path = os.path.join(target_dir, name)
+        try:
+            with open(path, "rb") as f:
+                digest.update(name.encode("utf-8") + b"\0" + f.read())
+        except OSError:
+            continue
+    return digest.hexdigest()
+
+
+def pylint_file_key(rel_path: str, hash_value: str, dependencies: str = "") -> str:
+    """Cache key of one file's pylint messages.
+
+    The module path is part of it: relative imports, module names and the
+    reported paths differ between identical files in different places.
+    dependencies is the digest of the files it imports, if they are known.
+    """
+    key = f"{rel_path.replace(os.sep, '/')}:{hash_value}"
+    return f"{key}:{dependencies}" if dependencies else key
 
 
 class BugFinder:
-    def __init__(self, target_dir: str):
+    def __init__(
+        self,
+        target_dir: str,
+        workers: int = 0,
+        interactive: bool = True,
+        indexer=None,
+    ):
         self.target_dir = target_dir
-
-    def analyze_and_fix_bugs(self, file_path: str):
+        # Provides the import graph that pylint cache keys depend on
+        self.indexer = indexer
+        # Whether to ask follow-up questions on stdin
+        self.interactive = interactive
+        # Parallel pylint processes for project scans, 0 = one per CPU
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.rules = default_engine
+        self._pylint_version: Optional[str] = None
+        self._pylint_checked = False
+
+    def analyze_and_fix_bugs(
+        self, file_path: str, project_index: Optional[Dict[str, FileInfo]] = None
+    ):
         """Analyze a file for bugs and suggest fixes"""
         if not file_path:
             print("❌ Please specify a file to analyze")
@@ -39,53 +115,56 @@ class BugFinder:
         language = self._get_language_from_extension(ext)
 
         if language == "python":
-            self.analyze_python_file(full_path)
+            self.analyze_python_file(full_path, project_index)
         else:
             print(f"Bug analysis for {language} files is not yet implemented")
 
-    def analyze_python_file(self, file_path: str):
+    @traced("bugs.file")
+    def analyze_python_file(
+        self, file_path: str, project_index: Optional[Dict[str, FileInfo]] = None
+    ):
         """Analyze a Python file for common issues"""
         try:
             with open(file_path, "r", encoding="utf-8") as f:
                 content = f.read()
+            hash_value = content_hash(content)
 
             # Check for syntax errors
-            try:
-                ast.parse(content)
+            _, e = python_structure(content, hash_value)
+            if e is None:
                 print("✅ No syntax errors found")
-            except SyntaxError as e:
+            else:
                 print(f"❌ Syntax error at line {e.lineno}, column {e.offset}: {e.msg}")
                 self.suggest_syntax_fix(file_path, content, e)
                 return
 
             # Run pylint for more detailed analysis
-            try:
-                result = subprocess.run(
-                    ["pylint", "--output-format=json", file_path],
-                    capture_output=True,
-                    text=True,
-                )
-
-                if result.returncode == 0:
-                    print("✅ No issues found by pylint")
-                else:
-                    try:
-                        issues = json.loads(result.stdout)
-                        print(f"Found {len(issues)} potential issues:")
-                        for issue in issues:
-                            print(
-                                f"  Line {issue['line']}: {issue['message']} ({issue['symbol']})"
-                            )
-                    except json.JSONDecodeError:
-                        print("⚠️ Pylint output could not be parsed")
-
-            except FileNotFoundError:
+            pylint_version = self._get_pylint_version()
+            if pylint_version is None:
                 print(
                     "⚠️ Pylint not found. Install with 'pip install pylint' for more detailed analysis"
                 )
+            else:
+                rel_path = os.path.normpath(os.path.relpath(file_path, self.target_dir))
+                dependencies = self._dependency_digests(
+                    project_index, {rel_path: hash_value}
+                )
+                issues = self._lint_file(
+                    rel_path, hash_value, pylint_version, dependencies.get(rel_path, "")
+                )
+                if issues is None:
+                    print("⚠️ Pylint output could not be parsed")
+                elif not issues:
+                    print("✅ No issues found by pylint")
+                else:
+                    print(f"Found {len(issues)} potential issues:")
+                    for issue in issues:
+                        print(
+                            f"  Line {issue['line']}: {issue['message']} ({issue['symbol']})"
+                        )
 
             # Check for common anti-patterns
-            self.check_python_antipatterns(file_path, content)
+            self.check_python_antipatterns(file_path, content, hash_value)
 
         except Exception as e:
             print(f"❌ Error analyzing file: {str(e)}")
@@ -123,36 +202,27 @@ class BugFinder:
                     "🔧 Suggestion: Check for missing commas, operators, or incorrect syntax"
                 )
 
+        if not self.interactive:
+            return
+
         print("\nWould you like me to attempt to fix this error? (yes/no)")
         response = input("> ")
         if response.lower() in ["yes", "y"]:
             # Here we would implement more sophisticated auto-fixing
             print("Auto-fixing is not yet implemented")
 
-    def check_python_antipatterns(self, file_path: str, content: str):
+    def check_python_antipatterns(
+        self, file_path: str, content: str, hash_value: Optional[str] = None
+    ):
         """Check for common Python anti-patterns"""
-        lines = content.split("\n")
-        issues = []
-
-        # Check for mutable default arguments
-        mutable_defaults_pattern = r"def\s+\w+\s*\(.*=\s*(\[\]|{}|\(\))"
-        for i, line in enumerate(lines):
-            if re.search(mutable_defaults_pattern, line):
-                issues.append(
-                    f"Line {i+1}: Possible mutable default argument (can cause unexpected behavior)"
-                )
-
-        # Check for bare except clauses
-        for i, line in enumerate(lines):
-            if re.match(r"\s*except\s*:", line):
-                issues.append(
-                    f"Line {i+1}: Bare except clause (should specify exceptions to catch)"
-                )
-
-        # Check for == None instead of is None
-        for i, line in enumerate(lines):
-            if "== None" in line:
-                issues.append(f"Line {i+1}: Using '== None' instead of 'is None'")
+        hash_value = hash_value or content_hash(content)
+        findings = analysis_cache.get_or_compute(
+            "antipatterns",
+            self.rules.fingerprint(),
+            hash_value,
+            lambda: self._check_rules(content, hash_value),
+        )
+        issues = [f"Line {finding.line}: {finding.message}" for finding in findings]
 
         if issues:
             print("\n⚠️ Potential code quality issues:")
@@ -161,6 +231,11 @@ class BugFinder:
         else:
             print("✅ No common anti-patterns found")
 
+    def _check_rules(self, content: str, hash_value: str):
+        with tracer.span("bugs.antipatterns"):
+            return self.rules.check(content, parse_python(content, hash_value).tree)
+
+    @traced("bugs.project")
     def analyze_project_for_bugs(self, project_index: Dict[str, FileInfo]):
         """Analyze the entire project for bugs"""
         print("🔍 Analyzing project for bugs...")
@@ -177,102 +252,319 @@ class BugFinder:
         print(f"Found {len(python_files)} Python files to analyze")
 
         # Check for pylint
-        try:
-            subprocess.run(["pylint", "--version"], capture_output=True, check=True)
-            has_pylint = True
-        except (subprocess.SubprocessError, FileNotFoundError):
-            has_pylint = False
+        pylint_version = self._get_pylint_version()
+        has_pylint = pylint_version is not None
+        if not has_pylint:
             print(
                 "⚠️ Pylint not found. Install with 'pip install pylint' for better analysis"
             )
 
-        issues_found = []
+        # Issues are counted as they stream in and only the first few of
+        # each severity are kept, so memory does not grow with the issues
+        report = {
+            severity: TopN(limit, key=lambda issue: (issue["file"], issue["line"]))
+            for severity, limit in REPORT_LIMITS.items()
+        }
+        hashes = {}
+        to_lint = {}
 
-        # Analyze each Python file
-        for file_path in python_files[:10]:  # Limit to 10 files for performance
+        # Check every file for syntax errors, collecting the rest for pylint
+        for file_path in python_files:
             full_path = os.path.join(self.target_dir, file_path)
-            print(f"\nAnalyzing {file_path}...")
 
             try:
                 with open(full_path, "r", encoding="utf-8") as f:
                     content = f.read()
-
-                # Check for syntax errors
-                try:
-                    ast.parse(content)
-                except SyntaxError as e:
-                    issue = {
-                        "file": file_path,
-                        "line": e.lineno,
-                        "message": f"Syntax error: {e.msg}",
-                        "severity": "high",
-                    }
-                    issues_found.append(issue)
-                    print(f"❌ Syntax error at line {e.lineno}: {e.msg}")
-                    continue
-
-                # Run pylint if available
-                if has_pylint:
-                    result = subprocess.run(
-                        ["pylint", "--output-format=json", full_path],
-                        capture_output=True,
-                        text=True,
-                    )
-
-                    try:
-                        pylint_issues = json.loads(result.stdout)
-                        for issue in pylint_issues:
-                            issues_found.append(
-                                {
-                                    "file": file_path,
-                                    "line": issue["line"],
-                                    "message": f"{issue['message']} ({issue['symbol']})",
-                                    "severity": self._get_severity_from_pylint(
-                                        issue["symbol"]
-                                    ),
-                                }
-                            )
-                    except json.JSONDecodeError:
-                        pass
-
             except Exception as e:
                 print(f"❌ Error analyzing {file_path}: {str(e)}")
+                continue
+
+            hash_value = content_hash(content)
+            hashes[file_path] = hash_value
+            _, e = python_structure(content, hash_value)
+            if e is not None:
+                issue = {
+                    "file": file_path,
+                    "line": e.lineno,
+                    "message": f"Syntax error: {e.msg}",
+                    "severity": "high",
+                }
+                report["high"].push(issue)
+                print(f"❌ Syntax error in {file_path} at line {e.lineno}: {e.msg}")
+                continue
+
+            if has_pylint:
+                to_lint[file_path] = hash_value
+
+        # Run pylint if available
+        if to_lint:
+            dependencies = self._dependency_digests(project_index, to_lint, hashes)
+            for issue in self._lint_project(to_lint, pylint_version, dependencies):
+                report[issue["severity"]].push(issue)
 
         # Report findings
-        if issues_found:
-            print(f"\n🐛 Found {len(issues_found)} potential issues:")
-
-            # Group by severity
-            high_severity = [i for i in issues_found if i["severity"] == "high"]
-            medium_severity = [i for i in issues_found if i["severity"] == "medium"]
-            low_severity = [i for i in issues_found if i["severity"] == "low"]
-
-            if high_severity:
-                print(f"\n❌ {len(high_severity)} high severity issues:")
-                for issue in high_severity:
-                    print(f"  {issue['file']}:{issue['line']} - {issue['message']}")
-
-            if medium_severity:
-                print(f"\n⚠️ {len(medium_severity)} medium severity issues:")
-                for issue in medium_severity[:5]:  # Show only top 5
-                    print(f"  {issue['file']}:{issue['line']} - {issue['message']}")
-                if len(medium_severity) > 5:
-                    print(
-                        f"  ... and {len(medium_severity) - 5} more medium severity issues"
-                    )
+        total = sum(len(issues) for issues in report.values())
+        if total:
+            print(f"\n🐛 Found {total} potential issues:")
+
+            high, medium, low = report["high"], report["medium"], report["low"]
+            if high:
+                print(f"\n❌ {len(high)} high severity issues:")
+                self._print_issues(high, "high")
+
+            if medium:
+                print(f"\n⚠️ {len(medium)} medium severity issues:")
+                self._print_issues(medium, "medium")
 
-            if low_severity:
-                print(f"\n📝 {len(low_severity)} low severity issues")
+            if low:
+                print(f"\n📝 {len(low)} low severity issues")
                 print("  Use 'analyze <file_path>' to see details for specific files")
 
-            print("\nWould you like me to fix any of these issues? (yes/no)")
-            response = input("> ")
-            if response.lower() in ["yes", "y"]:
-                # Here we would implement auto-fixing
-                print("Auto-fixing is not yet implemented")
+            if self.interactive:
+                print("\nWould you like me to fix any of these issues? (yes/no)")
+                response = input("> ")
+                if response.lower() in ["yes", "y"]:
+                    # Here we would implement auto-fixing
+                    print("Auto-fixing is not yet implemented")
         else:
             print("✅ No issues found in the analyzed files")
 
+    def _print_issues(self, issues: TopN, severity: str):
+        """Print the kept issues of one severity and how many were left out"""
+        shown = issues.items()
+        for issue in shown:
+            print(f"  {issue['file']}:{issue['line']} - {issue['message']}")
+        if len(issues) > len(shown):
+            print(
+                f"  ... and {len(issues) - len(shown)} more {severity} severity issues"
+            )
+
+    @traced("bugs.reanalyze")
+    def reanalyze(self, project_index: Dict[str, FileInfo], paths: List[str]):
+        """Check paths again in the given order, ignoring cached pylint messages.
+
+        For files that import an edited file: their own content is unchanged,
+        but messages about other modules (import errors, missing names) may
+        not be.
+        """
+        pylint_version = self._get_pylint_version()
+        to_lint = {}
+        for path in paths:
+            file_info = project_index.get(path)
+            if file_info is None or file_info.language != "python":
+                continue
+            content = file_info.content
+            hash_value = content_hash(content)
+            _, e = python_structure(content, hash_value)
+            if e is not None:
+                print(f"  ❌ {path}: syntax error at line {e.lineno}: {e.msg}")
+            elif pylint_version is not None:
+                to_lint[path] = hash_value
+        if pylint_version is None:
+            print("  ⚠️ Pylint not found, only syntax was checked")
+        if not to_lint:
+            return
+
+        dependencies = self._dependency_digests(project_index, to_lint)
+        issues = self._lint_project(
+            to_lint, pylint_version, dependencies, refresh=True
+        )
+        by_file = {}
+        for issue in issues:
+            by_file.setdefault(issue["file"], []).append(issue)
+        for path in to_lint:
+            found = by_file.get(path, [])
+            high = sum(1 for issue in found if issue["severity"] == "high")
+            if high:
+                print(f"  ❌ {path}: {len(found)} issues, {high} high severity")
+                for issue in found:
+                    if issue["severity"] == "high":
+                        print(f"    {issue['line']}: {issue['message']}")
+            elif found:
+                print(f"  ⚠️ {path}: {len(found)} issues")
+            else:
+                print(f"  ✅ {path}")
+
+    def _get_pylint_version(self) -> Optional[str]:
+        """Return pylint's version string, or None if it is not installed"""
+        if self._pylint_checked:
+            return self._pylint_version
+        try:
+            result = subprocess.run(
+                ["pylint", "--version"], capture_output=True, text=True, check=True
+            )
+            self._pylint_version = result.stdout.strip()
+        except (subprocess.SubprocessError, FileNotFoundError):
+            self._pylint_version = None
+        self._pylint_checked = True
+        return self._pylint_version
+
+    def _dependency_digests(
+        self,
+        project_index: Optional[Dict[str, FileInfo]],
+        paths: Iterable[str],
+        hashes: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, str]:
+        """Per path, a digest of the project files it imports, directly or not.
+
+        Empty without an indexer or project index, so cache keys then depend
+        on each file alone.
+        """
+        if self.indexer is None or project_index is None:
+            return {}
+        graph = self.indexer.get_dependency_graph(project_index)
+        hashes = dict(hashes or {})
+        digests = {}
+        for path in paths:
+            digest = hashlib.sha1()
+            for dependency in sorted(graph.transitive_dependencies([path]) - {path}):
+                if dependency not in hashes:
+                    file_info = project_index.get(dependency)
+                    hashes[dependency] = (
+                        content_hash(file_info.content) if file_info else ""
+                    )
+                digest.update(f"{dependency}:{hashes[dependency]}\n".encode("utf-8"))
+            digests[path] = digest.hexdigest()
+        return digests
+
+    def _lint_file(
+        self,
+        rel_path: str,
+        hash_value: str,
+        pylint_version: str,
+        dependencies: str = "",
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Pylint messages for one file, or None if pylint's output was unusable"""
+        config_key = pylint_config_key(self.target_dir, pylint_version)
+        file_key = pylint_file_key(rel_path, hash_value, dependencies)
+        found, issues = analysis_cache.lookup("pylint", config_key, file_key)
+        if found:
+            return issues
+
+        results, _ = self._run_pylint([rel_path])
+        if results is None:
+            return None
+        issues = results.get(rel_path, [])
+        analysis_cache.put("pylint", config_key, file_key, issues)
+        return issues
+
+    def _lint_project(
+        self,
+        hashes: Dict[str, str],
+        pylint_version: str,
+        dependencies: Optional[Dict[str, str]] = None,
+        refresh: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield issues for files given as {path: content hash}.
+
+        dependencies maps paths to the digest of the files they import, as
+        part of their cache keys. Cached results come first, then each
+        pylint batch as it finishes. With refresh, every file is linted and
+        the cached results replaced.
+        """
+        config_key = pylint_config_key(self.target_dir, pylint_version)
+        dependencies = dependencies or {}
+        file_keys = {
+            path: pylint_file_key(path, hash_value, dependencies.get(path, ""))
+            for path, hash_value in hashes.items()
+        }
+        pending = []
+        for path in hashes:
+            found, issues = False, None
+            if not refresh:
+                found, issues = analysis_cache.lookup(
+                    "pylint", config_key, file_keys[path]
+                )
+            if found:
+                yield from self._pylint_issues(path, issues)
+            else:
+                pending.append(path)
+        print(
+            f"🧹 Running pylint on {len(pending)} files "
+            f"({len(hashes) - len(pending)} unchanged files cached)"
+        )
+
+        if pending:
+            workers = min(self.workers, len(pending))
+            batch_size = min(PYLINT_BATCH_SIZE, max(1, -(-len(pending) // workers)))
+            batches = [
+                pending[i : i + batch_size] for i in range(0, len(pending), batch_size)
+            ]
+
+            started = time.perf_counter()
+            done = 0
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(self._run_pylint, batch): batch for batch in batches
+                }
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    results, elapsed = future.result()
+                    done += len(batch)
+                    if results is None:
+                        print(
+                            f"⚠️ Pylint output could not be parsed for "
+                            f"{len(batch)} files"
+                        )
+                        continue
+                    print(
+                        f"  [{done}/{len(pending)}] linted {len(batch)} files in "
+                        f"{elapsed:.1f}s ({elapsed * 1000 / len(batch):.0f} ms/file)"
+                    )
+                    for path in batch:
+                        issues = results.get(path, [])
+                        analysis_cache.put(
+                            "pylint", config_key, file_keys[path], issues
+                        )
+                        yield from self._pylint_issues(path, issues)
+            print(f"✅ Pylint finished in {time.perf_counter() - started:.1f}s")
+
+        analysis_cache.flush()
+
+    def _pylint_issues(
+        self, path: str, messages: List[Dict[str, Any]]
+    ) -> Iterator[Dict[str, Any]]:
+        for message in messages:
+            yield {
+                "file": path,
+                "line": message["line"],
+                "message": f"{message['message']} ({message['symbol']})",
+                "severity": self._get_severity_from_pylint(message["symbol"]),
+            }
+
+    def _run_pylint(self, paths: List[str]):
+        """Run one pylint process over several files.
+
+        Returns ({path: [issue, ...]}, seconds), or None instead of the dict
+        if pylint's output could not be parsed.
+        """
+        started = time.perf_counter()
+        with tracer.span("bugs.pylint", files=len(paths)):
+            result = subprocess.run(
+                ["pylint", *PYLINT_ARGS, *paths],
+                cwd=self.target_dir,
+                capture_output=True,
+                text=True,
+            )
+        elapsed = time.perf_counter() - started
+        tracer.add("bugs.files_linted", len(paths))
+
+        try:
+            pylint_issues = json.loads(result.stdout or "[]")
+        except json.JSONDecodeError:
+            return None, elapsed
+
+        by_path = {}
+        for issue in pylint_issues:
+            by_path.setdefault(os.path.normpath(issue["path"]), []).append(
+                {
+                    "line": issue["line"],
+                    "message": issue["message"],
+                    "symbol": issue["symbol"],
+                }
+            )
+        return by_path, elapsed
+
     def _get_severity_from_pylint(self, symbol: str) -> str:
         """Map pylint symbols to severity levels"""
         high_severity = [
@@ -292,7 +584,6 @@ class BugFinder:
             "redefined-builtin",
             "unsubscriptable-object",
             "arguments-differ",
-            "duplicate-code",
         ]
 
         if symbol in high_severity:
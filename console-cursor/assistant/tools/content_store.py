@@ -0,0 +1,79 @@
+"""
+On-demand, memory-mapped access to file contents with a bounded LRU.
+"""
+
+import os
+import mmap
+import threading
+from collections import OrderedDict
+
+
+def read_text(file_path: str) -> str:
+    """Read a UTF-8 file through mmap, translating newlines like text mode"""
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                text = str(view, "utf-8")
+
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+class ContentStore:
+    """Decoded file contents kept in an LRU bounded by a byte budget.
+
+    Files that are not cached are read from disk on demand, so the resident
+    size of the index no longer grows with the size of the project.
+    The budget counts characters, which equals bytes for ASCII sources.
+    """
+
+    def __init__(self, target_dir: str, budget_bytes: int = 64 * 1024 * 1024):
+        self.target_dir = target_dir
+        self.budget_bytes = budget_bytes
+        self.hits = 0
+        self.misses = 0
+        self._texts: "OrderedDict[str, str]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def cached_bytes(self) -> int:
+        return self._size
+
+    def read(self, rel_path: str) -> str:
+        """Return the content of a file, reading it from disk if needed"""
+        with self._lock:
+            text = self._texts.get(rel_path)
+            if text is not None:
+                self._texts.move_to_end(rel_path)
+                self.hits += 1
+                return text
+            self.misses += 1
+
+        text = read_text(os.path.join(self.target_dir, rel_path))
+        self.put(rel_path, text)
+        return text
+
+    def put(self, rel_path: str, text: str):
+        """Cache text for a file, e.g. right after it was written"""
+        with self._lock:
+            self._discard(rel_path)
+            self._texts[rel_path] = text
+            self._size += len(text)
+            # Always keep the most recent entry, even if it alone is too big
+            while self._size > self.budget_bytes and len(self._texts) > 1:
+                _, evicted = self._texts.popitem(last=False)
+                self._size -= len(evicted)
+
+    def discard(self, rel_path: str):
+        """Forget any cached text for a file"""
+        with self._lock:
+            self._discard(rel_path)
+
+    def _discard(self, rel_path: str):
+        text = self._texts.pop(rel_path, None)
+        if text is not None:
+            self._size -= len(text)
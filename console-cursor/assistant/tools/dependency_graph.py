@@ -0,0 +1,444 @@
+"""
+Import dependency graph between project files, with reverse dependencies.
+"""
+
+import os
+import posixpath
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..models.file_info import FileInfo
+
+# Files that stand for their directory when it is imported as a module
+PACKAGE_FILES = {"__init__", "mod", "lib", "index"}
+
+# (kind, key, extension) tried in order until one resolves:
+#   "path"    - a file whose path without extension is key
+#   "module"  - files whose path without extension ends with key
+#   "package" - every file in directories whose path ends with key
+# extension, when set, must match the file's as well (C includes)
+Candidate = Tuple[str, str, Optional[str]]
+
+# language -> resolve(import, importer path) -> candidates
+IMPORT_RESOLVERS: Dict[str, Callable[[str, str], List[Candidate]]] = {}
+
+
+def import_resolver(*languages: str):
+    """Register ``resolve(import, importer)`` for the imports of languages"""
+
+    def register(resolve: Callable[[str, str], List[Candidate]]):
+        for language in languages:
+            IMPORT_RESOLVERS[language] = resolve
+        return resolve
+
+    return register
+
+
+class DependencyGraph:
+    """Which project files each file imports, and which files import it.
+
+    Imports are read from ``FileInfo.imports`` and resolved to project files
+    by a resolver per language. Imports of anything outside the project
+    (standard libraries, packages) resolve to nothing. Like the symbol
+    table, each file's edges are replaced on its own when it changes, and
+    files whose imports did not resolve are linked again when a file they
+    may have meant appears.
+    """
+
+    def __init__(self):
+        # path -> project files it imports
+        self.dependencies: Dict[str, Set[str]] = {}
+        # path -> project files importing it
+        self.dependents: Dict[str, Set[str]] = {}
+        # Every trailing part of each file's path without extension, and of
+        # each directory, mapped to the files they name
+        self._modules: Dict[str, Set[str]] = {}
+        self._packages: Dict[str, Set[str]] = {}
+        self._keys: Dict[str, Tuple[List[str], str]] = {}
+        # Key an unresolved import tried -> files waiting for it
+        self._waiting: Dict[str, Set[str]] = {}
+        self._waiting_keys: Dict[str, Set[str]] = {}
+        self._files: Dict[str, FileInfo] = {}
+        self.ready = False
+
+    def build(self, project_index: Dict[str, FileInfo]):
+        """Link every file in project_index from scratch"""
+        self.__init__()
+        for file_info in project_index.values():
+            self._register(file_info)
+        for file_info in project_index.values():
+            self._link(file_info)
+        self.ready = True
+
+    def update_file(self, file_info: FileInfo):
+        """Re-link a new or changed file"""
+        if file_info.path not in self._files:
+            self._register(file_info)
+            # Imports that may have meant this file can resolve now
+            for path in self._waiting_for(file_info.path):
+                self._link(self._files[path])
+        else:
+            self._files[file_info.path] = file_info
+        self._link(file_info)
+
+    def remove_file(self, path: str):
+        """Drop a file; files importing it are linked again"""
+        if path not in self._files:
+            return
+        importers = self.dependents.pop(path, set())
+        self._unlink(path)
+        del self._files[path]
+        module_keys, directory = self._keys.pop(path)
+        for key in module_keys:
+            _discard(self._modules, key, path)
+        for key in _trailing_parts(directory):
+            _discard(self._packages, key, path)
+        for importer in importers:
+            if importer in self._files:
+                self._link(self._files[importer])
+
+    def transitive_dependents(self, paths: Iterable[str]) -> Set[str]:
+        """Files importing any of paths, directly or through other files"""
+        return _reachable(self.dependents, paths)
+
+    def transitive_dependencies(self, paths: Iterable[str]) -> Set[str]:
+        """Files any of paths import, directly or through other files"""
+        return _reachable(self.dependencies, paths)
+
+    def invalidation_order(self, paths: Iterable[str]) -> List[str]:
+        """paths and their transitive dependents, each after what it imports.
+
+        Files in an import cycle are kept together, in path order, after
+        everything the cycle imports.
+        """
+        paths = set(paths)
+        affected = paths | self.transitive_dependents(paths)
+
+        def imports(path: str) -> List[str]:
+            return sorted(self.dependencies.get(path, set()) & affected)
+
+        return [
+            path
+            for component in _strongly_connected(sorted(affected), imports)
+            for path in component
+        ]
+
+    def show_dependents(self, path: str):
+        """Print what a file imports and what would be re-analyzed if it changed"""
+        path = os.path.normpath(path)
+        if path not in self._files:
+            print(f"❌ Not an indexed file: {path}")
+            return
+        imports = sorted(self.dependencies.get(path, ()))
+        print(f"📦 {path} imports {len(imports)} project files:")
+        for dependency in imports:
+            print(f"  {dependency}")
+        order = [p for p in self.invalidation_order([path]) if p != path]
+        print(f"🔁 {len(order)} files depend on it, in re-analysis order:")
+        for dependent in order:
+            print(f"  {dependent}")
+
+    def _register(self, file_info: FileInfo):
+        path = file_info.path
+        self._files[path] = file_info
+        stem, _ = posixpath.splitext(path.replace(os.sep, "/"))
+        directory, name = posixpath.split(stem)
+        stems = [stem]
+        if name in PACKAGE_FILES and directory:
+            stems.append(directory)
+        module_keys = {key for stem in stems for key in _trailing_parts(stem)}
+        self._keys[path] = (sorted(module_keys), directory)
+        for key in module_keys:
+            self._modules.setdefault(key, set()).add(path)
+        for key in _trailing_parts(directory):
+            self._packages.setdefault(key, set()).add(path)
+
+    def _waiting_for(self, path: str) -> Set[str]:
+        module_keys, directory = self._keys[path]
+        waiting = set()
+        for key in [*module_keys, *_trailing_parts(directory)]:
+            waiting |= self._waiting.get(key, set())
+        return waiting
+
+    def _unlink(self, path: str):
+        for dependency in self.dependencies.pop(path, set()):
+            _discard(self.dependents, dependency, path)
+        for key in self._waiting_keys.pop(path, set()):
+            _discard(self._waiting, key, path)
+
+    def _link(self, file_info: FileInfo):
+        path = file_info.path
+        self._unlink(path)
+        resolve = IMPORT_RESOLVERS.get(file_info.language)
+        if resolve is None:
+            return
+        dependencies = set()
+        waiting = set()
+        for statement in file_info.imports:
+            candidates = resolve(statement, path)
+            targets = self._resolve(candidates, path)
+            if targets:
+                dependencies |= targets
+            else:
+                waiting.update(key for _, key, _ in candidates)
+        dependencies.discard(path)
+        if dependencies:
+            self.dependencies[path] = dependencies
+            for dependency in dependencies:
+                self.dependents.setdefault(dependency, set()).add(path)
+        if waiting:
+            self._waiting_keys[path] = waiting
+            for key in waiting:
+                self._waiting.setdefault(key, set()).add(path)
+
+    def _resolve(self, candidates: List[Candidate], importer: str) -> Set[str]:
+        """Files named by the first candidate that names any"""
+        for kind, key, extension in candidates:
+            if kind == "package":
+                found = self._packages.get(key, set())
+            else:
+                found = self._modules.get(key, set())
+                if kind == "path":
+                    found = {p for p in found if key in self._exact_keys(p)}
+            if extension:
+                found = {p for p in found if p.endswith(extension)}
+            found = found - {importer}
+            if found:
+                return _nearest(found, importer)
+        return set()
+
+    def _exact_keys(self, path: str) -> List[str]:
+        stem = posixpath.splitext(path.replace(os.sep, "/"))[0]
+        directory, name = posixpath.split(stem)
+        return [stem, directory] if name in PACKAGE_FILES else [stem]
+
+
+def _trailing_parts(key: str) -> List[str]:
+    """'a/b/c' -> ['a/b/c', 'b/c', 'c']"""
+    if not key:
+        return []
+    parts = key.split("/")
+    return ["/".join(parts[i:]) for i in range(len(parts))]
+
+
+def _strongly_connected(
+    nodes: List[str], edges: Callable[[str], List[str]]
+) -> List[List[str]]:
+    """Tarjan's algorithm, iterative. A component comes after every
+    component its nodes have edges to."""
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack: Set[str] = set()
+    components = []
+
+    def visit(node: str):
+        index[node] = low[node] = len(index)
+        stack.append(node)
+        on_stack.add(node)
+        return node, iter(edges(node))
+
+    for root in nodes:
+        if root in index:
+            continue
+        work = [visit(root)]
+        while work:
+            node, targets = work[-1]
+            for target in targets:
+                if target not in index:
+                    work.append(visit(target))
+                    break
+                if target in on_stack:
+                    low[node] = min(low[node], index[target])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+    return components
+
+
+def _reachable(edges: Dict[str, Set[str]], paths: Iterable[str]) -> Set[str]:
+    found = set()
+    queue = list(paths)
+    while queue:
+        for target in edges.get(queue.pop(), ()):
+            if target not in found:
+                found.add(target)
+                queue.append(target)
+    return found
+
+
+def _discard(mapping: Dict[str, Set[str]], key: str, value: str):
+    values = mapping.get(key)
+    if values is not None:
+        values.discard(value)
+        if not values:
+            del mapping[key]
+
+
+def _nearest(paths: Set[str], importer: str) -> Set[str]:
+    """Of several matches, those sharing the most directories with importer"""
+    if len(paths) == 1:
+        return paths
+    importer_parts = importer.split(os.sep)[:-1]
+
+    def shared(path: str) -> int:
+        count = 0
+        for a, b in zip(path.split(os.sep)[:-1], importer_parts):
+            if a != b:
+                break
+            count += 1
+        return count
+
+    best = max(shared(path) for path in paths)
+    return {path for path in paths if shared(path) == best}
+
+
+def _directory(importer: str) -> str:
+    return posixpath.dirname(importer.replace(os.sep, "/"))
+
+
+def _join(directory: str, relative: str) -> str:
+    """Project-relative path of relative seen from directory, or "" outside"""
+    path = posixpath.normpath(posixpath.join(directory, relative))
+    return "" if path.startswith("..") else path.lstrip("./") or ""
+
+
+def _strip_extension(path: str, extensions: Tuple[str, ...]) -> str:
+    stem, extension = posixpath.splitext(path)
+    return stem if extension in extensions else path
+
+
+def _prefixes(parts: List[str], minimum: int = 1) -> List[str]:
+    """'a','b','c' -> ['a/b/c', 'a/b', 'a'] down to minimum parts"""
+    return ["/".join(parts[:n]) for n in range(len(parts), minimum - 1, -1)]
+
+
+@import_resolver("python")
+def _python_imports(statement: str, importer: str) -> List[Candidate]:
+    # Absolute imports are looked up from the project root and from each
+    # directory above the importer (src/ layouts, scripts next to modules)
+    directory = _directory(importer)
+    if statement.startswith("import "):
+        source, name = statement[len("import ") :], ""
+    else:
+        source, _, name = statement[len("from ") :].partition(" import ")
+    level = len(source) - len(source.lstrip("."))
+    module = source[level:].replace(".", "/")
+    names = [module] if module else []
+    if name and name != "*":
+        # The name may be a submodule as well as a member of the module
+        names.insert(0, posixpath.join(module, name))
+
+    if level:
+        base = directory
+        for _ in range(level - 1):
+            base = posixpath.dirname(base)
+        paths = [posixpath.join(base, name) for name in names]
+        if not module and base:
+            # `from . import name` may take name from the package's __init__
+            paths.append(base)
+        return [("path", path, None) for path in paths]
+    roots = [""]
+    parts = directory.split("/") if directory else []
+    roots += ["/".join(parts[:n]) for n in range(1, len(parts) + 1)]
+    return [
+        ("path", posixpath.join(root, name), None) for name in names for root in roots
+    ]
+
+
+_SCRIPT_EXTENSIONS = (".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx")
+
+
+@import_resolver("javascript", "typescript")
+def _script_imports(statement: str, importer: str) -> List[Candidate]:
+    module = statement[len("import ") :]
+    if not module.startswith("."):
+        # A package from node_modules
+        return []
+    path = _join(_directory(importer), module)
+    return [("path", _strip_extension(path, _SCRIPT_EXTENSIONS), None)] if path else []
+
+
+@import_resolver("go")
+def _go_imports(statement: str, importer: str) -> List[Candidate]:
+    parts = statement[len("import ") :].split("/")
+    if len(parts) == 1:
+        # Standard library, unless a top-level directory has that name
+        return [("package", parts[0], None)] if "." not in parts[0] else []
+    # Module paths start with the module name; the project holds the tail
+    return [("package", "/".join(parts[i:]), None) for i in range(len(parts))]
+
+
+@import_resolver("java")
+def _java_imports(statement: str, importer: str) -> List[Candidate]:
+    parts = statement[len("import ") :].split(".")
+    if parts[-1] == "*":
+        return [("package", "/".join(parts[:-1]), None)]
+    # A static import names a member of the class before it
+    return [("module", key, None) for key in _prefixes(parts, max(1, len(parts) - 1))]
+
+
+@import_resolver("rust")
+def _rust_imports(statement: str, importer: str) -> List[Candidate]:
+    keyword, _, path = statement.partition(" ")
+    if keyword == "mod":
+        stem = posixpath.splitext(importer.replace(os.sep, "/"))[0]
+        directory, name = posixpath.split(stem)
+        # foo.rs declares foo/x.rs, while mod.rs, lib.rs and main.rs declare x.rs
+        base = directory if name in PACKAGE_FILES | {"main"} else stem
+        return [("path", posixpath.join(base, path), None)]
+    if keyword != "use":
+        return []
+    parts = [part.strip() for part in path.split("{", 1)[0].split("::")]
+    parts = [part for part in parts if part]
+    anchored = bool(parts) and parts[0] in ("crate", "self", "super")
+    while parts and parts[0] in ("crate", "self", "super"):
+        parts.pop(0)
+    if not parts:
+        return []
+    minimum = 1 if anchored else min(2, len(parts))
+    return [("module", key, None) for key in _prefixes(parts, minimum)]
+
+
+@import_resolver("c", "cpp")
+def _c_imports(statement: str, importer: str) -> List[Candidate]:
+    header = statement[len("include ") :]
+    stem, extension = posixpath.splitext(header)
+    candidates = []
+    relative = _join(_directory(importer), stem)
+    if relative:
+        candidates.append(("path", relative, extension))
+    candidates.append(("module", stem.lstrip("./"), extension))
+    return candidates
+
+
+@import_resolver("ruby", "php", "bash")
+def _script_file_imports(statement: str, importer: str) -> List[Candidate]:
+    keyword, _, target = statement.partition(" ")
+    if "$" in target:
+        return []
+    if keyword == "use":
+        # PHP namespaces usually mirror directories below a source root
+        parts = target.strip("\\").split("\\")
+        return [
+            ("module", "/".join(parts[i:]), None)
+            for i in range(max(1, len(parts) - 1))
+        ]
+    stem = _strip_extension(target, (".rb", ".php", ".sh", ".bash"))
+    candidates = []
+    relative = _join(_directory(importer), stem)
+    if relative:
+        candidates.append(("path", relative, None))
+    if not stem.startswith("."):
+        candidates.append(("module", stem, None))
+    return candidates
@@ -0,0 +1,71 @@
+"""
+Line-range edits and the bookkeeping needed to apply them in one pass.
+"""
+
+import bisect
+import itertools
+from typing import List, NamedTuple, Sequence, Tuple
+
+
+class LineEdit(NamedTuple):
+    """One applied hunk: old lines [old_start, old_start + old_count) were
+    replaced by new lines [new_start, new_start + new_count).
+
+    Line numbers are 0-based indexes into ``content.split("\\n")``.
+    ``char_delta`` is how much the content length changed.
+    """
+
+    old_start: int
+    old_count: int
+    new_start: int
+    new_count: int
+    char_delta: int
+
+    @property
+    def line_delta(self) -> int:
+        return self.new_count - self.old_count
+
+
+def apply_line_edits(
+    lines: Sequence[str], edits: List[Tuple[int, int, List[str]]]
+) -> Tuple[List[str], List[LineEdit]]:
+    """Apply (start, count, new lines) replacements to lines in one pass.
+
+    Edits use 0-based line numbers of the original lines, must not overlap
+    and are applied together, so each one refers to the file as it was
+    before the batch. Returns the new lines and the applied hunks in order.
+    """
+    new_lines: List[str] = []
+    hunks: List[LineEdit] = []
+    position = 0
+    for start, count, replacement in sorted(edits, key=lambda edit: edit[:2]):
+        if start < position:
+            raise ValueError(f"Overlapping edits at line {start + 1}")
+        if start + count > len(lines):
+            raise ValueError(f"Edit past the end of the file at line {start + 1}")
+
+        new_lines.extend(lines[position:start])
+        removed = lines[start : start + count]
+        # With "\n".join semantics every line counts one separator
+        char_delta = sum(map(len, replacement)) - sum(map(len, removed))
+        char_delta += len(replacement) - count
+        hunks.append(
+            LineEdit(start, count, len(new_lines), len(replacement), char_delta)
+        )
+        new_lines.extend(replacement)
+        position = start + count
+    new_lines.extend(lines[position:])
+    return new_lines, hunks
+
+
+class LineShift:
+    """How far unchanged old lines move once a list of hunks is applied"""
+
+    def __init__(self, hunks: Sequence[LineEdit]):
+        self._starts = [hunk.old_start for hunk in hunks]
+        self._shifts = list(itertools.accumulate(hunk.line_delta for hunk in hunks))
+
+    def __call__(self, old_line: int) -> int:
+        """Line delta of an unchanged old line (0-based)"""
+        index = bisect.bisect_right(self._starts, old_line)
+        return self._shifts[index - 1] if index else 0
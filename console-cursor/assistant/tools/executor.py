@@ -2,46 +2,344 @@
 Tool for executing commands in the project directory.
 """
 
-import subprocess
+import os
+import time
+import queue
+import signal
+import asyncio
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from .warm_worker import WarmWorker
+from .tracing import traced
+
+# Lines of output kept per job; older lines are dropped
+MAX_OUTPUT_LINES = 2000
+# Bytes read from a pipe at a time
+READ_CHUNK_SIZE = 64 * 1024
+# Bytes kept of a single output line; the rest of a longer line is dropped
+MAX_LINE_BYTES = 64 * 1024
+# Pseudo stream name sent to listeners when a job ends
+EXIT_STREAM = "exit"
+
+
+class Job:
+    """A command started by the executor, in the foreground or background"""
+
+    def __init__(self, job_id: int, command: str, timeout: Optional[float]):
+        self.id = job_id
+        self.command = command
+        self.timeout = timeout
+        self.status = "starting"
+        self.returncode: Optional[int] = None
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        # (stream, line) pairs, bounded so chatty commands can't exhaust memory
+        self.output = deque(maxlen=MAX_OUTPUT_LINES)
+        self.dropped_lines = 0
+        self.future = None
+        self._listeners: List[Callable[[str, str], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self.finished is not None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.time()) - self.started
+
+    def add_line(self, stream: str, line: str):
+        with self._lock:
+            if len(self.output) == self.output.maxlen:
+                self.dropped_lines += 1
+            self.output.append((stream, line))
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(stream, line)
+
+    def finish(self, returncode: Optional[int]):
+        """Record the exit code and wake up anyone following the output"""
+        with self._lock:
+            self.returncode = returncode
+            self.finished = time.time()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(EXIT_STREAM, "")
+
+    def subscribe(self, listener: Callable[[str, str], None]) -> list:
+        """Register for new lines and return the lines buffered so far"""
+        with self._lock:
+            self._listeners.append(listener)
+            return list(self.output)
+
+    def unsubscribe(self, listener: Callable[[str, str], None]):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
 
 
 class CommandExecutor:
-    def __init__(self, target_dir: str):
+    def __init__(
+        self,
+        target_dir: str,
+        default_timeout: Optional[float] = None,
+        warm: bool = False,
+    ):
         self.target_dir = target_dir
+        self.default_timeout = default_timeout
+        # Serves `python …` and `pytest …` from a preloaded interpreter
+        self.warm_worker = WarmWorker(target_dir) if warm else None
+        if self.warm_worker is not None:
+            self.warm_worker.start()
+        self.jobs: Dict[int, Job] = {}
+        self._next_job_id = 1
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
 
-    def execute_code(self, command: str):
+    @traced("run.command")
+    def execute_code(self, command: str, timeout: Optional[float] = None):
         """Execute a command in the project directory"""
         print(f"🚀 Executing: {command}")
 
+        job = self._start_job(command, timeout, background=False)
         try:
-            # Run the command in the project directory
-            process = subprocess.Popen(
+            # Output is printed from this thread so callers can capture it
+            self._follow(job, streams=("stdout",))
+            job.future.result()
+        except KeyboardInterrupt:
+            # Ctrl-C stops the command, not the assistant
+            job.future.cancel()
+            self._wait_quietly(job)
+            print("\n⛔ Command interrupted")
+            return
+        except Exception as e:
+            print(f"❌ Error executing command: {str(e)}")
+            return
+
+        self._report(job, show_stderr=True)
+
+    def start_background(self, command: str, timeout: Optional[float] = None) -> Job:
+        """Run a command in the background and return its job"""
+        job = self._start_job(command, timeout, background=True)
+        print(f"🚀 Started job [{job.id}] in the background: {command}")
+        return job
+
+    def show_jobs(self):
+        """List background jobs and how they ended"""
+        if not self.jobs:
+            print("No jobs")
+            return
+
+        print("\n📋 Jobs:")
+        for job in self.jobs.values():
+            code = "" if job.returncode is None else f" (exit {job.returncode})"
+            print(
+                f"  [{job.id}] {job.status}{code} {job.elapsed:.1f}s - {job.command}"
+            )
+
+    def attach(self, job_id: int):
+        """Show a job's output so far and follow it until it ends or Ctrl-C"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            print(f"❌ No such job: {job_id}")
+            return
+
+        try:
+            if job.dropped_lines:
+                print(f"... {job.dropped_lines} earlier lines dropped")
+            self._follow(job, streams=("stdout", "stderr"))
+            self._report(job, show_stderr=False)
+        except KeyboardInterrupt:
+            print(f"\n↩️ Detached from job [{job.id}] (still {job.status})")
+
+    def kill(self, job_id: int):
+        """Stop a running job"""
+        job = self.jobs.get(job_id)
+        if job is None or job.done:
+            print(f"❌ No running job: {job_id}")
+            return
+        job.future.cancel()
+        self._wait_quietly(job)
+        print(f"⛔ Job [{job.id}] killed")
+
+    def shutdown(self):
+        """Kill running jobs and stop the event loop"""
+        for job in self.jobs.values():
+            if not job.done:
+                job.future.cancel()
+                self._wait_quietly(job)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+        if self.warm_worker is not None:
+            self.warm_worker.stop()
+
+    def _start_job(
+        self, command: str, timeout: Optional[float], background: bool
+    ) -> Job:
+        # Only background jobs get an id that jobs/attach/kill can refer to
+        job_id = self._next_job_id if background else 0
+        job = Job(job_id, command, timeout or self.default_timeout)
+        if background:
+            self.jobs[job.id] = job
+            self._next_job_id += 1
+        job.future = asyncio.run_coroutine_threadsafe(
+            self._run_job(job), self._get_loop()
+        )
+        return job
+
+    def _follow(self, job: Job, streams):
+        """Print a job's output from the calling thread until the job ends"""
+        lines = queue.Queue()
+
+        def listener(stream, line):
+            lines.put((stream, line))
+
+        buffered = job.subscribe(listener)
+        try:
+            for stream, line in buffered:
+                if stream in streams:
+                    self._print_line(stream, line)
+            while not job.done or not lines.empty():
+                try:
+                    stream, line = lines.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if stream == EXIT_STREAM:
+                    break
+                if stream in streams:
+                    self._print_line(stream, line)
+        finally:
+            job.unsubscribe(listener)
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop running in a daemon thread, shared by all jobs"""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="command-executor", daemon=True
+                ).start()
+                self._loop = loop
+            return self._loop
+
+    async def _run_job(self, job: Job):
+        try:
+            process = await self._spawn(job.command)
+        except asyncio.CancelledError:
+            job.status = "killed"
+            job.finish(None)
+            raise
+        except Exception as e:
+            # Followers wait for finish, so a failed start must still end the job
+            job.status = "failed"
+            job.add_line("stderr", f"Could not start command: {str(e)}")
+            job.finish(None)
+            return
+        job.status = "running"
+
+        # Stream both pipes concurrently so neither can fill up and block
+        pumps = asyncio.gather(
+            self._pump(process.stdout, "stdout", job.add_line),
+            self._pump(process.stderr, "stderr", job.add_line),
+            process.wait(),
+        )
+        try:
+            await asyncio.wait_for(pumps, job.timeout)
+            job.status = "done" if process.returncode == 0 else "failed"
+        except asyncio.TimeoutError:
+            self._kill_process(process)
+            job.status = "timeout"
+        except asyncio.CancelledError:
+            self._kill_process(process)
+            job.status = "killed"
+            raise
+        finally:
+            if process.returncode is None:
+                await process.wait()
+            job.finish(process.returncode)
+
+    async def _spawn(self, command: str) -> asyncio.subprocess.Process:
+        process = None
+        if self.warm_worker is not None:
+            process = await self.warm_worker.spawn(command)
+        if process is None:
+            # Run the command in the project directory, in its own process group
+            # so the whole tree can be killed and terminal Ctrl-C doesn't reach it
+            process = await asyncio.create_subprocess_shell(
                 command,
-                shell=True,
                 cwd=self.target_dir,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
             )
+        return process
 
-            # Stream output in real-time
-            while True:
-                output = process.stdout.readline()
-                if output == "" and process.poll() is not None:
-                    break
-                if output:
-                    print(output.strip())
+    async def _pump(self, stream: asyncio.StreamReader, name: str, sink):
+        """Forward a pipe line by line, truncating lines over MAX_LINE_BYTES"""
+        pending = b""
+        # Bytes dropped from the end of the line in pending
+        skipped = 0
+        while True:
+            chunk = await stream.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            for index, piece in enumerate(chunk.split(b"\n")):
+                if index:
+                    sink(name, _decode_line(pending, skipped))
+                    pending = b""
+                    skipped = 0
+                room = MAX_LINE_BYTES - len(pending)
+                if len(piece) > room:
+                    skipped += len(piece) - room
+                    piece = piece[:room]
+                pending += piece
+        if pending or skipped:
+            sink(name, _decode_line(pending, skipped))
+
+    def _kill_process(self, process):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError, AttributeError):
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+
+    def _wait_quietly(self, job: Job):
+        """Wait for a cancelled job to finish cleaning up"""
+        deadline = time.time() + 5
+        while not job.done and time.time() < deadline:
+            time.sleep(0.01)
 
-            # Get return code
-            return_code = process.poll()
+    def _print_line(self, stream: str, line: str):
+        if stream == "stderr":
+            print(f"\033[91m{line}\033[0m")
+        else:
+            print(line)
 
-            # Print any errors
-            if return_code != 0:
-                stderr = process.stderr.read()
-                print(f"❌ Command failed with exit code {return_code}")
-                print(stderr)
+    def _report(self, job: Job, show_stderr: bool):
+        """Print how a job ended"""
+        if job.status == "timeout":
+            print(f"⏱️ Command timed out after {job.timeout:g}s and was killed")
+        elif job.returncode != 0:
+            if job.returncode is None:
+                print("❌ Command could not be started")
             else:
-                print(f"✅ Command completed successfully")
+                print(f"❌ Command failed with exit code {job.returncode}")
+            if show_stderr:
+                # Print any errors
+                print("\n".join(line for s, line in job.output if s == "stderr"))
+        else:
+            print(f"✅ Command completed successfully")
 
-        except Exception as e:
-            print(f"❌ Error executing command: {str(e)}")
+
+def _decode_line(line: bytes, skipped: int) -> str:
+    """Text of an output line, noting how much of it was dropped"""
+    text = line.decode("utf-8", "replace").rstrip("\r")
+    if skipped:
+        text += f" … [{skipped:,} more bytes]"
+    return text
@@ -3,43 +3,144 @@ Tool for editing files in the project.
 """
 
 import os
-import difflib
-from typing import Dict, List, Any
+import tempfile
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 from ..models.file_info import FileInfo
+from .edits import LineEdit, apply_line_edits
+from .line_diff import diff_lines, refine_hunks
+from .tracing import tracer, traced
+
+# Unchanged lines shown around each hunk of a diff
+DIFF_CONTEXT = 3
+# Diff lines printed before the rest of a diff is skipped
+DIFF_MAX_LINES = 500
+
+
+class EditTransaction:
+    """A batch of line-range edits to one file, applied together on commit.
+
+    Line numbers are 1-based and always refer to the file as it was when the
+    transaction began, so edits can be queued in any order as long as they
+    do not overlap. Nothing is written until ``commit``.
+    """
+
+    def __init__(self, editor: "FileEditor", full_path: str, content: str):
+        self.editor = editor
+        self.full_path = full_path
+        self.rel_path = os.path.relpath(full_path, editor.target_dir)
+        self.content = content
+        self.lines = content.split("\n")
+        self._edits: List[Tuple[int, int, List[str]]] = []
+
+    def replace(self, start: int, end: int, lines: List[str]):
+        """Replace lines start..end (inclusive) with new lines"""
+        self._check_range(start, end)
+        self._edits.append((start - 1, end - start + 1, list(lines)))
+
+    def insert(self, after: int, lines: List[str]):
+        """Insert new lines after a line, or at the top when after is 0"""
+        if not 0 <= after <= len(self.lines):
+            raise ValueError(f"Invalid line number: {after}")
+        self._edits.append((after, 0, list(lines)))
+
+    def delete(self, start: int, end: int):
+        """Delete lines start..end (inclusive)"""
+        self._check_range(start, end)
+        self._edits.append((start - 1, end - start + 1, []))
+
+    def _check_range(self, start: int, end: int):
+        if not 1 <= start <= end <= len(self.lines):
+            raise ValueError(f"Invalid line range: {start}-{end}")
+
+    @traced("edit.commit")
+    def commit(self, project_index: Dict[str, FileInfo]) -> bool:
+        """Write all edits at once, show the diff and update the index"""
+        try:
+            new_lines, hunks = apply_line_edits(self.lines, self._edits)
+        except ValueError as e:
+            print(f"❌ {str(e)}")
+            return False
+        self._edits = []
+        if new_lines == self.lines:
+            print("No changes made")
+            return False
+
+        new_content = "\n".join(new_lines)
+        if not self.editor._save_file(self.full_path, new_content):
+            return False
+        self.editor.show_diff(
+            self.lines,
+            new_lines,
+            refine_hunks(self.lines, new_lines, hunks, self.editor.diff_algorithm),
+        )
+        self.editor._update_index(
+            self.rel_path, new_content, self.lines, new_lines, hunks, project_index
+        )
+
+        # Further edits build on the committed file
+        self.content = new_content
+        self.lines = new_lines
+        return True
 
 
 class FileEditor:
-    def __init__(self, target_dir: str):
+    def __init__(
+        self,
+        target_dir: str,
+        indexer=None,
+        interactive: bool = True,
+        diff_algorithm: str = "myers",
+    ):
         self.target_dir = target_dir
+        self.interactive = interactive
+        self.diff_algorithm = diff_algorithm
+        if indexer is None:
+            from ..tools.indexer import ProjectIndexer
 
-    def edit_file(
-        self, file_path: str, edit_instructions: str, project_index: Dict[str, FileInfo]
-    ):
-        """Edit a file based on instructions"""
+            indexer = ProjectIndexer(target_dir, use_cache=False)
+        self.indexer = indexer
+
+    def begin(self, file_path: str) -> Optional[EditTransaction]:
+        """Start an edit transaction on a file, or None if it can't be read"""
         # Normalize path
         if not file_path.startswith(self.target_dir):
             full_path = os.path.join(self.target_dir, file_path)
         else:
             full_path = file_path
 
-        rel_path = os.path.relpath(full_path, self.target_dir)
-
         if not os.path.exists(full_path):
             print(f"❌ File not found: {file_path}")
-            return
-
-        print(f"✏️ Editing {file_path} based on: '{edit_instructions}'")
+            return None
 
         try:
             with open(full_path, "r", encoding="utf-8") as f:
                 content = f.read()
+        except Exception as e:
+            print(f"❌ Error reading file: {str(e)}")
+            return None
+        return EditTransaction(self, full_path, content)
 
+    def edit_file(
+        self, file_path: str, edit_instructions: str, project_index: Dict[str, FileInfo]
+    ):
+        """Edit a file based on instructions"""
+        transaction = self.begin(file_path)
+        if transaction is None:
+            return
+
+        if not self.interactive:
+            print("❌ Interactive edits are not available in batch mode")
+            return
+
+        print(f"✏️ Editing {file_path} based on: '{edit_instructions}'")
+
+        try:
             # Here we would integrate with an LLM to generate the edits
             # For now, we'll just show the file and prompt for manual edits
             print("\nCurrent file content:")
             print("---------------------")
-            lines = content.split("\n")
+            lines = transaction.lines
             for i, line in enumerate(lines):
                 print(f"{i+1:4d} | {line}")
             print("---------------------")
@@ -56,12 +157,8 @@ class FileEditor:
                 line_num = int(input("Line number to replace: "))
                 new_line = input("New content: ")
                 if 1 <= line_num <= len(lines):
-                    old_content = content
-                    lines[line_num - 1] = new_line
-                    new_content = "\n".join(lines)
-                    self._save_file(full_path, new_content)
-                    self._show_diff(old_content, new_content)
-                    self._update_index(rel_path, new_content, project_index)
+                    transaction.replace(line_num, line_num, [new_line])
+                    transaction.commit(project_index)
                 else:
                     print("❌ Invalid line number")
 
@@ -76,12 +173,8 @@ class FileEditor:
                     new_lines.append(new_line)
 
                 if 0 <= line_num <= len(lines):
-                    old_content = content
-                    lines = lines[:line_num] + new_lines + lines[line_num:]
-                    new_content = "\n".join(lines)
-                    self._save_file(full_path, new_content)
-                    self._show_diff(old_content, new_content)
-                    self._update_index(rel_path, new_content, project_index)
+                    transaction.insert(line_num, new_lines)
+                    transaction.commit(project_index)
                 else:
                     print("❌ Invalid line number")
 
@@ -89,12 +182,8 @@ class FileEditor:
                 start = int(input("Start line: "))
                 end = int(input("End line: "))
                 if 1 <= start <= end <= len(lines):
-                    old_content = content
-                    lines = lines[: start - 1] + lines[end:]
-                    new_content = "\n".join(lines)
-                    self._save_file(full_path, new_content)
-                    self._show_diff(old_content, new_content)
-                    self._update_index(rel_path, new_content, project_index)
+                    transaction.delete(start, end)
+                    transaction.commit(project_index)
                 else:
                     print("❌ Invalid line range")
 
@@ -107,48 +196,172 @@ class FileEditor:
         except Exception as e:
             print(f"❌ Error editing file: {str(e)}")
 
-    def _save_file(self, file_path: str, content: str):
-        """Save content to a file"""
+    def _save_file(self, file_path: str, content: str) -> bool:
+        """Atomically replace a file, keeping its permissions"""
         try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(content)
+            with tracer.span("edit.save"):
+                os.replace(_stage_file(file_path, content), file_path)
+            tracer.add("edit.bytes_written", len(content))
             print(f"✅ File saved: {file_path}")
+            return True
         except Exception as e:
             print(f"❌ Error saving file: {str(e)}")
+            return False
 
     def _update_index(
-        self, rel_path: str, content: str, project_index: Dict[str, FileInfo]
+        self,
+        rel_path: str,
+        content: str,
+        old_lines: List[str],
+        new_lines: List[str],
+        hunks: List[LineEdit],
+        project_index: Dict[str, FileInfo],
     ):
-        """Update the project index with the new file content"""
+        """Update the project index for the edited regions only"""
         if rel_path in project_index:
-            file_info = project_index[rel_path]
-            file_info.content = content
-
-            # Clear existing structure
-            file_info.functions = []
-            file_info.classes = []
-            file_info.imports = []
-
-            # Re-extract structure for Python files
-            if file_info.language == "python":
-                from ..tools.indexer import ProjectIndexer
-
-                indexer = ProjectIndexer(self.target_dir)
-                indexer.extract_python_structure(file_info)
-
-    def _show_diff(self, old_content: str, new_content: str):
-        """Show a diff of the changes"""
-        old_lines = old_content.splitlines()
-        new_lines = new_content.splitlines()
-        diff = difflib.unified_diff(
-            old_lines, new_lines, lineterm="", fromfile="before", tofile="after"
+            self.indexer.apply_edit(
+                project_index[rel_path], content, old_lines, new_lines, hunks
+            )
+
+    def show_changes(self, old_content: str, new_content: str):
+        """Show a diff between two versions of a file"""
+        old_lines = old_content.split("\n")
+        new_lines = new_content.split("\n")
+        self.show_diff(
+            old_lines, new_lines, diff_lines(old_lines, new_lines, self.diff_algorithm)
         )
 
-        print("\nChanges made:")
-        for line in diff:
-            if line.startswith("+") and not line.startswith("+++"):
-                print(f"\033[92m{line}\033[0m")  # Green for additions
-            elif line.startswith("-") and not line.startswith("---"):
-                print(f"\033[91m{line}\033[0m")  # Red for deletions
-            else:
+    @traced("edit.diff")
+    def show_diff(
+        self,
+        old_lines: Sequence[str],
+        new_lines: Sequence[str],
+        hunks: Iterable[LineEdit],
+        max_lines: int = DIFF_MAX_LINES,
+        path: Optional[str] = None,
+    ) -> int:
+        """Show a unified diff of the hunks, stopping after max_lines lines.
+
+        Hunks are read lazily, so a truncated diff of a diff_lines generator
+        is never computed past what is printed. Returns the number of diff
+        lines printed.
+        """
+        if path is None:
+            print("\nChanges made:")
+            print("--- before")
+            print("+++ after")
+        else:
+            print(f"--- a/{path}")
+            print(f"+++ b/{path}")
+
+        printed = 0
+        for group in _group_hunks(hunks):
+            for line in _format_group(old_lines, new_lines, group):
+                if printed == max_lines:
+                    print(f"... diff truncated after {max_lines} lines")
+                    return printed
                 print(line)
+                printed += 1
+        return printed
+
+
+def _stage_file(file_path: str, content: str) -> str:
+    """Write content to a temporary file next to file_path, with its mode"""
+    mode = os.stat(file_path).st_mode & 0o7777
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(file_path) or ".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.chmod(tmp_path, mode)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path
+
+
+def write_files_atomically(files: List[Tuple[str, str, str]]):
+    """Replace several files as one change: (path, new content, old content).
+
+    Every new version is written to a temporary file first, so a failure
+    there leaves all files untouched. If renaming one into place fails, the
+    files already replaced get their old content back before the error is
+    raised.
+    """
+    staged: List[Tuple[str, str]] = []
+    try:
+        for file_path, content, _ in files:
+            staged.append((file_path, _stage_file(file_path, content)))
+    except BaseException:
+        for _, tmp_path in staged:
+            os.unlink(tmp_path)
+        raise
+
+    done = 0
+    try:
+        for file_path, tmp_path in staged:
+            os.replace(tmp_path, file_path)
+            done += 1
+    except BaseException:
+        for _, tmp_path in staged[done:]:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+        for file_path, _, old_content in files[:done]:
+            os.replace(_stage_file(file_path, old_content), file_path)
+        raise
+
+
+def _group_hunks(hunks: Iterable[LineEdit]) -> Iterable[List[LineEdit]]:
+    """Hunks whose context would touch, shown as one block"""
+    group: List[LineEdit] = []
+    for hunk in hunks:
+        if group:
+            last = group[-1]
+            if hunk.old_start - (last.old_start + last.old_count) > 2 * DIFF_CONTEXT:
+                yield group
+                group = []
+        group.append(hunk)
+    if group:
+        yield group
+
+
+def _format_group(
+    old_lines: Sequence[str], new_lines: Sequence[str], group: List[LineEdit]
+) -> Iterable[str]:
+    """Header, context and changed lines of one block of hunks"""
+    first, last = group[0], group[-1]
+    old_from = max(0, first.old_start - DIFF_CONTEXT)
+    old_end = last.old_start + last.old_count
+    old_to = min(len(old_lines), old_end + DIFF_CONTEXT)
+    new_from = first.new_start - (first.old_start - old_from)
+    new_to = last.new_start + last.new_count + (old_to - old_end)
+    yield (
+        f"@@ -{_unified_range(old_from, old_to)} "
+        f"+{_unified_range(new_from, new_to)} @@"
+    )
+
+    position = old_from
+    for hunk in group:
+        for line in old_lines[position : hunk.old_start]:
+            yield f" {line}"
+        position = hunk.old_start + hunk.old_count
+        for line in old_lines[hunk.old_start : position]:
+            yield f"\033[91m-{line}\033[0m"  # Red for deletions
+        for line in new_lines[hunk.new_start : hunk.new_start + hunk.new_count]:
+            yield f"\033[92m+{line}\033[0m"  # Green for additions
+    for line in old_lines[position:old_to]:
+        yield f" {line}"
+
+
+def _unified_range(start: int, stop: int) -> str:
+    """Range of 0-based lines [start, stop) as written in a hunk header"""
+    length = stop - start
+    if length == 1:
+        return str(start + 1)
+    if length == 0:
+        # An empty range names the line before it
+        return f"{start},0"
+    return f"{start + 1},{length}"
@@ -0,0 +1,278 @@
+"""
+Ignore rules for the indexer: built-in defaults, .gitignore files and a
+project-level ignore file, compiled to regular expressions.
+"""
+
+import os
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Version control metadata, skipped whatever the ignore files say
+ALWAYS_IGNORED_DIRS = frozenset({".git", ".hg", ".svn"})
+
+# Directories that are rarely worth indexing; ignore files can re-include them
+DEFAULT_IGNORED_DIRS = frozenset(
+    {
+        ".git",
+        ".hg",
+        ".svn",
+        "node_modules",
+        "bower_components",
+        "venv",
+        ".venv",
+        "env",
+        "__pycache__",
+        ".mypy_cache",
+        ".pytest_cache",
+        ".ruff_cache",
+        ".tox",
+        ".nox",
+        "build",
+        "dist",
+        "target",
+        ".idea",
+        ".vscode",
+    }
+)
+
+# Project-level ignore file, in .gitignore syntax
+PROJECT_IGNORE_FILE = ".assistantignore"
+GITIGNORE_FILE = ".gitignore"
+
+DEFAULT_MAX_FILE_SIZE = 2 * 1024 * 1024
+# Bytes inspected when deciding whether a file is binary
+BINARY_SNIFF_BYTES = 8192
+
+
+def looks_binary(data) -> bool:
+    """Heuristic used by git: text files do not contain NUL characters"""
+    return "\0" in data[:BINARY_SNIFF_BYTES]
+
+
+def _translate(pattern: str) -> str:
+    """Translate a gitignore glob into a regex body"""
+    i = 0
+    n = len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**/", i):
+                out.append("(?:.*/)?")
+                i += 3
+                continue
+            if pattern.startswith("**", i):
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 2 if pattern[i + 1 : i + 2] in "!^" else i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1 : end]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                out.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class IgnoreRule:
+    """One line of an ignore file"""
+
+    __slots__ = ("regex", "negate", "dir_only")
+
+    def __init__(self, regex: str, negate: bool, dir_only: bool):
+        self.regex = regex
+        self.negate = negate
+        self.dir_only = dir_only
+
+
+def parse_ignore_lines(lines) -> List[IgnoreRule]:
+    """Parse lines in .gitignore syntax into rules"""
+    rules = []
+    for raw in lines:
+        line = raw.rstrip("\n")
+        if not line.endswith("\\ "):
+            line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\"):
+            line = line[1:]
+
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+
+        # A slash anywhere but the end anchors the pattern to its directory
+        anchored = "/" in line
+        body = _translate(line.lstrip("/"))
+        regex = f"^{body}$" if anchored else f"^(?:.*/)?{body}$"
+        rules.append(IgnoreRule(regex, negate, dir_only))
+    return rules
+
+
+class RuleSet:
+    """Rules of one ignore file, compiled for fast matching.
+
+    Without negations, order does not matter, so all rules are merged into
+    one alternation per kind (files and directories) and matched in a single
+    regex call. With negations, rules are matched in order and the last
+    matching rule decides.
+    """
+
+    def __init__(self, rules: List[IgnoreRule]):
+        self.rules = rules
+        self.ordered = any(rule.negate for rule in rules)
+        self._any: Optional[re.Pattern] = None
+        self._dirs: Optional[re.Pattern] = None
+        self._compiled: List[Tuple[re.Pattern, bool, bool]] = []
+
+        if self.ordered:
+            self._compiled = [
+                (re.compile(rule.regex), rule.negate, rule.dir_only) for rule in rules
+            ]
+        else:
+            self._any = self._merge([r.regex for r in rules if not r.dir_only])
+            self._dirs = self._merge([r.regex for r in rules if r.dir_only])
+
+    @staticmethod
+    def _merge(regexes: List[str]) -> Optional[re.Pattern]:
+        if not regexes:
+            return None
+        return re.compile("|".join(f"(?:{regex})" for regex in regexes))
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """True to ignore, False to re-include, None if no rule applies"""
+        if not self.ordered:
+            if self._any is not None and self._any.match(rel_path):
+                return True
+            if is_dir and self._dirs is not None and self._dirs.match(rel_path):
+                return True
+            return None
+
+        result = None
+        for regex, negate, dir_only in self._compiled:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                result = not negate
+        return result
+
+
+class IgnoreRules:
+    """Decides which files and directories the indexer skips.
+
+    Rules come from ``DEFAULT_IGNORED_DIRS``, the project ignore file and
+    every ``.gitignore`` in the tree; deeper files override shallower ones,
+    and every file overrides the defaults, so ``!target/`` re-includes a
+    default directory. ``walk`` prunes ignored directories before os.walk
+    descends into them.
+    """
+
+    def __init__(
+        self,
+        target_dir: str,
+        max_file_size: int = DEFAULT_MAX_FILE_SIZE,
+        use_gitignore: bool = True,
+    ):
+        self.target_dir = os.path.abspath(target_dir)
+        self.max_file_size = max_file_size
+        self.use_gitignore = use_gitignore
+        # directory relative to the project ("" for the root) -> its rules
+        self._rule_sets: Dict[str, List[RuleSet]] = {}
+
+    def reset(self):
+        """Forget loaded ignore files, e.g. after one of them changed"""
+        self._rule_sets = {}
+
+    def walk(self, start_dir: Optional[str] = None) -> Iterator[Tuple[str, List[str]]]:
+        """Yield (root, file names) like os.walk, skipping ignored entries"""
+        start_dir = os.path.abspath(start_dir or self.target_dir)
+        if start_dir != self.target_dir and self.is_ignored(
+            os.path.relpath(start_dir, self.target_dir), is_dir=True
+        ):
+            return
+
+        for root, dirs, files in os.walk(start_dir):
+            rel_root = os.path.relpath(root, self.target_dir)
+            rel_root = "" if rel_root == "." else rel_root
+
+            dirs[:] = [
+                d
+                for d in dirs
+                if not self._ignored_here(rel_root, d, is_dir=True)
+            ]
+            yield root, [
+                f for f in files if not self._ignored_here(rel_root, f, is_dir=False)
+            ]
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """Whether a path, or any directory above it, is ignored"""
+        parts = rel_path.replace(os.sep, "/").split("/")
+        parent = ""
+        for depth, name in enumerate(parts):
+            last = depth == len(parts) - 1
+            if self._ignored_here(parent, name, is_dir=is_dir if last else True):
+                return True
+            parent = f"{parent}/{name}" if parent else name
+        return False
+
+    def is_too_large(self, size: int) -> bool:
+        return self.max_file_size > 0 and size > self.max_file_size
+
+    def _ignored_here(self, parent: str, name: str, is_dir: bool) -> bool:
+        if is_dir and name in ALWAYS_IGNORED_DIRS:
+            return True
+
+        rel_path = f"{parent}/{name}" if parent else name
+        # The defaults come first, so any ignore file can override them
+        result = True if is_dir and name in DEFAULT_IGNORED_DIRS else None
+        # Walk from the root down so deeper ignore files win
+        base = ""
+        for component in [""] + (parent.split("/") if parent else []):
+            base = f"{base}/{component}" if base and component else component
+            local = rel_path[len(base) + 1 :] if base else rel_path
+            for rule_set in self._rules_for(base):
+                match = rule_set.match(local, is_dir)
+                if match is not None:
+                    result = match
+        return bool(result)
+
+    def _rules_for(self, rel_dir: str) -> List[RuleSet]:
+        rule_sets = self._rule_sets.get(rel_dir)
+        if rule_sets is not None:
+            return rule_sets
+
+        names = [GITIGNORE_FILE] if self.use_gitignore else []
+        if rel_dir == "":
+            names.append(PROJECT_IGNORE_FILE)
+
+        rule_sets = []
+        for name in names:
+            path = os.path.join(self.target_dir, rel_dir, name)
+            try:
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    rules = parse_ignore_lines(f)
+            except OSError:
+                continue
+            if rules:
+                rule_sets.append(RuleSet(rules))
+
+        self._rule_sets[rel_dir] = rule_sets
+        return rule_sets
@@ -0,0 +1,179 @@
+"""
+Persistent on-disk cache for the project index.
+"""
+
+import os
+import pickle
+import hashlib
+import tempfile
+from typing import Dict, List, Any, Optional
+
+from ..models.file_info import FileInfo
+
+# Bump whenever the layout of a cache entry or of FileInfo changes, or what
+# is extracted into them.
+CACHE_VERSION = 6
+
+
+def content_hash(content: str) -> str:
+    """Return a stable hash of a file's text content"""
+    return hashlib.sha1(content.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def default_cache_dir() -> str:
+    """Directory used for cache files when none is configured"""
+    return os.environ.get("CODE_ASSISTANT_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "code-assistant"
+    )
+
+
+class IndexCache:
+    """Index entries keyed by path, mtime, size and content hash.
+
+    The cache lives outside the project (see ``default_cache_dir``) so it is
+    never picked up by the indexer itself. Entries keep the extracted
+    structure and, unless content is loaded lazily, the file content, so an
+    unchanged file needs neither a read nor a parse on a warm start.
+    """
+
+    def __init__(self, target_dir: str, cache_dir: Optional[str] = None):
+        self.target_dir = os.path.abspath(target_dir)
+        cache_dir = cache_dir or default_cache_dir()
+        key = hashlib.sha1(self.target_dir.encode("utf-8")).hexdigest()[:16]
+        self.cache_path = os.path.join(cache_dir, f"index-{key}.pickle")
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._by_hash: Dict[str, str] = {}
+        self._dirty = False
+
+    def load(self):
+        """Load entries from disk, discarding them on any version mismatch"""
+        self.entries = {}
+        self._by_hash = {}
+        self._dirty = False
+
+        try:
+            with open(self.cache_path, "rb") as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable index cache: {str(e)}")
+            self._dirty = True
+            return
+
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != CACHE_VERSION
+            or data.get("target_dir") != self.target_dir
+        ):
+            # Format changed or cache belongs elsewhere: start from scratch
+            self._dirty = True
+            return
+
+        self.entries = data.get("entries", {})
+        for rel_path, entry in self.entries.items():
+            self._by_hash[entry["hash"]] = rel_path
+
+    def lookup(
+        self, rel_path: str, stat: os.stat_result, store=None
+    ) -> Optional[FileInfo]:
+        """Return the cached FileInfo if the file's mtime and size are unchanged.
+
+        With a content store the FileInfo reads its content lazily; without
+        one, entries written without content count as misses.
+        """
+        entry = self.entries.get(rel_path)
+        if entry is None:
+            return None
+        if entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            return None
+        if entry["content"] is None and store is None:
+            return None
+        return self._to_file_info(rel_path, entry, store)
+
+    def lookup_by_hash(self, hash_value: str) -> Optional[Dict[str, Any]]:
+        """Return the entry holding content with the given hash, if any"""
+        rel_path = self._by_hash.get(hash_value)
+        if rel_path is None:
+            return None
+        return self.entries.get(rel_path)
+
+    def known_hashes(self) -> set:
+        """Return the content hashes of all cached files"""
+        return set(self._by_hash)
+
+    def path_for_hash(self, hash_value: str) -> Optional[str]:
+        """Return the path of the cached file with the given content hash"""
+        return self._by_hash.get(hash_value)
+
+    def store(
+        self,
+        file_info: FileInfo,
+        stat: os.stat_result,
+        hash_value: str,
+    ):
+        """Record a freshly indexed file"""
+        self.entries[file_info.path] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "hash": hash_value,
+            "language": file_info.language,
+            "content": None if file_info.store else file_info.content,
+            "functions": file_info.functions,
+            "classes": file_info.classes,
+            "imports": file_info.imports,
+        }
+        self._by_hash[hash_value] = file_info.path
+        self._dirty = True
+
+    def prune(self, seen_paths: set) -> List[str]:
+        """Drop entries for files that no longer exist and return their paths"""
+        removed = [path for path in self.entries if path not in seen_paths]
+        for path in removed:
+            entry = self.entries.pop(path)
+            if self._by_hash.get(entry["hash"]) == path:
+                del self._by_hash[entry["hash"]]
+        if removed:
+            self._dirty = True
+        return removed
+
+    def save(self):
+        """Atomically write the cache to disk if anything changed"""
+        if not self._dirty:
+            return
+
+        cache_dir = os.path.dirname(self.cache_path)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(
+                        {
+                            "version": CACHE_VERSION,
+                            "target_dir": self.target_dir,
+                            "entries": self.entries,
+                        },
+                        f,
+                        protocol=pickle.HIGHEST_PROTOCOL,
+                    )
+                os.replace(tmp_path, self.cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._dirty = False
+        except Exception as e:
+            print(f"⚠️ Could not save index cache: {str(e)}")
+
+    def _to_file_info(self, rel_path: str, entry: Dict[str, Any], store) -> FileInfo:
+        file_info = FileInfo(
+            path=rel_path,
+            content=entry["content"],
+            language=entry["language"],
+            functions=entry["functions"],
+            classes=entry["classes"],
+            imports=entry["imports"],
+        )
+        if store is not None:
+            file_info.make_lazy(store)
+        return file_info
@@ -4,108 +4,597 @@ Tool for indexing and searching the project files.
 
 import os
 import re
-import ast
-from typing import Dict, List, Any
+import time
+import bisect
+import itertools
+import threading
+from typing import Dict, Iterator, List, Any, Optional, Sequence, Tuple
 
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from ..models.code_symbols import clear_interned_docstrings
 from ..models.file_info import FileInfo
+from .index_cache import IndexCache, content_hash
+from .content_store import ContentStore
+from .search_index import TrigramIndex, PATH_BLOCK
+from .symbols import SymbolTable
+from .dependency_graph import DependencyGraph
+from .semantic_index import SemanticIndex
+from .python_structure import parse_fragment, python_structure
+from .language_parsers import source_outline
+from .edits import LineEdit, LineShift
+from .result_stream import ResultPager, ResultStream
+from .tracing import tracer, traced
+from .ignore_rules import (
+    IgnoreRules,
+    DEFAULT_MAX_FILE_SIZE,
+    GITIGNORE_FILE,
+    PROJECT_IGNORE_FILE,
+    looks_binary,
+)
+
+
+# Files handed to a worker process per task, and tasks in flight per worker
+INDEX_CHUNK_SIZE = 64
+INDEX_QUEUE_DEPTH = 2
+# Below this many files to read, the pool startup costs more than it saves
+PARALLEL_MIN_FILES = 256
+
+# Matches printed by `find` and by each `more`
+FIND_PAGE_SIZE = 10
+
+# Lines that open a top-level definition; edits re-parse between these
+TOP_LEVEL_PREFIXES = ("def ", "async def ", "class ", "@")
+
+# Per-process state for indexing workers, set up by _init_index_worker
+_worker_indexer = None
+_worker_known_hashes = None
 
 
 class ProjectIndexer:
-    def __init__(self, target_dir: str):
+    def __init__(
+        self,
+        target_dir: str,
+        use_cache: bool = True,
+        workers: int = 1,
+        lazy_content: bool = False,
+        content_budget: int = 64 * 1024 * 1024,
+        max_file_size: int = DEFAULT_MAX_FILE_SIZE,
+        semantic_index: Optional[SemanticIndex] = None,
+    ):
         self.target_dir = target_dir
+        self.ignore_rules = IgnoreRules(target_dir, max_file_size=max_file_size)
+        self.cache = IndexCache(target_dir) if use_cache else None
+        # When set, FileInfo.content is read on demand instead of kept in memory
+        self.content_store = (
+            ContentStore(target_dir, content_budget) if lazy_content else None
+        )
+        # 1 = serial, 0 = one worker per CPU
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.search_index = TrigramIndex()
+        self.symbols = SymbolTable()
+        # Edited files whose symbols are refreshed on the next symbol lookup
+        self._stale_symbols = set()
+        self._symbols_lock = threading.Lock()
+        # Vectors of functions and classes for `search`, built on first use
+        if semantic_index is None:
+            semantic_index = SemanticIndex(target_dir)
+        self.semantic_index = semantic_index
+        self._stale_semantic = set()
+        self._semantic_lock = threading.Lock()
+        # Imports between files, for re-analyzing what depends on an edit
+        self.dependency_graph = DependencyGraph()
+        self._stale_dependencies = set()
+        self._dependency_lock = threading.Lock()
+        # Files added, edited or removed since take_changed_paths last ran
+        self._changed_paths = set()
+        self._changed_lock = threading.Lock()
+        # Bumped on every change, so held search results know they are stale
+        self.version = 0
+        # Rest of the last search's matches, read on `more`
+        self.pager = ResultPager()
 
+    @traced("index.project")
     def index_project(self) -> Dict[str, FileInfo]:
         """Index all files in the project directory"""
         print("🔍 Indexing project files and structure...")
+        # Records loaded or parsed below share their docstrings again
+        clear_interned_docstrings()
 
-        # Get all files in the project directory
-        all_files = []
-        for root, _, files in os.walk(self.target_dir):
-            for file in files:
-                # Skip hidden files and directories
-                if file.startswith(".") or "/.git/" in root:
+        if self.cache:
+            with tracer.span("index.cache_load"):
+                self.cache.load()
+
+        slots = []
+        pending = []
+        seen_paths = set()
+        reused = 0
+        too_large = 0
+
+        with tracer.span("index.walk"):
+            for rel_path, file_path, language in self._iter_project_files():
+                try:
+                    stat = os.stat(file_path)
+                except OSError as e:
+                    print(f"⚠️ Error indexing {rel_path}: {str(e)}")
                     continue
 
-                file_path = os.path.join(root, file)
-                rel_path = os.path.relpath(file_path, self.target_dir)
+                if self.ignore_rules.is_too_large(stat.st_size):
+                    too_large += 1
+                    continue
 
-                # Determine file language based on extension
-                _, ext = os.path.splitext(file)
-                language = self.get_language_from_extension(ext)
+                seen_paths.add(rel_path)
 
-                if language:  # Only index files with recognized languages
-                    try:
-                        with open(file_path, "r", encoding="utf-8") as f:
-                            content = f.read()
+                # Unchanged since the last run: no read, no parse
+                if self.cache:
+                    file_info = self.cache.lookup(rel_path, stat, self.content_store)
+                    if file_info is not None:
+                        slots.append(file_info)
+                        reused += 1
+                        continue
 
-                        file_info = FileInfo(
-                            path=rel_path, content=content, language=language
-                        )
+                pending.append((len(slots), stat, (rel_path, file_path, language)))
+                slots.append(None)
 
-                        # Extract code structure for Python files
-                        if language == "python":
-                            self.extract_python_structure(file_info)
+        known_hashes = self.cache.known_hashes() if self.cache else None
+        tasks = [task for _, _, task in pending]
+        with tracer.span("index.load", files=len(tasks)):
+            if self.workers > 1 and len(tasks) >= PARALLEL_MIN_FILES:
+                loaded = self._load_files_parallel(tasks, known_hashes)
+            else:
+                loaded = [_load_file(task, self, known_hashes) for task in tasks]
+        tracer.add("index.files_cached", reused)
+        tracer.add("index.files_read", len(tasks))
+        tracer.add(
+            "index.bytes_read",
+            sum(len(result[0].content) for result in loaded if result[0] is not None),
+        )
 
-                        all_files.append(file_info)
+        moved_from = []
+        for (slot, stat, (rel_path, _, language)), result in zip(pending, loaded):
+            file_info, hash_value, parsed, error = result
+            if error:
+                print(f"⚠️ Error indexing {rel_path}: {error}")
+                continue
+            if file_info is None:
+                # Binary file
+                continue
 
-                    except Exception as e:
-                        print(f"⚠️ Error indexing {rel_path}: {str(e)}")
+            if self.cache:
+                entry = self.cache.lookup_by_hash(hash_value)
+                if entry is not None and entry["language"] == language:
+                    # Touched or renamed file with known content: reuse structure
+                    old_path = self.cache.path_for_hash(hash_value)
+                    if old_path != rel_path:
+                        moved_from.append(old_path)
+                    file_info.functions = entry["functions"]
+                    file_info.classes = entry["classes"]
+                    file_info.imports = entry["imports"]
+                elif not parsed:
+                    self.extract_structure(file_info, hash_value)
 
-        # Store indexed files
-        project_index = {file.path: file for file in all_files}
-        print(f"✅ Indexed {len(project_index)} files")
+            if self.content_store is not None:
+                file_info.make_lazy(self.content_store)
+            if self.cache:
+                self.cache.store(file_info, stat, hash_value)
+
+            slots[slot] = file_info
+
+        # Store indexed files, in walk order regardless of how they were loaded
+        project_index = {file.path: file for file in slots if file is not None}
+
+        if self.cache:
+            removed = set(self.cache.prune(seen_paths))
+            # A removed path whose content reappeared elsewhere was renamed
+            renamed = removed.intersection(moved_from)
+            deleted = removed - renamed
+            with tracer.span("index.cache_save"):
+                self.cache.save()
+            print(
+                f"✅ Indexed {len(project_index)} files "
+                f"({reused} cached, {len(pending)} read, {len(renamed)} renamed, "
+                f"{len(deleted)} deleted)"
+            )
+        else:
+            print(f"✅ Indexed {len(project_index)} files")
+        if too_large:
+            print(
+                f"⚠️ Skipped {too_large} files larger than "
+                f"{self.ignore_rules.max_file_size // 1024} KB"
+            )
+
+        if self.content_store is None:
+            with tracer.span("index.search_build"):
+                self.search_index.build(project_index)
+            print(f"🔎 Search index: {self.search_index.describe()}")
+        else:
+            # Building needs every file's content: defer it to the first search
+            self.search_index.ready = False
+        # Built on first use by get_symbols, then kept up to date
+        self.symbols.ready = False
+        self.semantic_index.ready = False
+        self.dependency_graph.ready = False
+        with self._changed_lock:
+            self._changed_paths.clear()
+            self.version += 1
         return project_index
 
-    def extract_python_structure(self, file_info: FileInfo):
-        """Extract functions, classes and imports from Python files"""
+    def get_symbols(self, project_index: Dict[str, FileInfo]) -> SymbolTable:
+        """Return the symbol table, building it on first use"""
+        with self._symbols_lock:
+            if not self.symbols.ready:
+                print("🔍 Building symbol table...")
+                with tracer.span("index.symbols_build"):
+                    self.symbols.build(project_index)
+                self._stale_symbols.clear()
+            for path in self._stale_symbols:
+                file_info = project_index.get(path)
+                if file_info is not None:
+                    self.symbols.update_file(file_info)
+            self._stale_symbols.clear()
+        return self.symbols
+
+    def get_semantic_index(self, project_index: Dict[str, FileInfo]) -> SemanticIndex:
+        """Return the semantic index, embedding symbols on first use"""
+        with self._semantic_lock:
+            if not self.semantic_index.ready:
+                print("🧠 Embedding functions and classes...")
+                self.semantic_index.build(project_index)
+                self._stale_semantic.clear()
+                print(f"🧠 Semantic index: {self.semantic_index.describe()}")
+            for path in self._stale_semantic:
+                file_info = project_index.get(path)
+                if file_info is not None:
+                    self.semantic_index.update_file(file_info)
+            self._stale_semantic.clear()
+            self.semantic_index.save_if_changed()
+        return self.semantic_index
+
+    def get_dependency_graph(
+        self, project_index: Dict[str, FileInfo]
+    ) -> DependencyGraph:
+        """Return the import dependency graph, building it on first use"""
+        with self._dependency_lock:
+            if not self.dependency_graph.ready:
+                with tracer.span("index.dependencies_build"):
+                    self.dependency_graph.build(project_index)
+                self._stale_dependencies.clear()
+            for path in self._stale_dependencies:
+                file_info = project_index.get(path)
+                if file_info is not None:
+                    self.dependency_graph.update_file(file_info)
+            self._stale_dependencies.clear()
+        return self.dependency_graph
+
+    def take_changed_paths(self) -> List[str]:
+        """Files changed since the last call, for dependency re-analysis"""
+        with self._changed_lock:
+            changed = sorted(self._changed_paths)
+            self._changed_paths.clear()
+        return changed
+
+    def _mark_changed(self, path: str):
+        with self._changed_lock:
+            self._changed_paths.add(path)
+            self.version += 1
+        if self.dependency_graph.ready:
+            self._stale_dependencies.add(path)
+
+    def _load_files_parallel(self, tasks: List[tuple], known_hashes) -> List[tuple]:
+        """Read and parse files on a process pool, keeping the input order"""
+        chunks = [
+            tasks[i : i + INDEX_CHUNK_SIZE]
+            for i in range(0, len(tasks), INDEX_CHUNK_SIZE)
+        ]
+        results = [None] * len(chunks)
+        max_in_flight = self.workers * INDEX_QUEUE_DEPTH
+
+        print(f"⚙️ Indexing {len(tasks)} files with {self.workers} workers...")
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_index_worker,
+            initargs=(self.target_dir, known_hashes),
+        ) as pool:
+            in_flight = {}
+            next_chunk = 0
+            while next_chunk < len(chunks) or in_flight:
+                # Keep the queue bounded so results don't pile up in memory
+                while next_chunk < len(chunks) and len(in_flight) < max_in_flight:
+                    future = pool.submit(_load_chunk, chunks[next_chunk])
+                    in_flight[future] = next_chunk
+                    next_chunk += 1
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[in_flight.pop(future)] = future.result()
+
+        return [result for chunk in results for result in chunk]
+
+    @traced("index.refresh")
+    def refresh_paths(
+        self, project_index: Dict[str, FileInfo], rel_paths
+    ) -> Tuple[int, int]:
+        """Bring the index up to date for changed files or directories.
+
+        Each path may name a file or a directory that was created, modified,
+        deleted or moved. Returns the number of updated and removed entries.
+        """
+        updated = 0
+        removed = 0
+        rel_paths = set(rel_paths)
+
+        # A changed ignore file can hide or reveal anything below it
+        for rel_path in list(rel_paths):
+            if os.path.basename(rel_path) in (GITIGNORE_FILE, PROJECT_IGNORE_FILE):
+                self.ignore_rules.reset()
+                rel_paths.add(os.path.dirname(rel_path) or ".")
+
+        for rel_path in sorted(rel_paths):
+            full_path = os.path.normpath(os.path.join(self.target_dir, rel_path))
+
+            if os.path.isdir(full_path) and not self.ignore_rules.is_ignored(
+                rel_path, is_dir=True
+            ):
+                present = set()
+                for sub_rel, sub_full, language in self._iter_project_files(
+                    full_path
+                ):
+                    present.add(sub_rel)
+                    if self._refresh_file(project_index, sub_rel, sub_full, language):
+                        updated += 1
+                # Drop files that vanished from the directory
+                prefix = "" if rel_path == "." else rel_path.rstrip(os.sep) + os.sep
+                for path in list(project_index):
+                    if path.startswith(prefix) and path not in present:
+                        self.remove_from_index(project_index, path)
+                        removed += 1
+                continue
+
+            language = self._language_for(full_path)
+            if (
+                language
+                and os.path.isfile(full_path)
+                and not self.ignore_rules.is_ignored(rel_path)
+            ):
+                if self._refresh_file(project_index, rel_path, full_path, language):
+                    updated += 1
+                continue
+
+            # Deleted file, or a deleted directory and everything below it
+            prefix = rel_path.rstrip(os.sep) + os.sep
+            for path in list(project_index):
+                if path == rel_path or path.startswith(prefix):
+                    self.remove_from_index(project_index, path)
+                    removed += 1
+
+        return updated, removed
+
+    def _refresh_file(
+        self,
+        project_index: Dict[str, FileInfo],
+        rel_path: str,
+        file_path: str,
+        language: str,
+    ) -> bool:
+        """Re-read a single file into the index, returning True if it changed"""
         try:
-            tree = ast.parse(file_info.content)
-
-            # Extract imports
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for name in node.names:
-                        file_info.imports.append(f"import {name.name}")
-                elif isinstance(node, ast.ImportFrom):
-                    module = node.module or ""
-                    for name in node.names:
-                        file_info.imports.append(f"from {module} import {name.name}")
-
-            # Extract functions
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    func_info = {
-                        "name": node.name,
-                        "line": node.lineno,
-                        "args": [arg.arg for arg in node.args.args],
-                        "docstring": ast.get_docstring(node) or "",
-                    }
-                    file_info.functions.append(func_info)
-
-                # Extract classes
-                elif isinstance(node, ast.ClassDef):
-                    class_methods = []
-                    for item in node.body:
-                        if isinstance(item, ast.FunctionDef):
-                            method_info = {
-                                "name": item.name,
-                                "line": item.lineno,
-                                "args": [arg.arg for arg in item.args.args],
-                                "docstring": ast.get_docstring(item) or "",
-                            }
-                            class_methods.append(method_info)
-
-                    class_info = {
-                        "name": node.name,
-                        "line": node.lineno,
-                        "methods": class_methods,
-                        "docstring": ast.get_docstring(node) or "",
-                    }
-                    file_info.classes.append(class_info)
-
-        except SyntaxError:
+            if self.ignore_rules.is_too_large(os.path.getsize(file_path)):
+                return False
+            with open(file_path, "r", encoding="utf-8") as f:
+                content = f.read()
+        except Exception as e:
+            print(f"⚠️ Error indexing {rel_path}: {str(e)}")
+            return False
+        if looks_binary(content):
+            return False
+
+        existing = project_index.get(rel_path)
+        if (
+            existing is not None
+            and not existing.is_lazy
+            and existing.content == content
+        ):
+            return False
+
+        file_info = FileInfo(path=rel_path, content=content, language=language)
+        self.extract_structure(file_info)
+        self.add_to_index(project_index, file_info)
+        return True
+
+    def add_to_index(self, project_index: Dict[str, FileInfo], file_info: FileInfo):
+        """Store a new or updated file and keep derived indexes in sync"""
+        if self.content_store is not None and file_info.store is None:
+            file_info.make_lazy(self.content_store)
+        project_index[file_info.path] = file_info
+        if self.search_index.ready:
+            self.search_index.update_file(file_info.path, file_info.content)
+        if self.symbols.ready:
+            self.symbols.update_file(file_info)
+            self._stale_symbols.discard(file_info.path)
+        if self.semantic_index.ready:
+            self._stale_semantic.add(file_info.path)
+        self._mark_changed(file_info.path)
+
+    @traced("index.apply_edit")
+    def apply_edit(
+        self,
+        file_info: FileInfo,
+        content: str,
+        old_lines: Sequence[str],
+        new_lines: Sequence[str],
+        hunks: List[LineEdit],
+    ):
+        """Update an indexed file after an edit, touching only what changed.
+
+        The search index is spliced around the hunks, Python structure is
+        re-extracted only for the top-level blocks containing them (other
+        languages are outlined again in full), and the symbol table catches
+        up on the next symbol lookup.
+        """
+        file_info.content = content
+        if file_info.language != "python" or not self._reextract_regions(
+            file_info, old_lines, new_lines, hunks
+        ):
+            file_info.functions = []
+            file_info.classes = []
+            file_info.imports = []
+            self.extract_structure(file_info)
+
+        if self.search_index.ready:
+            self.search_index.splice_file(file_info.path, content, hunks)
+        if self.symbols.ready:
+            self._stale_symbols.add(file_info.path)
+        if self.semantic_index.ready:
+            self._stale_semantic.add(file_info.path)
+        self._mark_changed(file_info.path)
+
+    def _reextract_regions(
+        self,
+        file_info: FileInfo,
+        old_lines: Sequence[str],
+        new_lines: Sequence[str],
+        hunks: List[LineEdit],
+    ) -> bool:
+        """Re-parse only the top-level blocks around each hunk.
+
+        Returns False when the whole file has to be re-extracted instead:
+        when imports may have changed, a block does not parse on its own or
+        the file has no structure yet (it may not have parsed before).
+        """
+        if not new_lines or not hunks:
+            return False
+        if not (file_info.functions or file_info.classes or file_info.imports):
+            return False
+
+        # (new start, new stop, old start, old stop), 0-based and merged
+        regions: List[Tuple[int, int, int, int]] = []
+        for hunk in hunks:
+            new_start = _top_level_start(new_lines, hunk.new_start - 1)
+            if regions and new_start <= regions[-1][1]:
+                new_start, _, old_start, _ = regions.pop()
+            else:
+                old_start = hunk.old_start - (hunk.new_start - new_start)
+            new_end = hunk.new_start + hunk.new_count
+            new_stop = _top_level_stop(new_lines, max(new_end, new_start + 1))
+            # Take in the next block while the hunk reaches its decorators or
+            # the blank and comment lines above them
+            while new_stop < len(new_lines):
+                block_start = _top_level_start(new_lines, new_stop)
+                gap_start = _gap_start(new_lines, block_start)
+                if block_start > new_end and gap_start >= new_end:
+                    break
+                new_stop = _top_level_stop(new_lines, new_stop + 1)
+            old_stop = hunk.old_start + hunk.old_count + (new_stop - new_end)
+            regions.append((new_start, new_stop, old_start, old_stop))
+
+        parsed_regions = []
+        for new_start, new_stop, old_start, old_stop in regions:
+            if any(
+                "import " in line
+                for line in itertools.chain(
+                    old_lines[old_start:old_stop], new_lines[new_start:new_stop]
+                )
+            ):
+                return False
+            parsed = parse_fragment("\n".join(new_lines[new_start:new_stop]))
+            if parsed.error is not None:
+                return False
+            parsed_regions.append((new_start, parsed.structure))
+
+        # Records inside a region are replaced, the others only move
+        region_starts = [old_start for _, _, old_start, _ in regions]
+        shift = LineShift(hunks)
+
+        def relocate(records):
+            kept = []
+            for record in records:
+                line = record.line - 1
+                region = bisect.bisect_right(region_starts, line) - 1
+                if region >= 0 and line < regions[region][3]:
+                    continue
+                delta = shift(line)
+                kept.append(record.moved(delta) if delta else record)
+            return kept
+
+        functions = relocate(file_info.functions)
+        classes = relocate(file_info.classes)
+        for new_start, structure in parsed_regions:
+            functions.extend(f.moved(new_start) for f in structure.functions)
+            classes.extend(c.moved(new_start) for c in structure.classes)
+
+        file_info.functions = sorted(functions, key=lambda f: f.line)
+        file_info.classes = sorted(classes, key=lambda c: c.line)
+        return True
+
+    def remove_from_index(self, project_index: Dict[str, FileInfo], rel_path: str):
+        """Drop a file from the index and every index derived from it"""
+        self._stale_symbols.discard(rel_path)
+        self._stale_semantic.discard(rel_path)
+        self._stale_dependencies.discard(rel_path)
+        with self._changed_lock:
+            self._changed_paths.add(rel_path)
+            self.version += 1
+            # Once it is gone the graph no longer knows who imported it
+            self._changed_paths.update(
+                self.dependency_graph.dependents.get(rel_path, ())
+            )
+        project_index.pop(rel_path, None)
+        self.search_index.remove_file(rel_path)
+        self.symbols.remove_file(rel_path)
+        self.semantic_index.remove_file(rel_path)
+        self.dependency_graph.remove_file(rel_path)
+
+    def _iter_project_files(self, start_dir: str = None):
+        """Yield (rel_path, full_path, language) for every indexable file"""
+        for root, files in self.ignore_rules.walk(start_dir):
+            for file in files:
+                file_path = os.path.join(root, file)
+                language = self._language_for(file_path)
+
+                if language:  # Only index files with recognized languages
+                    rel_path = os.path.relpath(file_path, self.target_dir)
+                    yield rel_path, file_path, language
+
+    def _language_for(self, file_path: str) -> str:
+        """Language of an indexable file, or "" if the file is skipped"""
+        file = os.path.basename(file_path)
+
+        # Skip hidden files; ignored directories are handled by ignore_rules
+        if file.startswith("."):
+            return ""
+
+        # Determine file language based on extension
+        _, ext = os.path.splitext(file)
+        return self.get_language_from_extension(ext)
+
+    def extract_structure(
+        self, file_info: FileInfo, hash_value: Optional[str] = None
+    ):
+        """Extract functions, classes and imports in any language with a parser"""
+        if file_info.language == "python":
+            self.extract_python_structure(file_info, hash_value)
+            return
+        with tracer.span("index.outline", language=file_info.language):
+            outline = source_outline(file_info.language, file_info.content, hash_value)
+        if outline is None:
+            return
+        file_info.imports.extend(outline.imports)
+        file_info.functions.extend(outline.functions)
+        file_info.classes.extend(outline.classes)
+
+    def extract_python_structure(
+        self, file_info: FileInfo, hash_value: Optional[str] = None
+    ):
+        """Extract functions, classes and imports from Python files"""
+        with tracer.span("index.parse"):
+            structure, error = python_structure(file_info.content, hash_value)
+        if error is not None:
             # Handle syntax errors in Python files
-            pass
+            return
+
+        file_info.imports.extend(structure.imports)
+        file_info.functions.extend(structure.functions)
+        file_info.classes.extend(structure.classes)
 
     def get_language_from_extension(self, ext: str) -> str:
         """Map file extension to programming language"""
@@ -134,27 +623,157 @@ class ProjectIndexer:
         return extension_map.get(ext.lower(), "")
 
     def find_in_codebase(self, project_index: Dict[str, FileInfo], query: str):
-        """Search for code or files in the project"""
+        """Search for code or files in the project.
+
+        Queries wrapped in slashes (``/pattern/``) are treated as regular
+        expressions; anything else is a case-insensitive substring.
+        """
         print(f"🔍 Searching for '{query}'...")
 
-        results = []
-        for file_path, file_info in project_index.items():
-            if query.lower() in file_path.lower():
-                results.append(f"File: {file_path}")
-
-            # Search in file content
-            if query.lower() in file_info.content.lower():
-                lines = file_info.content.split("\n")
-                for i, line in enumerate(lines):
-                    if query.lower() in line.lower():
-                        results.append(f"{file_path}:{i+1}: {line.strip()}")
-
-        if results:
-            print(f"Found {len(results)} matches:")
-            for result in results[:10]:  # Limit to 10 results
-                print(f"  {result}")
-
-            if len(results) > 10:
-                print(f"  ... and {len(results) - 10} more matches")
+        if not self.search_index.ready:
+            self.search_index.build(project_index)
+            print(f"🔎 Search index: {self.search_index.describe()}")
+
+        tracer.add("search.queries")
+        started = time.perf_counter()
+        if len(query) > 2 and query.startswith("/") and query.endswith("/"):
+            matches = self.search_index.search_regex(project_index, query[1:-1])
         else:
+            matches = self.search_index.search(project_index, query)
+        # Matches are printed as they are found, and the search stops once a
+        # page is full; `more` resumes it from there
+        results = ResultStream(self._format_matches(matches))
+        with tracer.span("search.print"):
+            try:
+                shown = results.print_page(FIND_PAGE_SIZE)
+            except re.error as e:
+                print(f"❌ Invalid regular expression: {str(e)}")
+                self.pager.clear()
+                return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if not shown:
             print("No matches found")
+        elif results.exhausted():
+            print(f"Found {shown} matches in {elapsed_ms:.1f} ms")
+        else:
+            print(
+                f"Found {shown}+ matches in {elapsed_ms:.1f} ms, type 'more' for "
+                f"the next {FIND_PAGE_SIZE}"
+            )
+        self.pager.hold(results, self.version)
+
+    def show_more(self, count: int = FIND_PAGE_SIZE):
+        """Print the next matches of the last search"""
+        self.pager.more(count, self.version)
+
+    def semantic_search(
+        self, project_index: Dict[str, FileInfo], query: str, limit: int = 10
+    ):
+        """Show the functions and classes closest in meaning to a query"""
+        if not query.strip():
+            print("❌ Usage: search <description>")
+            return
+        semantic_index = self.get_semantic_index(project_index)
+
+        started = time.perf_counter()
+        results = semantic_index.search(query, limit)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if not results:
+            print(f"No symbols match '{query}'")
+            return
+        print(
+            f"🧠 Top {len(results)} of {len(semantic_index):,} symbols for "
+            f"'{query}' ({elapsed_ms:.1f} ms):"
+        )
+        for score, (path, line, kind, qualname, summary) in results:
+            print(f"  {score:.2f}  {path}:{line}  {kind} {qualname}")
+            if summary:
+                print(f"        {summary}")
+
+    def _format_matches(self, matches) -> Iterator[str]:
+        for file_path, line, text in matches:
+            if line == PATH_BLOCK:
+                yield f"File: {file_path}"
+            else:
+                yield f"{file_path}:{line}: {text}"
+
+
+def _top_level_start(lines: Sequence[str], index: int) -> int:
+    """Start of the top-level definition containing lines[index], or 0.
+
+    The start is the first of its decorators, which may be separated by
+    blank or comment lines and span several lines each.
+    """
+    index = max(0, min(index, len(lines) - 1))
+    while index > 0 and not lines[index].startswith(TOP_LEVEL_PREFIXES):
+        index -= 1
+    above = index - 1
+    while above >= 0:
+        line = lines[above]
+        if line.startswith("@"):
+            index = above
+        elif line[:1] not in ("", " ", "\t", "#", ")", "]", "}"):
+            # Top-level code that is not part of a decorator
+            break
+        # Blank, comment or continuation line: keep looking for a decorator
+        above -= 1
+    return index
+
+
+def _gap_start(lines: Sequence[str], index: int) -> int:
+    """First of the blank and top-level comment lines just above lines[index]"""
+    while index > 0 and (not lines[index - 1].strip() or lines[index - 1][:1] == "#"):
+        index -= 1
+    return index
+
+
+def _top_level_stop(lines: Sequence[str], index: int) -> int:
+    """First top-level definition at or after index, or len(lines)"""
+    while index < len(lines) and not lines[index].startswith(TOP_LEVEL_PREFIXES):
+        index += 1
+    return index
+
+
+def _init_index_worker(target_dir: str, known_hashes):
+    """Set up per-process state used by _load_chunk"""
+    global _worker_indexer, _worker_known_hashes
+    _worker_indexer = ProjectIndexer(target_dir, use_cache=False)
+    _worker_known_hashes = known_hashes
+
+
+def _load_file(task: tuple, indexer: "ProjectIndexer", known_hashes) -> tuple:
+    """Read one file and extract its structure.
+
+    Returns (file_info, content_hash, parsed, error), with no file_info for
+    binary files. The hash is only computed when a cache is in use, and files
+    whose hash the cache already knows are not parsed since their structure
+    will be reused.
+    """
+    rel_path, file_path, language = task
+    try:
+        with tracer.span("index.read"):
+            with open(file_path, "r", encoding="utf-8") as f:
+                content = f.read()
+    except Exception as e:
+        return None, None, False, str(e)
+    if looks_binary(content):
+        return None, None, False, None
+
+    file_info = FileInfo(path=rel_path, content=content, language=language)
+    hash_value = None
+    if known_hashes is not None:
+        hash_value = content_hash(content)
+        if hash_value in known_hashes:
+            return file_info, hash_value, False, None
+
+    # Extract code structure for every language with a parser
+    indexer.extract_structure(file_info, hash_value)
+    return file_info, hash_value, True, None
+
+
+def _load_chunk(tasks: List[tuple]) -> List[tuple]:
+    return [
+        _load_file(task, _worker_indexer, _worker_known_hashes) for task in tasks
+    ]
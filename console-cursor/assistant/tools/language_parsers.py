@@ -0,0 +1,627 @@
+"""
+Outline parsers for languages other than Python: functions, classes and
+imports extracted with declaration patterns and block tracking.
+"""
+
+import re
+from typing import Callable, Dict, List, Optional, Pattern, Sequence, Tuple
+
+from ..models.code_symbols import FunctionInfo, ClassInfo
+from .index_cache import content_hash
+from .analysis_cache import analysis_cache
+
+# Bump whenever a parser changes what it extracts, so cached outlines are
+# recomputed
+OUTLINE_VERSION = 2
+# Lines joined to complete a signature whose parameters span several lines
+MAX_SIGNATURE_LINES = 8
+
+analysis_cache.register("outline")
+
+
+class SourceOutline:
+    """Functions, classes and imports of one file, as stored on FileInfo"""
+
+    __slots__ = ("imports", "functions", "classes")
+
+    def __init__(
+        self,
+        imports: List[str],
+        functions: List[FunctionInfo],
+        classes: List[ClassInfo],
+    ):
+        # "import x" / "use x" strings, one per import
+        self.imports = imports
+        # Every function and method at any depth
+        self.functions = functions
+        # Classes, interfaces, structs, enums, traits and modules, with their
+        # direct methods
+        self.classes = classes
+
+
+# language -> parse(content) -> SourceOutline
+LANGUAGE_PARSERS: Dict[str, Callable[[str], SourceOutline]] = {}
+
+
+def language_parser(*languages: str):
+    """Register ``parse(content)`` as the outline parser of languages"""
+
+    def register(parse: Callable[[str], SourceOutline]):
+        for language in languages:
+            LANGUAGE_PARSERS[language] = parse
+        return parse
+
+    return register
+
+
+def source_outline(
+    language: str, content: str, hash_value: Optional[str] = None
+) -> Optional[SourceOutline]:
+    """Outline of a file, reused across sessions, or None without a parser"""
+    parse = LANGUAGE_PARSERS.get(language)
+    if parse is None:
+        return None
+    return analysis_cache.get_or_compute(
+        "outline",
+        f"{OUTLINE_VERSION}-{language}",
+        hash_value or content_hash(content),
+        lambda: parse(content),
+    )
+
+
+class Grammar:
+    """Declaration patterns of one language.
+
+    Patterns are matched against the start of each line once comments are
+    removed and string literals no longer hold brackets. ``functions`` and
+    ``methods`` capture a name in group "name", parameters in "args" and,
+    for methods defined outside their type (Go receivers), the type in
+    "owner". Methods are only looked for directly inside a container body,
+    functions at any depth. ``containers`` capture the name of a class-like
+    declaration in group 1 and ``owners`` the type a block adds methods to
+    (a Rust ``impl``). ``imports`` pairs a keyword with a pattern capturing
+    the imported module over the whole file.
+    """
+
+    def __init__(
+        self,
+        lexer: str,
+        imports: Sequence[Tuple[str, str]] = (),
+        functions: Sequence[str] = (),
+        methods: Sequence[str] = (),
+        containers: Sequence[str] = (),
+        owners: Sequence[str] = (),
+        arg_name: str = r"([A-Za-z_$][\w$]*)",
+        doc_prefixes: Tuple[str, ...] = ("//",),
+        decorator_prefix: str = "@",
+        reserved: Sequence[str] = (),
+        blocks: str = "braces",
+    ):
+        self.lexer = re.compile(lexer, re.S)
+        self.imports = [
+            (keyword, re.compile(pattern, re.M)) for keyword, pattern in imports
+        ]
+        self.functions = [re.compile(pattern) for pattern in functions]
+        self.methods = [re.compile(pattern) for pattern in methods]
+        self.containers = [re.compile(pattern) for pattern in containers]
+        self.owners = [re.compile(pattern) for pattern in owners]
+        # Lines that may start a declaration, found in one pass over the file
+        self.candidates = re.compile(
+            r"^[ \t]*(?:"
+            + "|".join(
+                _GROUP_NAME.sub("(?:", pattern)
+                for pattern in (*functions, *methods, *containers, *owners)
+            )
+            + ")",
+            re.M,
+        )
+        self.arg_name = re.compile(arg_name)
+        self.doc_prefixes = doc_prefixes
+        self.decorator_prefix = decorator_prefix
+        self.reserved = frozenset(reserved)
+        # "braces", or "end" for languages closing blocks with an end keyword
+        self.blocks = blocks
+
+
+_GROUP_NAME = re.compile(r"\(\?P<\w+>")
+
+
+class _Container:
+    """A class-like block being scanned"""
+
+    __slots__ = ("name", "line", "depth", "opened", "owner", "methods", "doc")
+
+    def __init__(self, name: str, line: int, depth: int, owner: bool, doc):
+        self.name = name
+        self.line = line
+        # Block depth around the declaration; members are at depth + 1
+        self.depth = depth
+        self.opened = False
+        # Adds methods to a type declared elsewhere instead of declaring one
+        self.owner = owner
+        self.methods: List[FunctionInfo] = []
+        self.doc = doc
+
+
+_QUOTED = re.compile(r"\"([^\"\n]+)\"")
+
+# Lines of Ruby-like languages that open a block closed by "end"
+_END_OPENERS = re.compile(
+    r"(?:(?:class|module|if|unless|while|until|case|begin|for)\b"
+    r"|def\b(?!\s*[^\s(]+(?:\([^)]*\))?\s*=[^=~>])"
+    r"|.*\bdo(?:\s*\|[^|]*\|)?\s*$)"
+)
+_END_CLOSER = re.compile(r"\bend\b")
+
+
+def parse_outline(grammar: Grammar, content: str) -> SourceOutline:
+    """Outline of a file, scanning it once line by line"""
+    code = grammar.lexer.sub(_blank, content)
+    imports = []
+    for keyword, pattern in grammar.imports:
+        for match in pattern.finditer(code):
+            # A block such as Go's import (...) lists several quoted modules
+            modules = _QUOTED.findall(match.group(1)) or [match.group(1)]
+            imports.extend(f"{keyword} {' '.join(m.split())}" for m in modules)
+    raw_lines = content.split("\n")
+    lines = code.split("\n")
+    candidates = set()
+    line_number = 0
+    position = 0
+    search_from = 0
+    while True:
+        match = grammar.candidates.search(code, search_from)
+        if match is None:
+            break
+        line_number += code.count("\n", position, match.start())
+        position = match.start()
+        line_end = code.find("\n", position)
+        if line_end == -1:
+            line_end = len(code)
+        # A match running on into later lines (through a \s) may start on a
+        # line that is not a declaration, and would hide the lines it spans
+        if match.end() <= line_end or grammar.candidates.match(lines[line_number]):
+            candidates.add(line_number)
+        search_from = line_end + 1
+        if search_from > len(code):
+            break
+
+    functions: List[FunctionInfo] = []
+    classes: List[ClassInfo] = []
+    owned: Dict[str, List[FunctionInfo]] = {}
+    # Open containers, innermost last
+    stack: List[_Container] = []
+
+    def close(container: _Container):
+        if container.owner:
+            owned.setdefault(container.name, []).extend(container.methods)
+            return
+        docstring, decorators = container.doc
+        classes.append(
+            ClassInfo(
+                container.name,
+                container.line,
+                container.methods,
+                docstring,
+                decorators,
+            )
+        )
+
+    depth = 0
+    for index, line in enumerate(lines):
+        stripped = line.strip()
+        if grammar.blocks == "braces":
+            change = line.count("{") - line.count("}")
+        elif not stripped:
+            change = 0
+        elif _END_CLOSER.match(stripped):
+            change = -1
+        else:
+            change = 1 if _END_OPENERS.match(stripped) else 0
+            # One-line blocks such as "def x; end" open and close at once
+            change -= len(_END_CLOSER.findall(stripped[1:])) if change else 0
+
+        if stripped and index in candidates and stripped[0] not in "})]":
+            inside = stack[-1] if stack and stack[-1].opened else None
+            found = None
+            if inside is not None and depth == inside.depth + 1:
+                found = _match_callable(grammar, grammar.methods, lines, index)
+                if found is not None:
+                    function = _function_info(grammar, found, raw_lines, index)
+                    inside.methods.append(function)
+                    functions.append(function)
+            if found is None:
+                found = _match_callable(grammar, grammar.functions, lines, index)
+                if found is not None:
+                    function = _function_info(grammar, found, raw_lines, index)
+                    functions.append(function)
+                    owner = found.groupdict().get("owner")
+                    if owner:
+                        owned.setdefault(owner, []).append(function)
+            if found is None:
+                container = _match_container(grammar, stripped, index, depth)
+                if container is not None:
+                    if not container.owner:
+                        container.doc = (
+                            _doc_comment(grammar, raw_lines, index),
+                            _decorators(grammar, raw_lines, index),
+                        )
+                    stack.append(container)
+
+        depth = max(0, depth + change)
+        while stack:
+            container = stack[-1]
+            if not container.opened:
+                if depth > container.depth:
+                    container.opened = True
+                elif index + 1 - container.line < MAX_SIGNATURE_LINES and not (
+                    change < 0 or stripped.endswith((";", "}"))
+                ):
+                    # The body may start on a later line
+                    break
+            if container.opened and depth > container.depth:
+                break
+            close(stack.pop())
+    for container in stack:
+        close(container)
+
+    if owned:
+        for position, cls in enumerate(classes):
+            methods = owned.get(cls.name)
+            if methods:
+                classes[position] = ClassInfo(
+                    cls.name,
+                    cls.line,
+                    sorted(cls.methods + tuple(methods), key=lambda m: m.line),
+                    cls.docstring,
+                    cls.decorators,
+                )
+    classes.sort(key=lambda cls: cls.line)
+    return SourceOutline(imports, functions, classes)
+
+
+def _blank(match) -> str:
+    """A comment or string replaced by what keeps lines and blocks intact"""
+    text = match.group(0)
+    if text.startswith(("//", "/*", "#")):
+        # Comments keep only their line breaks
+        return "\n" * text.count("\n")
+    # Strings keep their text, which imports read, but no brackets
+    return text.translate(_STRING_TABLE)
+
+
+_STRING_TABLE = str.maketrans("{}()[];", "       ")
+
+
+def _match_callable(
+    grammar: Grammar, patterns: List[Pattern], lines: List[str], index: int
+) -> Optional[re.Match]:
+    """Match of a function declaration starting on lines[index], if any"""
+    text = lines[index].strip()
+    for pattern in patterns:
+        match = pattern.match(text)
+        if match is None or match.group("name") in grammar.reserved:
+            continue
+        if text.count("(") > text.count(")"):
+            # Parameters continue on the next lines
+            joined = " ".join(
+                line.strip() for line in lines[index : index + MAX_SIGNATURE_LINES]
+            )
+            match = pattern.match(joined) or match
+        return match
+    return None
+
+
+def _function_info(
+    grammar: Grammar, match: re.Match, raw_lines: List[str], index: int
+) -> FunctionInfo:
+    return FunctionInfo(
+        name=match.group("name"),
+        line=index + 1,
+        args=_arg_names(grammar, match.groupdict().get("args") or ""),
+        docstring=_doc_comment(grammar, raw_lines, index),
+        decorators=_decorators(grammar, raw_lines, index),
+        is_async="async" in match.string[: match.start("name")].split(),
+    )
+
+
+def _match_container(
+    grammar: Grammar, text: str, index: int, depth: int
+) -> Optional[_Container]:
+    for patterns, owner in ((grammar.containers, False), (grammar.owners, True)):
+        for pattern in patterns:
+            match = pattern.match(text)
+            if match:
+                return _Container(match.group(1), index + 1, depth, owner, None)
+    return None
+
+
+def _arg_names(grammar: Grammar, text: str) -> List[str]:
+    """Parameter names from a parameter list, without types and defaults"""
+    names = []
+    for part in _split_top_level(text):
+        match = grammar.arg_name.search(part)
+        if match:
+            names.append(match.group(1))
+    return names
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split at commas outside brackets, so generic types stay whole"""
+    parts = []
+    level = 0
+    start = 0
+    for position, char in enumerate(text):
+        if char in "(<[{":
+            level += 1
+        elif char in ")>]}":
+            level -= 1
+        elif char == "," and level <= 0:
+            parts.append(text[start:position])
+            start = position + 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _first_declaration_line(grammar: Grammar, raw_lines: List[str], index: int):
+    """Index of the first decorator or attribute line above a declaration"""
+    prefix = grammar.decorator_prefix
+    while index > 0 and prefix and raw_lines[index - 1].lstrip().startswith(prefix):
+        index -= 1
+    return index
+
+
+_DECORATOR_NAME = re.compile(r"[\w.:]+")
+
+
+def _decorators(grammar: Grammar, raw_lines: List[str], index: int) -> List[str]:
+    start = _first_declaration_line(grammar, raw_lines, index)
+    decorators = []
+    for line in raw_lines[start:index]:
+        text = line.strip()[len(grammar.decorator_prefix) :]
+        match = _DECORATOR_NAME.match(text)
+        if match:
+            decorators.append(match.group(0))
+    return decorators
+
+
+def _doc_comment(grammar: Grammar, raw_lines: List[str], index: int) -> str:
+    """Comment block right above a declaration and its decorators"""
+    index = _first_declaration_line(grammar, raw_lines, index)
+    if index == 0:
+        return ""
+    last = raw_lines[index - 1].strip()
+    if last.endswith("*/"):
+        block = []
+        for number in range(index - 1, -1, -1):
+            line = raw_lines[number]
+            block.append(line.strip())
+            if "/*" in line:
+                break
+        else:
+            return ""
+        block.reverse()
+        block[0] = block[0].split("/*", 1)[1]
+        block[-1] = block[-1].rsplit("*/", 1)[0]
+        text = [line.strip().lstrip("*").strip() for line in block]
+    elif last.startswith(grammar.doc_prefixes):
+        text = []
+        for number in range(index - 1, -1, -1):
+            stripped = raw_lines[number].strip()
+            if not stripped.startswith(grammar.doc_prefixes):
+                break
+            text.append(stripped.lstrip("/#!").strip())
+        text.reverse()
+    else:
+        return ""
+    # Tags such as @param are for documentation tools, not the summary
+    description = []
+    for line in text:
+        if line.startswith("@"):
+            break
+        description.append(line)
+    return "\n".join(description).strip()
+
+
+# Comments and string literals of C-like languages
+_C_LEXER = r"//[^\n]*|/\*.*?\*/|\"(?:\\.|[^\"\\\n])*\"|'(?:\\.|[^'\\\n])*'"
+
+JAVASCRIPT = Grammar(
+    lexer=_C_LEXER + r"|`(?:\\.|[^`\\])*`",
+    imports=[
+        (
+            "import",
+            r"^\s*(?:import|export)\s+(?:[^'\";]*?\s+from\s+)?['\"]([^'\"\n]+)['\"]",
+        ),
+        ("import", r"\b(?:require|import)\(\s*['\"]([^'\"\n]+)['\"]\s*\)"),
+    ],
+    functions=[
+        r"(?:export\s+)?(?:default\s+)?(?:declare\s+)?(?:async\s+)?function\b"
+        r"\s*\*?\s*(?P<name>[A-Za-z_$][\w$]*)\s*(?:<[^(]*>)?\s*\((?P<args>[^)]*)",
+        r"(?:export\s+)?(?:const|let|var)\s+(?P<name>[A-Za-z_$][\w$]*)\s*"
+        r"(?::[^=]*)?=\s*(?:async\s+)?function\b\s*\*?\s*[\w$]*\s*"
+        r"\((?P<args>[^)]*)",
+        r"(?:export\s+)?(?:const|let|var)\s+(?P<name>[A-Za-z_$][\w$]*)\s*"
+        r"(?::[^=]*)?=\s*(?:async\s+)?\((?P<args>[^)]*)\)[^=]*=>",
+        r"(?:export\s+)?(?:const|let|var)\s+(?P<name>[A-Za-z_$][\w$]*)\s*"
+        r"=\s*(?:async\s+)?(?P<args>[A-Za-z_$][\w$]*)\s*=>",
+    ],
+    methods=[
+        r"(?:(?:public|private|protected|static|readonly|override|abstract|"
+        r"declare|get|set|async)\s+)*\*?(?P<name>#?[A-Za-z_$][\w$]*)\??\s*"
+        r"(?:<[^(]*>)?\s*\((?P<args>[^)]*)\)\s*(?::[^{;]*)?(?:\{|;|$)",
+        r"(?:(?:public|private|protected|static|readonly)\s+)*"
+        r"(?P<name>#?[A-Za-z_$][\w$]*)\s*(?::[^=]*)?=\s*(?:async\s+)?"
+        r"\((?P<args>[^)]*)\)[^=]*=>",
+    ],
+    containers=[
+        r"(?:export\s+)?(?:default\s+)?(?:declare\s+)?(?:abstract\s+)?"
+        r"(?:class|interface|enum)\s+([A-Za-z_$][\w$]*)",
+    ],
+    arg_name=(
+        r"^(?:\.\.\.)?(?:(?:public|private|protected|readonly)\s+)*"
+        r"([A-Za-z_$][\w$]*)"
+    ),
+    reserved=("if", "for", "while", "switch", "catch", "return", "function"),
+)
+
+GO = Grammar(
+    lexer=_C_LEXER + r"|`[^`]*`",
+    imports=[
+        ("import", r"^import\s+(?:[\w.]+\s+)?\"([^\"\n]+)\""),
+        ("import", r"^import\s*\(([^)]*)\)"),
+    ],
+    functions=[
+        r"func\s+(?:\(\s*(?:\w+\s+)?\*?\s*(?P<owner>\w+)(?:\[[^\]]*\])?\s*\)\s*)?"
+        r"(?P<name>\w+)\s*(?:\[[^\]]*\])?\s*\((?P<args>[^)]*)",
+    ],
+    methods=[r"(?P<name>[A-Z_a-z]\w*)\s*\((?P<args>[^)]*)\)"],
+    containers=[r"(?:type\s+)?(\w+)(?:\[[^\]]*\])?\s+(?:struct|interface)\b"],
+    arg_name=r"^(\w+)",
+    decorator_prefix="",
+)
+
+JAVA = Grammar(
+    lexer=_C_LEXER + r'|"""(?:.*?)"""',
+    imports=[("import", r"^\s*import\s+(?:static\s+)?([\w.]+(?:\.\*)?)\s*;")],
+    methods=[
+        r"(?:(?:public|private|protected|static|final|abstract|synchronized|"
+        r"native|default|strictfp)\s+)*(?:<[^(]*>\s+)?(?:[\w.$]+(?:<[^(]*>)?"
+        r"(?:\[\])*\s+)?(?P<name>[A-Za-z_$][\w$]*)\s*\((?P<args>[^)]*)\)"
+        r"\s*(?:throws\s+[\w.,\s]+)?\s*(?:[{;].*)?$",
+    ],
+    containers=[
+        r"(?:(?:public|private|protected|static|final|abstract|sealed|"
+        r"non-sealed|strictfp)\s+)*(?:class|interface|enum|record|@interface)"
+        r"\s+([A-Za-z_$][\w$]*)",
+    ],
+    arg_name=r"([A-Za-z_$][\w$]*)\s*(?:\[\])*\s*$",
+    reserved=("if", "for", "while", "switch", "catch", "return", "new", "throw"),
+)
+
+_RUST_FN = (
+    r"(?:pub(?:\([^)]*\))?\s+)?(?:(?:const|async|unsafe|extern\s+\"\w*\")\s+)*"
+    r"fn\s+(?P<name>\w+)\s*(?:<[^(]*>)?\s*\((?P<args>[^)]*)"
+)
+
+RUST = Grammar(
+    lexer=(
+        r"//[^\n]*|/\*.*?\*/|r#*\"(?:.*?)\"#*|\"(?:\\.|[^\"\\])*\""
+        r"|'(?:\\.[^']*|[^'\\\n])'"
+    ),
+    imports=[
+        ("use", r"^\s*(?:pub(?:\([^)]*\))?\s+)?use\s+([^;]+);"),
+        ("mod", r"^\s*(?:pub(?:\([^)]*\))?\s+)?mod\s+(\w+)\s*;"),
+        ("extern crate", r"^\s*extern\s+crate\s+(\w+)"),
+    ],
+    functions=[_RUST_FN],
+    methods=[_RUST_FN],
+    containers=[
+        r"(?:pub(?:\([^)]*\))?\s+)?(?:unsafe\s+)?(?:struct|enum|trait|union)"
+        r"\s+(\w+)",
+    ],
+    owners=[
+        r"(?:unsafe\s+)?impl\b(?:\s*<[^{]*?>)?\s+(?:[\w:<>, ]+?\s+for\s+)?"
+        r"(?:\w+::)*(\w+)",
+    ],
+    arg_name=r"^&?\s*(?:'\w+\s+)?(?:mut\s+)?(\w+)",
+    doc_prefixes=("///", "//!"),
+    decorator_prefix="#[",
+)
+
+C = Grammar(
+    lexer=_C_LEXER,
+    imports=[("include", r"^\s*#\s*include\s*[<\"]([^>\"\n]+)[>\"]")],
+    functions=[
+        r"(?:(?:static|inline|extern|const|unsigned|signed|struct|enum|virtual|"
+        r"constexpr|explicit)\s+)*(?:[\w:<>,*& \t]*?[ \t*&])?"
+        r"(?:(?P<owner>\w+)::)?(?P<name>~?[A-Za-z_]\w*)"
+        r"\s*\((?P<args>[^)]*)\)\s*(?:const\s*)?(?:noexcept\s*)?(?:override\s*)?"
+        r"(?:->\s*[\w:<>*&]+\s*)?\{?\s*$",
+    ],
+    methods=[
+        r"(?:(?:virtual|static|inline|explicit|constexpr)\s+)*"
+        r"(?:[\w:<>,*&]+\s+)*?[*&]?(?P<name>~?[A-Za-z_]\w*)\s*\((?P<args>[^)]*)\)",
+    ],
+    containers=[
+        r"(?:typedef\s+)?(?:class|struct|union|enum(?:\s+class)?)\s+(\w+)\s*"
+        r"(?:final\s*)?(?::[^;{]*)?(?:\{.*)?$"
+    ],
+    arg_name=r"(\w+)\s*(?:\[[^\]]*\])*\s*(?:=.*)?$",
+    decorator_prefix="",
+    reserved=("if", "for", "while", "switch", "return", "sizeof", "else"),
+)
+
+PHP = Grammar(
+    lexer=(
+        r"//[^\n]*|#(?!\[)[^\n]*|/\*.*?\*/|\"(?:\\.|[^\"\\])*\""
+        r"|'(?:\\.|[^'\\])*'"
+    ),
+    imports=[
+        ("use", r"^\s*use\s+([\w\\]+)"),
+        (
+            "require",
+            r"\b(?:require|include)(?:_once)?\s*\(?\s*['\"]([^'\"\n]+)['\"]",
+        ),
+    ],
+    functions=[r"function\s+&?(?P<name>\w+)\s*\((?P<args>[^)]*)"],
+    methods=[
+        r"(?:(?:public|private|protected|static|final|abstract)\s+)*"
+        r"function\s+&?(?P<name>\w+)\s*\((?P<args>[^)]*)",
+    ],
+    containers=[
+        r"(?:(?:abstract|final|readonly)\s+)*(?:class|interface|trait|enum)\s+(\w+)"
+    ],
+    arg_name=r"\$(\w+)",
+    decorator_prefix="#[",
+)
+
+_RUBY_DEF = [
+    r"def\s+(?:self\.)?(?P<name>[\w?!=]+|\[\]=?)\s*\((?P<args>[^)]*)\)",
+    r"def\s+(?:self\.)?(?P<name>[\w?!=]+|\[\]=?)(?:\s+(?P<args>[^;\n]*))?",
+]
+
+RUBY = Grammar(
+    lexer=r"#[^\n]*|\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'",
+    imports=[
+        ("require", r"^\s*require(?:_relative)?\s*\(?\s*['\"]([^'\"\n]+)['\"]")
+    ],
+    functions=_RUBY_DEF,
+    methods=_RUBY_DEF,
+    containers=[r"(?:class|module)\s+(?:[\w:]+::)?(\w+)"],
+    arg_name=r"^[*&]*(\w+)",
+    doc_prefixes=("#",),
+    decorator_prefix="",
+    blocks="end",
+)
+
+BASH = Grammar(
+    lexer=r"(?<![\w${])#[^\n]*|\"(?:\\.|[^\"\\])*\"|'[^']*'",
+    imports=[("source", r"^\s*(?:source|\.)\s+['\"]?([^\s'\";]+)")],
+    functions=[
+        r"function\s+(?P<name>[\w:-]+)(?:\s*\(\s*\))?",
+        r"(?P<name>[\w:-]+)\s*\(\s*\)",
+    ],
+    doc_prefixes=("#",),
+    decorator_prefix="",
+)
+
+
+def _parser(grammar: Grammar) -> Callable[[str], SourceOutline]:
+    def parse(content: str) -> SourceOutline:
+        return parse_outline(grammar, content)
+
+    return parse
+
+
+for _languages, _grammar in (
+    (("javascript", "typescript"), JAVASCRIPT),
+    (("go",), GO),
+    (("java",), JAVA),
+    (("rust",), RUST),
+    (("c", "cpp"), C),
+    (("php",), PHP),
+    (("ruby",), RUBY),
+    (("bash",), BASH),
+):
+    language_parser(*_languages)(_parser(_grammar))
@@ -0,0 +1,295 @@
+"""
+Line diffs for large files: Myers (linear space) and patience algorithms.
+
+Both work on integer line ids rather than strings, skip the common prefix and
+suffix up front, and leave out lines that only occur on one side (they can
+never match), so a few edits to a huge file cost little more than hashing
+its lines. Hunks are produced lazily, in order, so a caller that stops
+reading after the first screenful does not pay for the rest of the diff.
+"""
+
+import bisect
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+from .edits import LineEdit
+
+# Matching runs as (old index, new index, length)
+Run = Tuple[int, int, int]
+RunFinder = Callable[[List[int], List[int]], Iterator[Run]]
+
+# Edit distance explored per Myers split before giving up on that region and
+# reporting it as replaced outright; bounds the worst case on unrelated text
+MYERS_MAX_COST = 1024
+
+
+def diff_lines(
+    old_lines: Sequence[str], new_lines: Sequence[str], algorithm: str = "myers"
+) -> Iterator[LineEdit]:
+    """Hunks turning old_lines into new_lines, in order"""
+    finder = DIFF_ALGORITHMS[algorithm]
+
+    # Common prefix and suffix, the usual case for an edited file
+    lo = 0
+    end = min(len(old_lines), len(new_lines))
+    while lo < end and old_lines[lo] == new_lines[lo]:
+        lo += 1
+    old_hi, new_hi = len(old_lines), len(new_lines)
+    while (
+        old_hi > lo and new_hi > lo and old_lines[old_hi - 1] == new_lines[new_hi - 1]
+    ):
+        old_hi -= 1
+        new_hi -= 1
+    if lo == old_hi and lo == new_hi:
+        return
+
+    # Line ids: equal lines share an id, so comparisons are integer compares
+    ids: Dict[str, int] = {}
+    old_ids = [ids.setdefault(line, len(ids)) for line in old_lines[lo:old_hi]]
+    new_ids = [ids.setdefault(line, len(ids)) for line in new_lines[lo:new_hi]]
+
+    # Lines missing from the other side can only be deleted or inserted
+    in_new = set(new_ids)
+    in_old = set(old_ids)
+    old_keep = [i for i, line in enumerate(old_ids) if line in in_new]
+    new_keep = [j for j, line in enumerate(new_ids) if line in in_old]
+    old_kept = [old_ids[i] for i in old_keep]
+    new_kept = [new_ids[j] for j in new_keep]
+
+    old_pos, new_pos = lo, lo
+    for i, j, length in finder(old_kept, new_kept):
+        for offset in range(length):
+            old_match = lo + old_keep[i + offset]
+            new_match = lo + new_keep[j + offset]
+            if old_match > old_pos or new_match > new_pos:
+                yield _hunk(
+                    old_lines, new_lines, old_pos, old_match, new_pos, new_match
+                )
+            old_pos, new_pos = old_match + 1, new_match + 1
+    if old_pos < old_hi or new_pos < new_hi:
+        yield _hunk(old_lines, new_lines, old_pos, old_hi, new_pos, new_hi)
+
+
+def refine_hunks(
+    old_lines: Sequence[str],
+    new_lines: Sequence[str],
+    hunks: Sequence[LineEdit],
+    algorithm: str = "myers",
+) -> Iterator[LineEdit]:
+    """Split coarse hunks (whole replaced ranges) into minimal ones"""
+    for hunk in hunks:
+        old_part = old_lines[hunk.old_start : hunk.old_start + hunk.old_count]
+        new_part = new_lines[hunk.new_start : hunk.new_start + hunk.new_count]
+        for part in diff_lines(old_part, new_part, algorithm):
+            yield part._replace(
+                old_start=part.old_start + hunk.old_start,
+                new_start=part.new_start + hunk.new_start,
+            )
+
+
+def _hunk(
+    old_lines: Sequence[str],
+    new_lines: Sequence[str],
+    old_start: int,
+    old_stop: int,
+    new_start: int,
+    new_stop: int,
+) -> LineEdit:
+    removed = old_lines[old_start:old_stop]
+    added = new_lines[new_start:new_stop]
+    char_delta = sum(map(len, added)) - sum(map(len, removed))
+    char_delta += len(added) - len(removed)
+    return LineEdit(
+        old_start, old_stop - old_start, new_start, new_stop - new_start, char_delta
+    )
+
+
+def myers_runs(a: List[int], b: List[int]) -> Iterator[Run]:
+    """Matching runs of a and b from Myers' linear-space algorithm"""
+    # Pending work, popped from the end: ranges still to split and matching
+    # runs that have to wait until the ranges before them are done
+    stack: List[tuple] = [(0, len(a), 0, len(b))]
+    while stack:
+        item = stack.pop()
+        if len(item) == 3:
+            yield item
+            continue
+
+        a_lo, a_hi, b_lo, b_hi = item
+        start = a_lo
+        while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+            a_lo += 1
+            b_lo += 1
+        if a_lo > start:
+            yield (start, b_lo - (a_lo - start), a_lo - start)
+        stop = a_hi
+        while a_hi > a_lo and b_hi > b_lo and a[a_hi - 1] == b[b_hi - 1]:
+            a_hi -= 1
+            b_hi -= 1
+        if a_hi < stop:
+            stack.append((a_hi, b_hi, stop - a_hi))
+        if a_lo == a_hi or b_lo == b_hi:
+            continue
+
+        split = _middle_snake(a, a_lo, a_hi, b, b_lo, b_hi)
+        if split is None:
+            continue
+        x, y = split
+        stack.append((x, a_hi, y, b_hi))
+        stack.append((a_lo, x, b_lo, y))
+
+
+def _middle_snake(
+    a: List[int], a_lo: int, a_hi: int, b: List[int], b_lo: int, b_hi: int
+):
+    """Point where the forward and reverse searches for the shortest edit
+    script meet, or None if the region costs more than MYERS_MAX_COST.
+
+    Both ends of the region differ, so the split is always strictly inside
+    it and the recursion makes progress.
+    """
+    n = a_hi - a_lo
+    m = b_hi - b_lo
+    max_d = min((n + m + 1) // 2, MYERS_MAX_COST)
+    offset = max_d + 1
+    size = 2 * offset + 1
+    # Furthest x reached on each diagonal k = x - y, forward and reverse;
+    # -1 marks diagonals not reached yet
+    forward = [-1] * size
+    reverse = [-1] * size
+    forward[offset + 1] = 0
+    reverse[offset + 1] = 0
+    delta = n - m
+    odd = delta % 2 != 0
+    # Diagonals trimmed at each end once a search runs off the grid
+    forward_start = forward_end = reverse_start = reverse_end = 0
+
+    for d in range(max_d + 1):
+        for k in range(-d + forward_start, d + 1 - forward_end, 2):
+            if k == -d or (
+                k != d and forward[offset + k - 1] < forward[offset + k + 1]
+            ):
+                x = forward[offset + k + 1]
+            else:
+                x = forward[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[a_lo + x] == b[b_lo + y]:
+                x += 1
+                y += 1
+            forward[offset + k] = x
+            if x > n:
+                forward_end += 2
+            elif y > m:
+                forward_start += 2
+            elif odd:
+                # Reverse diagonal delta - k, if reached, may overlap
+                index = offset + delta - k
+                if 0 <= index < size and reverse[index] != -1:
+                    if x + reverse[index] >= n:
+                        return a_lo + x, b_lo + y
+
+        for k in range(-d + reverse_start, d + 1 - reverse_end, 2):
+            if k == -d or (
+                k != d and reverse[offset + k - 1] < reverse[offset + k + 1]
+            ):
+                x = reverse[offset + k + 1]
+            else:
+                x = reverse[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[a_hi - 1 - x] == b[b_hi - 1 - y]:
+                x += 1
+                y += 1
+            reverse[offset + k] = x
+            if x > n:
+                reverse_end += 2
+            elif y > m:
+                reverse_start += 2
+            elif not odd:
+                index = offset + delta - k
+                if 0 <= index < size and forward[index] != -1:
+                    x_forward = forward[index]
+                    if x_forward + x >= n:
+                        return a_lo + x_forward, b_lo + x_forward - (delta - k)
+    return None
+
+
+def patience_runs(a: List[int], b: List[int]) -> Iterator[Run]:
+    """Matching runs anchored on lines that occur once on each side.
+
+    Ranges without such lines are left to Myers.
+    """
+    stack: List[tuple] = [(0, len(a), 0, len(b))]
+    while stack:
+        item = stack.pop()
+        if len(item) == 3:
+            yield item
+            continue
+
+        a_lo, a_hi, b_lo, b_hi = item
+        anchors = _unique_anchors(a, a_lo, a_hi, b, b_lo, b_hi)
+        if not anchors:
+            for i, j, length in myers_runs(a[a_lo:a_hi], b[b_lo:b_hi]):
+                yield (a_lo + i, b_lo + j, length)
+            continue
+
+        # Ranges between anchors, pushed last to first
+        after_a, after_b = a_hi, b_hi
+        for i, j in reversed(anchors):
+            if i + 1 < after_a or j + 1 < after_b:
+                stack.append((i + 1, after_a, j + 1, after_b))
+            stack.append((i, j, 1))
+            after_a, after_b = i, j
+        if a_lo < after_a or b_lo < after_b:
+            stack.append((a_lo, after_a, b_lo, after_b))
+
+
+def _unique_anchors(
+    a: List[int], a_lo: int, a_hi: int, b: List[int], b_lo: int, b_hi: int
+) -> List[Tuple[int, int]]:
+    """Longest increasing sequence of lines unique on both sides"""
+    counts: Dict[int, List[int]] = {}
+    for i in range(a_lo, a_hi):
+        entry = counts.get(a[i])
+        if entry is None:
+            counts[a[i]] = [1, i, 0, -1]
+        else:
+            entry[0] += 1
+    for j in range(b_lo, b_hi):
+        entry = counts.get(b[j])
+        if entry is not None:
+            entry[2] += 1
+            entry[3] = j
+
+    pairs = [
+        (i, j) for count, i, b_count, j in counts.values() if count == 1 == b_count
+    ]
+    if not pairs:
+        return []
+    pairs.sort()
+
+    # Patience sorting on the new-side positions
+    tops: List[int] = []
+    top_pairs: List[int] = []
+    previous: List[int] = []
+    for index, (_, j) in enumerate(pairs):
+        pile = bisect.bisect_left(tops, j)
+        previous.append(top_pairs[pile - 1] if pile else -1)
+        if pile == len(tops):
+            tops.append(j)
+            top_pairs.append(index)
+        else:
+            tops[pile] = j
+            top_pairs[pile] = index
+
+    anchors = []
+    index = top_pairs[-1]
+    while index != -1:
+        anchors.append(pairs[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+DIFF_ALGORITHMS: Dict[str, RunFinder] = {
+    "myers": myers_runs,
+    "patience": patience_runs,
+}
@@ -0,0 +1,65 @@
+"""
+Per-thread capture of printed output, so concurrent commands can each
+collect their own output.
+"""
+
+import io
+import re
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional, TextIO
+
+_ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+
+def strip_ansi(text: str) -> str:
+    """Remove terminal color codes"""
+    return _ANSI_ESCAPE.sub("", text)
+
+
+class ThreadLocalStdout(io.TextIOBase):
+    """A sys.stdout replacement that writes to a per-thread buffer.
+
+    Threads inside ``capture()`` write to their own buffer; every other
+    thread writes to ``fallback``.
+    """
+
+    def __init__(self, fallback: TextIO):
+        self.fallback = fallback
+        self._local = threading.local()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        buffer: Optional[io.StringIO] = getattr(self._local, "buffer", None)
+        if buffer is None:
+            return self.fallback.write(text)
+        return buffer.write(text)
+
+    def flush(self):
+        if getattr(self._local, "buffer", None) is None:
+            self.fallback.flush()
+
+    @contextmanager
+    def capture(self) -> Iterator[io.StringIO]:
+        """Collect everything this thread prints inside the block"""
+        previous = getattr(self._local, "buffer", None)
+        self._local.buffer = io.StringIO()
+        try:
+            yield self._local.buffer
+        finally:
+            self._local.buffer = previous
+
+
+@contextmanager
+def redirect_stdout_per_thread(fallback: TextIO) -> Iterator[ThreadLocalStdout]:
+    """Install a ThreadLocalStdout as sys.stdout for the duration of the block"""
+    original = sys.stdout
+    stdout = ThreadLocalStdout(fallback)
+    sys.stdout = stdout
+    try:
+        yield stdout
+    finally:
+        sys.stdout = original
@@ -0,0 +1,470 @@
+"""
+Scope-aware occurrences of a module-level Python name, for project renames.
+"""
+
+import io
+import os
+import ast
+import bisect
+import tokenize
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .symbols import module_name_for_path, resolve_import
+
+# When an occurrence is renamed: (MODULE, "") if the file's own module-level
+# binding is the renamed symbol, (FROM, module) if that module's is
+MODULE = "module"
+FROM = "from"
+
+Condition = Tuple[str, str]
+# (0-based line, column in characters, condition)
+Occurrence = Tuple[int, int, Condition]
+
+
+class RenameAnalysis(NamedTuple):
+    """How one file binds and uses a name, before the project is considered"""
+
+    module: str
+    # The module binds the name itself (def, class, assignment, ...)
+    defines: bool
+    # Modules its module-level binding may come from, star imports included
+    imported_from: Tuple[str, ...]
+    occurrences: Tuple[Occurrence, ...]
+
+
+class _Scope:
+    __slots__ = ("kind", "parent", "sources", "declaration", "positions", "early")
+
+    def __init__(self, kind: str, parent: Optional["_Scope"]):
+        # "module", "function" (lambdas too), "comprehension" or "class"
+        self.kind = kind
+        self.parent = parent
+        # How the name is bound here: ("local", ""), ("import", ""),
+        # (FROM, module) or ("star", module)
+        self.sources: Set[Tuple[str, str]] = set()
+        # "global" or "nonlocal" when the scope declares the name so
+        self.declaration: Optional[str] = None
+        # Occurrences that refer to the name as seen from this scope
+        self.positions: List[Tuple[int, int]] = []
+        # Uses in a class body before the class binds the name, which look
+        # it up in the enclosing scopes (as in "load = staticmethod(load)")
+        self.early: List[Tuple[int, int]] = []
+
+
+class _NameScopes(ast.NodeVisitor):
+    """Sorts the occurrences of one name by the scope they are bound in"""
+
+    def __init__(self, name: str, module: str, is_package: bool, lines, tokens):
+        self.name = name
+        self.module = module
+        self.is_package = is_package
+        self.lines = lines
+        # Positions of NAME tokens spelling the name, in source order
+        self.tokens = tokens
+        self.claimed: Set[Tuple[int, int]] = set()
+        self.module_scope = _Scope("module", None)
+        self.scope = self.module_scope
+        self.scopes = [self.module_scope]
+        # Occurrences whose condition does not depend on scopes
+        self.fixed: List[Occurrence] = []
+        # Module-level names bound to modules, for module.name attributes
+        self.module_aliases: Dict[str, str] = {}
+
+    # --- positions ------------------------------------------------------------
+
+    def _position(self, line: int, column: int) -> Tuple[int, int]:
+        """0-based (line, character column) of an AST (line, byte offset)"""
+        text = self.lines[line - 1]
+        if not text.isascii():
+            column = len(text.encode("utf-8")[:column].decode("utf-8", "replace"))
+        return line - 1, column
+
+    def _start(self, node) -> Tuple[int, int]:
+        return self._position(node.lineno, node.col_offset)
+
+    def _end(self, node) -> Tuple[int, int]:
+        return self._position(node.end_lineno, node.end_col_offset)
+
+    def _tokens_in(self, start, end) -> List[Tuple[int, int]]:
+        """Unclaimed tokens spelling the name between two positions"""
+        first = bisect.bisect_left(self.tokens, start)
+        last = bisect.bisect_left(self.tokens, end)
+        return [p for p in self.tokens[first:last] if p not in self.claimed]
+
+    def _claim(self, position, scope: Optional[_Scope] = None):
+        self.claimed.add(position)
+        (scope or self.scope).positions.append(position)
+
+    def _claim_fixed(self, position, condition: Condition):
+        self.claimed.add(position)
+        self.fixed.append((position[0], position[1], condition))
+
+    # --- scopes ---------------------------------------------------------------
+
+    def _bind(self, source: Tuple[str, str]):
+        scope = self.scope
+        if scope.declaration == "global":
+            scope = self.module_scope
+        elif scope.declaration == "nonlocal":
+            # A nonlocal name belongs to a function: never the module symbol
+            return
+        scope.sources.add(source)
+
+    def _push(self, kind: str) -> _Scope:
+        scope = _Scope(kind, self.scope)
+        self.scopes.append(scope)
+        self.scope = scope
+        return scope
+
+    def _pop(self):
+        self.scope = self.scope.parent
+
+    def _enclosing_function(self) -> _Scope:
+        """Scope a walrus in a comprehension binds in"""
+        scope = self.scope
+        while scope.kind == "comprehension":
+            scope = scope.parent
+        return scope
+
+    # --- bindings and references ----------------------------------------------
+
+    def visit_Name(self, node):
+        if node.id != self.name:
+            return
+        if not isinstance(node.ctx, ast.Load):
+            self._bind(("local", ""))
+        elif self.scope.kind == "class" and not self.scope.sources:
+            position = self._start(node)
+            self.claimed.add(position)
+            self.scope.early.append(position)
+            return
+        self._claim(self._start(node))
+
+    def visit_Attribute(self, node):
+        self.visit(node.value)
+        if node.attr != self.name:
+            return
+        module = self._module_of(node.value)
+        line, end = self._end(node)
+        position = (line, end - len(self.name))
+        if module is not None:
+            self._claim_fixed(position, (FROM, module))
+        else:
+            self.claimed.add(position)
+
+    def _module_of(self, node) -> Optional[str]:
+        """Module a dotted expression names, through module-level imports"""
+        parts = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name) or node.id not in self.module_aliases:
+            return None
+        return ".".join([self.module_aliases[node.id], *reversed(parts)])
+
+    # Values before targets, in evaluation order, for uses in class bodies
+
+    def visit_Assign(self, node):
+        self.visit(node.value)
+        for target in node.targets:
+            self.visit(target)
+
+    def visit_AnnAssign(self, node):
+        self.visit(node.annotation)
+        if node.value is not None:
+            self.visit(node.value)
+        self.visit(node.target)
+
+    def visit_For(self, node):
+        self.visit(node.iter)
+        self.visit(node.target)
+        for statement in [*node.body, *node.orelse]:
+            self.visit(statement)
+
+    visit_AsyncFor = visit_For
+
+    def visit_NamedExpr(self, node):
+        self.visit(node.value)
+        target = node.target
+        if target.id == self.name:
+            scope = self._enclosing_function()
+            saved, self.scope = self.scope, scope
+            self._bind(("local", ""))
+            self.scope = saved
+            self._claim(self._start(target), scope)
+
+    def _visit_definition(self, node):
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        if node.name == self.name:
+            self._bind(("local", ""))
+            tokens = self._tokens_in(self._start(node), self._end(node))
+            if tokens:
+                self._claim(tokens[0])
+
+    def visit_FunctionDef(self, node):
+        self._visit_definition(node)
+        self._visit_arguments_outside(node.args)
+        if node.returns is not None:
+            self.visit(node.returns)
+        self._push("function")
+        self._visit_arguments_inside(node.args)
+        for statement in node.body:
+            self.visit(statement)
+        self._pop()
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node):
+        self._visit_arguments_outside(node.args)
+        self._push("function")
+        self._visit_arguments_inside(node.args)
+        self.visit(node.body)
+        self._pop()
+
+    def _visit_arguments_outside(self, args: ast.arguments):
+        """Defaults and annotations are evaluated where the function is defined"""
+        for default in [*args.defaults, *args.kw_defaults]:
+            if default is not None:
+                self.visit(default)
+        for arg in self._all_args(args):
+            if arg.annotation is not None:
+                self.visit(arg.annotation)
+
+    def _visit_arguments_inside(self, args: ast.arguments):
+        for arg in self._all_args(args):
+            if arg.arg == self.name:
+                self._bind(("local", ""))
+                self._claim(self._start(arg))
+
+    def _all_args(self, args: ast.arguments) -> List[ast.arg]:
+        every = [*args.posonlyargs, *args.args, *args.kwonlyargs]
+        every += [arg for arg in (args.vararg, args.kwarg) if arg is not None]
+        return every
+
+    def visit_ClassDef(self, node):
+        self._visit_definition(node)
+        for base in node.bases:
+            self.visit(base)
+        for keyword in node.keywords:
+            self.visit(keyword.value)
+        self._push("class")
+        for statement in node.body:
+            self.visit(statement)
+        self._pop()
+
+    def _visit_comprehension(self, node, parts):
+        generators = node.generators
+        # The first iterable is evaluated in the enclosing scope
+        self.visit(generators[0].iter)
+        self._push("comprehension")
+        for index, generator in enumerate(generators):
+            self.visit(generator.target)
+            if index:
+                self.visit(generator.iter)
+            for condition in generator.ifs:
+                self.visit(condition)
+        for part in parts:
+            self.visit(part)
+        self._pop()
+
+    def visit_ListComp(self, node):
+        self._visit_comprehension(node, [node.elt])
+
+    visit_SetComp = visit_GeneratorExp = visit_ListComp
+
+    def visit_DictComp(self, node):
+        self._visit_comprehension(node, [node.key, node.value])
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            bound = alias.asname or alias.name.split(".")[0]
+            if self.scope is self.module_scope:
+                # "import a.b" binds a, "import a.b as m" binds m to a.b
+                self.module_aliases[bound] = alias.name if alias.asname else bound
+            if bound == self.name:
+                # Modules are not renamed, so neither is a name bound to one
+                self._bind(("import", ""))
+            for position in self._tokens_in(self._start(alias), self._end(alias)):
+                self.claimed.add(position)
+
+    def visit_ImportFrom(self, node):
+        module = resolve_import(
+            node.module or "", node.level, self.module, self.is_package
+        )
+        for alias in node.names:
+            if alias.name == "*":
+                if self.scope is self.module_scope:
+                    self.module_scope.sources.add(("star", module))
+                continue
+            bound = alias.asname or alias.name
+            if self.scope is self.module_scope:
+                self.module_aliases[bound] = f"{module}.{alias.name}"
+            tokens = self._tokens_in(self._start(alias), self._end(alias))
+            if alias.name == self.name and tokens:
+                # The imported name is renamed with the module it comes from
+                self._claim_fixed(tokens.pop(0), (FROM, module))
+            if bound == self.name:
+                self._bind((FROM, module))
+                if alias.asname and tokens:
+                    self._claim(tokens[-1])
+
+    def visit_Global(self, node):
+        self._declare(node, "global")
+
+    def visit_Nonlocal(self, node):
+        self._declare(node, "nonlocal")
+
+    def _declare(self, node, declaration: str):
+        if self.name not in node.names:
+            return
+        self.scope.declaration = declaration
+        for position in self._tokens_in(self._start(node), self._end(node)):
+            self._claim(position)
+
+    def visit_ExceptHandler(self, node):
+        if node.type is not None:
+            self.visit(node.type)
+        if node.name == self.name:
+            self._bind(("local", ""))
+            start = self._start(node) if node.type is None else self._end(node.type)
+            tokens = self._tokens_in(start, self._start(node.body[0]))
+            if tokens:
+                self._claim(tokens[0])
+        for statement in node.body:
+            self.visit(statement)
+
+    def _visit_capture(self, node, name: Optional[str]):
+        """Match patterns binding a name given as a string"""
+        self.generic_visit(node)
+        if name == self.name:
+            self._bind(("local", ""))
+            tokens = self._tokens_in(self._start(node), self._end(node))
+            if tokens:
+                self._claim(tokens[-1])
+
+    def visit_MatchAs(self, node):
+        self._visit_capture(node, node.name)
+
+    def visit_MatchStar(self, node):
+        self._visit_capture(node, node.name)
+
+    def visit_MatchMapping(self, node):
+        self._visit_capture(node, node.rest)
+
+    # --- resolution -----------------------------------------------------------
+
+    def _binding_scope(self, scope: _Scope, own: bool = True) -> Optional[_Scope]:
+        """Scope whose binding of the name an occurrence in scope refers to.
+
+        With own=False the scope's own binding is skipped.
+        """
+        if scope.declaration == "global":
+            return self.module_scope
+        if own and scope.declaration != "nonlocal" and scope.sources:
+            return scope
+        scope = scope.parent
+        while scope is not None:
+            if scope.kind == "module":
+                return scope
+            if scope.kind != "class":
+                if scope.declaration == "global":
+                    return self.module_scope
+                if scope.declaration != "nonlocal" and scope.sources:
+                    return scope
+            scope = scope.parent
+        return None
+
+    def _condition(self, scope: Optional[_Scope]) -> Optional[Condition]:
+        """When occurrences bound in scope are renamed, or None for never"""
+        if scope is None:
+            return None
+        sources = scope.sources
+        if scope.kind == "module":
+            if sources and sources != {("import", "")}:
+                return MODULE, ""
+            return None
+        if scope.kind == "function" and len(sources) == 1:
+            kind, module = next(iter(sources))
+            if kind == FROM:
+                return FROM, module
+        # Local variables, parameters and class attributes of the same name
+        return None
+
+    def analysis(self) -> RenameAnalysis:
+        occurrences = list(self.fixed)
+        for scope in self.scopes:
+            for positions, own in ((scope.positions, True), (scope.early, False)):
+                if not positions:
+                    continue
+                condition = self._condition(self._binding_scope(scope, own))
+                if condition is not None:
+                    occurrences.extend(
+                        (line, column, condition) for line, column in positions
+                    )
+        sources = self.module_scope.sources
+        return RenameAnalysis(
+            module=self.module,
+            defines=("local", "") in sources,
+            imported_from=tuple(
+                sorted(module for kind, module in sources if kind in (FROM, "star"))
+            ),
+            occurrences=tuple(sorted(set(occurrences))),
+        )
+
+
+def rename_analysis(path: str, content: str, name: str) -> Optional[RenameAnalysis]:
+    """Occurrences of a name in one Python file, or None if it does not parse"""
+    try:
+        tree = ast.parse(content)
+        tokens = [
+            (token.start[0] - 1, token.start[1])
+            for token in tokenize.generate_tokens(io.StringIO(content).readline)
+            if token.type == tokenize.NAME and token.string == name
+        ]
+    except (SyntaxError, tokenize.TokenError, ValueError):
+        return None
+
+    visitor = _NameScopes(
+        name,
+        module_name_for_path(path),
+        os.path.basename(path) == "__init__.py",
+        content.split("\n"),
+        tokens,
+    )
+    for statement in tree.body:
+        visitor.visit(statement)
+    return visitor.analysis()
+
+
+def renamed_modules(analyses: Iterable[RenameAnalysis]) -> Set[str]:
+    """Modules whose module-level binding of the name is the renamed symbol.
+
+    These are the modules defining it and, transitively, those importing it
+    from one of them, which re-export it.
+    """
+    analyses = list(analyses)
+    modules = {analysis.module for analysis in analyses if analysis.defines}
+    changed = True
+    while changed:
+        changed = False
+        for analysis in analyses:
+            if analysis.module not in modules and any(
+                module in modules for module in analysis.imported_from
+            ):
+                modules.add(analysis.module)
+                changed = True
+    return modules
+
+
+def renamed_positions(
+    analysis: RenameAnalysis, modules: Set[str]
+) -> List[Tuple[int, int]]:
+    """(line, column) of the occurrences to rename, given renamed_modules"""
+    positions = []
+    for line, column, (kind, module) in analysis.occurrences:
+        if kind == MODULE:
+            module = analysis.module
+        if module in modules:
+            positions.append((line, column))
+    return positions
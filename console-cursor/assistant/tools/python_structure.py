@@ -0,0 +1,217 @@
+"""
+Parse-once extraction of Python structure, shared by all tools.
+"""
+
+import ast
+import sys
+from typing import List, Optional, Tuple
+
+from ..models.code_symbols import FunctionInfo, ClassInfo
+from .index_cache import content_hash
+from .analysis_cache import analysis_cache
+
+# Parsed trees are large and only the anti-pattern rules need them, so just
+# a few recent ones are kept; indexing caches structure without the tree
+PARSE_CACHE_SIZE = 16
+# Structures hold every reference and call of a module; past this many the
+# rest are read back from disk (or parsed again without a store)
+STRUCTURE_CACHE_SIZE = 64
+# Bump whenever PythonStructure or the records it holds change
+STRUCTURE_VERSION = 2
+# What a parse depends on besides the content: our extraction and the
+# grammar of the running Python
+STRUCTURE_KEY = f"{STRUCTURE_VERSION}-py{sys.version_info[0]}.{sys.version_info[1]}"
+
+# Trees are cheaper to rebuild than to load, so they are never written out
+analysis_cache.register("parse", persist=False, max_entries=PARSE_CACHE_SIZE)
+analysis_cache.register("structure", max_entries=STRUCTURE_CACHE_SIZE)
+
+
+class PythonStructure:
+    """Everything the tools need from one Python module, from a single pass"""
+
+    __slots__ = (
+        "imports",
+        "functions",
+        "classes",
+        "calls",
+        "definitions",
+        "references",
+        "import_modules",
+    )
+
+    def __init__(self):
+        # "import x" / "from x import y" strings, as stored on FileInfo
+        self.imports: List[str] = []
+        # Every function and method at any depth, async ones included
+        self.functions: List[FunctionInfo] = []
+        # Every class at any depth, with its direct methods
+        self.classes: List[ClassInfo] = []
+        # (called name, line) for each call site
+        self.calls: List[Tuple[str, int]] = []
+        # (name, line, kind, qualified name) for each definition
+        self.definitions: List[Tuple[str, int, str, str]] = []
+        # (name, line) for each name or attribute that is used
+        self.references: List[Tuple[str, int]] = []
+        # (module, relative import level, imported names) for each import
+        self.import_modules: List[Tuple[str, int, Tuple[str, ...]]] = []
+
+
+class StructureVisitor(ast.NodeVisitor):
+    """Single traversal emitting imports, definitions, calls and references"""
+
+    def __init__(self):
+        self.structure = PythonStructure()
+        self._scope: List[str] = []
+        self._kinds: List[str] = []
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.structure.imports.append(sys.intern(f"import {alias.name}"))
+            self.structure.import_modules.append((alias.name, 0, ()))
+
+    def visit_ImportFrom(self, node):
+        module = node.module or ""
+        names = tuple(alias.name for alias in node.names)
+        # Keep the leading dots so relative imports can be resolved
+        source = "." * node.level + module
+        for name in names:
+            self.structure.imports.append(sys.intern(f"from {source} import {name}"))
+            if name != "*":
+                self.structure.references.append((name, node.lineno))
+        self.structure.import_modules.append((module, node.level, names))
+
+    def visit_FunctionDef(self, node):
+        in_class = bool(self._kinds) and self._kinds[-1] == "class"
+        function = self._function_info(node)
+        self.structure.functions.append(function)
+        self._enter(node, "method" if in_class else "function")
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node):
+        methods = [
+            self._function_info(item)
+            for item in node.body
+            if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+        ]
+        self.structure.classes.append(
+            ClassInfo(
+                name=node.name,
+                line=node.lineno,
+                methods=methods,
+                docstring=ast.get_docstring(node) or "",
+                decorators=self._decorators(node),
+            )
+        )
+        self._enter(node, "class")
+
+    def visit_Call(self, node):
+        name = _call_name(node.func)
+        if name:
+            self.structure.calls.append((name, node.lineno))
+        self.generic_visit(node)
+
+    def visit_Name(self, node):
+        self.structure.references.append((node.id, node.lineno))
+
+    def visit_Attribute(self, node):
+        self.structure.references.append((node.attr, node.lineno))
+        self.generic_visit(node)
+
+    def _enter(self, node, kind: str):
+        qualname = ".".join(self._scope + [node.name])
+        self.structure.definitions.append((node.name, node.lineno, kind, qualname))
+        self._scope.append(node.name)
+        self._kinds.append(kind)
+        self.generic_visit(node)
+        self._scope.pop()
+        self._kinds.pop()
+
+    def _function_info(self, node) -> FunctionInfo:
+        return FunctionInfo(
+            name=node.name,
+            line=node.lineno,
+            args=[arg.arg for arg in node.args.args],
+            docstring=ast.get_docstring(node) or "",
+            decorators=self._decorators(node),
+            is_async=isinstance(node, ast.AsyncFunctionDef),
+        )
+
+    def _decorators(self, node) -> List[str]:
+        return [_call_name(d) or ast.unparse(d) for d in node.decorator_list]
+
+
+def _call_name(node) -> str:
+    """Dotted name of a call target or decorator, or "" if it has none"""
+    if isinstance(node, ast.Call):
+        node = node.func
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+        return ".".join(reversed(parts))
+    return ""
+
+
+class ParsedModule:
+    """Result of parsing one version of a module"""
+
+    __slots__ = ("tree", "structure", "error")
+
+    def __init__(
+        self,
+        tree: Optional[ast.Module],
+        structure: Optional[PythonStructure],
+        error: Optional[SyntaxError],
+    ):
+        self.tree = tree
+        self.structure = structure
+        self.error = error
+
+
+def _parse(content: str) -> ParsedModule:
+    try:
+        tree = ast.parse(content)
+    except SyntaxError as e:
+        return ParsedModule(None, None, e)
+    visitor = StructureVisitor()
+    visitor.visit(tree)
+    return ParsedModule(tree, visitor.structure, None)
+
+
+def parse_fragment(content: str) -> ParsedModule:
+    """Parse a snippet without caching it, e.g. the blocks around an edit"""
+    return _parse(content)
+
+
+def parse_python(content: str, hash_value: Optional[str] = None) -> ParsedModule:
+    """Parse Python source, reusing the tree of recently parsed content"""
+    return analysis_cache.get_or_compute(
+        "parse",
+        STRUCTURE_KEY,
+        hash_value or content_hash(content),
+        lambda: _parse(content),
+    )
+
+
+def python_structure(
+    content: str, hash_value: Optional[str] = None
+) -> Tuple[Optional[PythonStructure], Optional[SyntaxError]]:
+    """Structure and syntax error of a module, reused across sessions.
+
+    Use this instead of parse_python when the tree itself is not needed.
+    """
+    hash_value = hash_value or content_hash(content)
+
+    def compute():
+        # Not through parse_python: keeping the tree alive here would hold
+        # one per indexed file in the parse LRU
+        parsed = _parse(content)
+        return parsed.structure, parsed.error
+
+    return analysis_cache.get_or_compute(
+        "structure", STRUCTURE_KEY, hash_value, compute
+    )
@@ -0,0 +1,392 @@
+"""
+Tool for search-and-replace across the whole project.
+"""
+
+import os
+import re
+import time
+import bisect
+import keyword
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from ..models.file_info import FileInfo
+from .edits import apply_line_edits
+from .file_editor import write_files_atomically
+from .line_diff import refine_hunks
+from .python_rename import rename_analysis, renamed_modules, renamed_positions
+from .search_index import required_literals
+from .symbols import module_name_for_path
+from .tracing import tracer, traced
+
+# Below this many candidate files edits are computed in-process
+PARALLEL_MIN_FILES = 64
+# Files handed to a worker at a time
+REPLACE_CHUNK_SIZE = 32
+# Files and diff lines shown in the preview before it is cut short
+PREVIEW_MAX_FILES = 20
+PREVIEW_MAX_LINES = 400
+
+# (0-based first line, line count, new lines), as taken by apply_line_edits
+LineReplacement = Tuple[int, int, List[str]]
+
+
+class ProjectReplacer:
+    """Regex replace or symbol rename over every indexed file.
+
+    Candidate files are narrowed down with the search index, edits are
+    computed on a process pool for large candidate sets, the combined diff
+    is previewed, and all files are written as one change before the index
+    is updated around the edited lines.
+    """
+
+    def __init__(
+        self,
+        target_dir: str,
+        indexer,
+        file_editor,
+        workers: int = 1,
+        interactive: bool = True,
+    ):
+        self.target_dir = target_dir
+        self.indexer = indexer
+        self.file_editor = file_editor
+        self.workers = workers
+        self.interactive = interactive
+
+    def replace(self, arguments: str, project_index: Dict[str, FileInfo]):
+        """Handle `replace /regex/ replacement` and `replace old_name new_name`"""
+        spec = _parse_arguments(arguments)
+        if spec is None:
+            print("❌ Usage: replace /<regex>/ <replacement>")
+            print("         replace <name> <new_name>")
+            return
+
+        mode, pattern, replacement = spec
+        if mode == "regex":
+            try:
+                re.compile(pattern, re.MULTILINE)
+            except re.error as e:
+                print(f"❌ Invalid regular expression: {str(e)}")
+                return
+            literals = required_literals(pattern)
+            print(f"🔍 Replacing /{pattern}/ with '{replacement}'...")
+        else:
+            for name in (pattern, replacement):
+                if not name.isidentifier() or keyword.iskeyword(name):
+                    print(f"❌ Not a valid identifier: {name}")
+                    return
+            literals = [pattern]
+            print(f"🔍 Renaming '{pattern}' to '{replacement}' in Python files...")
+        if not self.indexer.search_index.ready:
+            self.indexer.search_index.build(project_index)
+        started = time.perf_counter()
+        candidates = sorted(
+            path
+            for path in self.indexer.search_index.candidate_paths(literals)
+            if path in project_index
+            and (mode == "regex" or project_index[path].language == "python")
+        )
+
+        tasks = [
+            (path, os.path.join(self.target_dir, path), mode, pattern, replacement)
+            for path in candidates
+        ]
+        try:
+            with tracer.span("replace.compute", files=len(tasks)):
+                results = self._compute(tasks)
+                if mode == "rename":
+                    results = self._resolve_rename(
+                        results, project_index, pattern, replacement
+                    )
+        except Exception as e:
+            print(f"❌ Error computing replacements: {str(e)}")
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        changes = []
+        occurrences = 0
+        for path, old_content, edits, count in results:
+            old_lines = old_content.split("\n")
+            new_lines, hunks = apply_line_edits(old_lines, edits)
+            changes.append((path, old_content, old_lines, new_lines, hunks))
+            occurrences += count
+
+        if not changes:
+            print(f"No matches found ({len(candidates)} files checked)")
+            return
+        print(
+            f"Found {occurrences} occurrences in {len(changes)} files "
+            f"({len(candidates)} candidates, {elapsed_ms:.1f} ms)"
+        )
+        self._preview(changes)
+
+        if self.interactive:
+            print(f"\nApply {occurrences} replacements? (yes/no)")
+            response = input("> ")
+            if response.lower() not in ["yes", "y"]:
+                print("Replace cancelled")
+                return
+
+        self._apply(changes, project_index, occurrences)
+
+    def _compute(self, tasks: List[tuple]) -> List[tuple]:
+        """Edits for every candidate file that has matches, in path order"""
+        if self.workers <= 1 or len(tasks) < PARALLEL_MIN_FILES:
+            results = [_replacements_for_file(task) for task in tasks]
+        else:
+            chunks = [
+                tasks[i : i + REPLACE_CHUNK_SIZE]
+                for i in range(0, len(tasks), REPLACE_CHUNK_SIZE)
+            ]
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                results = [
+                    result
+                    for chunk in pool.map(_replacements_for_chunk, chunks)
+                    for result in chunk
+                ]
+        return [result for result in results if result is not None]
+
+    def _resolve_rename(
+        self,
+        analyses: List[tuple],
+        project_index: Dict[str, FileInfo],
+        old_name: str,
+        new_name: str,
+    ) -> List[tuple]:
+        """Edits for the occurrences bound to the renamed symbol.
+
+        A star import can re-export the name from a module that never spells
+        it out, so such modules are analyzed too before deciding which
+        modules' bindings are the symbol.
+        """
+        analyses = {path: (content, analysis) for path, content, analysis in analyses}
+        python_paths = {
+            module_name_for_path(path): path
+            for path, file_info in project_index.items()
+            if file_info.language == "python"
+        }
+        pending = [analysis for _, analysis in analyses.values()]
+        while pending:
+            missing = {
+                python_paths[module]
+                for analysis in pending
+                for module in analysis.imported_from
+                if module in python_paths and python_paths[module] not in analyses
+            }
+            pending = []
+            for path in sorted(missing):
+                result = _replacements_for_file(
+                    (path, os.path.join(self.target_dir, path), "rename", old_name, "")
+                )
+                analyses[path] = result[1:] if result else ("", None)
+                if result:
+                    pending.append(result[2])
+
+        modules = renamed_modules(
+            analysis for _, analysis in analyses.values() if analysis is not None
+        )
+        results = []
+        for path in sorted(analyses):
+            content, analysis = analyses[path]
+            if analysis is None:
+                continue
+            positions = renamed_positions(analysis, modules)
+            if positions:
+                edits = _rename_edits(content, positions, old_name, new_name)
+                results.append((path, content, edits, len(positions)))
+        return results
+
+    def _preview(self, changes: List[tuple]):
+        """Show one diff for all files, cut short for large changes"""
+        print()
+        printed = 0
+        for number, (path, _, old_lines, new_lines, hunks) in enumerate(changes):
+            if number == PREVIEW_MAX_FILES or printed >= PREVIEW_MAX_LINES:
+                print(f"... and {len(changes) - number} more files")
+                return
+            printed += self.file_editor.show_diff(
+                old_lines,
+                new_lines,
+                refine_hunks(
+                    old_lines, new_lines, hunks, self.file_editor.diff_algorithm
+                ),
+                max_lines=PREVIEW_MAX_LINES - printed,
+                path=path,
+            )
+
+    @traced("replace.apply")
+    def _apply(
+        self, changes: List[tuple], project_index: Dict[str, FileInfo], count: int
+    ):
+        """Write all files as one change, then update the index"""
+        started = time.perf_counter()
+        files = []
+        for path, old_content, _, new_lines, _ in changes:
+            full_path = os.path.join(self.target_dir, path)
+            files.append((full_path, "\n".join(new_lines), old_content))
+
+        # Refuse to overwrite edits made since the files were read
+        for full_path, _, old_content in files:
+            try:
+                with open(full_path, "r", encoding="utf-8") as f:
+                    unchanged = f.read() == old_content
+            except (OSError, UnicodeDecodeError):
+                unchanged = False
+            if not unchanged:
+                rel_path = os.path.relpath(full_path, self.target_dir)
+                print(f"❌ {rel_path} changed on disk, nothing was replaced")
+                return
+
+        try:
+            write_files_atomically(files)
+        except Exception as e:
+            print(f"❌ Error writing files, nothing was replaced: {str(e)}")
+            return
+
+        stale = []
+        for (path, old_content, old_lines, new_lines, hunks), (_, content, _) in zip(
+            changes, files
+        ):
+            file_info = project_index.get(path)
+            if file_info is not None and file_info.content == old_content:
+                self.indexer.apply_edit(file_info, content, old_lines, new_lines, hunks)
+            else:
+                stale.append(path)
+        if stale:
+            self.indexer.refresh_paths(project_index, stale)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(
+            f"✅ Replaced {count} occurrences in {len(changes)} files "
+            f"({elapsed_ms:.1f} ms)"
+        )
+
+
+def _parse_arguments(arguments: str) -> Optional[Tuple[str, str, str]]:
+    """("regex", pattern, replacement) or ("rename", old, new)"""
+    arguments = arguments.strip()
+    if arguments.startswith("/"):
+        # The pattern ends at the first unescaped slash
+        index = 1
+        while index < len(arguments):
+            if arguments[index] == "\\":
+                index += 2
+                continue
+            if arguments[index] == "/":
+                break
+            index += 1
+        else:
+            return None
+        pattern = arguments[1:index]
+        rest = arguments[index + 1 :]
+        if not pattern or (rest and not rest.startswith(" ")):
+            return None
+        return "regex", pattern, rest[1:]
+
+    parts = arguments.split()
+    if len(parts) != 2:
+        return None
+    return "rename", parts[0], parts[1]
+
+
+def _replacements_for_chunk(tasks: List[tuple]) -> List[Optional[tuple]]:
+    return [_replacements_for_file(task) for task in tasks]
+
+
+def _replacements_for_file(task: tuple) -> Optional[tuple]:
+    """Read one file and compute its line edits.
+
+    Returns (path, content, edits, occurrences), or None when nothing in
+    the file matches or it can't be read. Renames return (path, content,
+    rename analysis) instead, since which occurrences are renamed depends
+    on the other files.
+    """
+    path, full_path, mode, pattern, replacement = task
+    try:
+        with open(full_path, "r", encoding="utf-8") as f:
+            content = f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+    if mode == "rename":
+        analysis = rename_analysis(path, content, pattern)
+        if analysis is None or not (analysis.occurrences or analysis.imported_from):
+            return None
+        return path, content, analysis
+
+    edits, count = _regex_edits(content, pattern, replacement)
+    if not count:
+        return None
+    return path, content, edits, count
+
+
+def _regex_edits(
+    content: str, pattern: str, replacement: str
+) -> Tuple[List[LineReplacement], int]:
+    """Line edits replacing every match, with ^ and $ matching at lines"""
+    regex = re.compile(pattern, re.MULTILINE)
+    # The same matches re.sub would replace
+    matches = list(regex.finditer(content))
+    if not matches:
+        return [], 0
+
+    line_starts = [0]
+    position = content.find("\n")
+    while position != -1:
+        line_starts.append(position + 1)
+        position = content.find("\n", position + 1)
+
+    def line_of(offset: int) -> int:
+        return bisect.bisect_right(line_starts, offset) - 1
+
+    # Matches touching the same lines are rewritten together
+    groups: List[List[re.Match]] = []
+    last_line = -1
+    for match in matches:
+        first = line_of(match.start())
+        if groups and first <= last_line:
+            groups[-1].append(match)
+        else:
+            groups.append([match])
+        last_line = max(last_line, line_of(max(match.end() - 1, match.start())))
+
+    edits = []
+    for group in groups:
+        first = line_of(group[0].start())
+        last = max(line_of(max(m.end() - 1, m.start())) for m in group)
+        start = line_starts[first]
+        end = line_starts[last + 1] - 1 if last + 1 < len(line_starts) else len(content)
+
+        pieces = []
+        position = start
+        for match in group:
+            pieces.append(content[position : match.start()])
+            pieces.append(match.expand(replacement))
+            position = match.end()
+        pieces.append(content[position:end])
+        edits.append((first, last - first + 1, "".join(pieces).split("\n")))
+    return edits, len(matches)
+
+
+def _rename_edits(
+    content: str, positions: List[Tuple[int, int]], old_name: str, new_name: str
+) -> List[LineReplacement]:
+    """Line edits replacing the name at each (line, column)"""
+    lines = content.split("\n")
+    columns: Dict[int, List[int]] = {}
+    for row, column in positions:
+        columns.setdefault(row, []).append(column)
+
+    edits = []
+    for row in sorted(columns):
+        line = lines[row]
+        pieces = []
+        position = 0
+        for column in sorted(columns[row]):
+            pieces.append(line[position:column])
+            pieces.append(new_name)
+            position = column + len(old_name)
+        pieces.append(line[position:])
+        edits.append((row, 1, ["".join(pieces)]))
+    return edits
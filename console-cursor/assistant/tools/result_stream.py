@@ -0,0 +1,133 @@
+"""
+Lazily consumed results: paging through a stream and keeping the best few.
+"""
+
+import heapq
+import threading
+from typing import Any, Callable, Iterable, List, Optional
+
+_EMPTY = object()
+
+
+class ResultStream:
+    """An iterator that can tell whether anything is left without losing it"""
+
+    __slots__ = ("_iterator", "_head")
+
+    def __init__(self, iterable: Iterable):
+        self._iterator = iter(iterable)
+        self._head = _EMPTY
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._head is not _EMPTY:
+            item, self._head = self._head, _EMPTY
+            return item
+        return next(self._iterator)
+
+    def exhausted(self) -> bool:
+        """Whether the stream is done, computing at most one more item"""
+        if self._head is _EMPTY:
+            self._head = next(self._iterator, _EMPTY)
+        return self._head is _EMPTY
+
+    def print_page(self, count: int) -> int:
+        """Print up to count lines as they are produced and return how many"""
+        shown = 0
+        while shown < count and not self.exhausted():
+            print(f"  {next(self)}")
+            shown += 1
+        return shown
+
+
+class ResultPager:
+    """Holds the unread part of the last result stream for `more`.
+
+    The stream is only advanced as pages are shown, so a search with
+    millions of matches costs no more than the pages actually read. A stream
+    reads the index lazily, so it is dropped once the index version it was
+    started against changes.
+    """
+
+    def __init__(self):
+        self._stream: Optional[ResultStream] = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def hold(self, stream: ResultStream, version: Any):
+        """Keep stream for later pages, or forget the last one if it is done"""
+        with self._lock:
+            self._stream = None if stream.exhausted() else stream
+            self._version = version
+
+    def clear(self):
+        """Forget the held stream"""
+        with self._lock:
+            self._stream = None
+
+    def more(self, count: int, version: Any):
+        """Print the next count lines of the held stream"""
+        with self._lock:
+            stream, self._stream = self._stream, None
+            stale = self._version != version
+        if stream is None:
+            print("No more results")
+            return
+        if stale:
+            print("⚠️ Files changed since these results, run the command again")
+            return
+        shown = stream.print_page(count)
+        if stream.exhausted():
+            print(f"Showed {shown} more results, that is all")
+            return
+        print(f"Showed {shown} more results, type 'more' for the next {count}")
+        self.hold(stream, version)
+
+
+class _Reversed:
+    """Wraps a key so a min-heap keeps its largest value on top"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other: "_Reversed") -> bool:
+        return other.value < self.value
+
+    def __eq__(self, other) -> bool:
+        return self.value == other.value
+
+
+class TopN:
+    """The limit smallest items by key of everything pushed, and a count.
+
+    Memory stays O(limit) however many items are pushed. Items with equal
+    keys keep the order they were pushed in.
+    """
+
+    def __init__(self, limit: int, key: Callable[[Any], Any] = lambda item: item):
+        self.limit = limit
+        self.key = key
+        self.count = 0
+        # (reversed key, -push number, item): the worst kept item is on top
+        self._heap: List[tuple] = []
+
+    def push(self, item):
+        self.count += 1
+        if self.limit <= 0:
+            return
+        entry = (_Reversed(self.key(item)), -self.count, item)
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, entry)
+        else:
+            heapq.heappushpop(self._heap, entry)
+
+    def items(self) -> List:
+        """Kept items, smallest key first"""
+        return [entry[2] for entry in sorted(self._heap, reverse=True)]
+
+    def __len__(self) -> int:
+        return self.count
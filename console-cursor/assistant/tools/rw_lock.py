@@ -0,0 +1,86 @@
+"""
+Reader/writer lock guarding the shared project index.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class ReadWriteLock:
+    """Many concurrent readers or one writer, with writers preferred.
+
+    Both sides are reentrant for the thread holding them, and a writer may
+    also take the read side. Upgrading a read lock to a write lock is not
+    supported and will deadlock.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+    def acquire_read(self):
+        local = self._local
+        depth = getattr(local, "reads", 0)
+        if depth:
+            local.reads = depth + 1
+            return
+        if self._writer == threading.get_ident():
+            # Covered by this thread's write lock, so not counted as a reader
+            local.reads, local.counted = 1, False
+            return
+        with self._cond:
+            while self._writer is not None or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+        local.reads, local.counted = 1, True
+
+    def release_read(self):
+        local = self._local
+        local.reads -= 1
+        if local.reads or not local.counted:
+            return
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            self._waiting_writers += 1
+            while self._writer is not None or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self):
+        with self._cond:
+            self._writer_depth -= 1
+            if not self._writer_depth:
+                self._writer = None
+                self._cond.notify_all()
@@ -0,0 +1,350 @@
+"""
+Trigram inverted index used to narrow down searches over the project.
+"""
+
+import re
+import sys
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from ..models.file_info import FileInfo
+from .edits import LineEdit
+
+# Lines per indexed block; a match is verified only inside candidate blocks
+BLOCK_LINES = 128
+# Rebuild postings once this share of blocks belongs to replaced files
+COMPACT_RATIO = 0.5
+
+# Block kind stored in the line slot of a block that covers a file path
+PATH_BLOCK = 0
+
+
+def trigrams(text: str) -> Set[str]:
+    """Return the set of lowercase trigrams in text"""
+    text = text.lower()
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def required_literals(pattern: str) -> List[str]:
+    """Literal runs that every match of a regex must contain.
+
+    Only sequences that are mandatory in every match are returned, so a
+    pattern with alternations or optional parts yields fewer (or no) runs.
+    Any pattern the parser does not understand yields no runs, which simply
+    disables narrowing.
+    """
+    try:
+        from re import _parser as sre_parse
+        from re import _constants as sre_constants
+    except ImportError:  # Python < 3.11
+        import sre_parse
+        import sre_constants
+
+    runs = []
+
+    def walk(items):
+        current = []
+        for op, arg in items:
+            if op is sre_constants.LITERAL:
+                current.append(chr(arg))
+                continue
+            if current:
+                runs.append("".join(current))
+                current = []
+            if op is sre_constants.SUBPATTERN:
+                walk(arg[-1])
+            elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+                if arg[0] >= 1:
+                    walk(arg[2])
+        if current:
+            runs.append("".join(current))
+
+    try:
+        walk(sre_parse.parse(pattern))
+    except Exception:
+        return []
+    return [run for run in runs if len(run) >= 3]
+
+
+class TrigramIndex:
+    """Inverted index from lowercase trigrams to blocks of file lines.
+
+    Each file is split into blocks of ``BLOCK_LINES`` lines plus one block
+    for its path. A query is narrowed to the blocks containing all of its
+    trigrams and only those slices of the content are scanned. Replaced files
+    leave their old blocks behind as tombstones, which are dropped by an
+    occasional compaction instead of on every edit.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        # block id -> (path, first line or PATH_BLOCK, start offset, end offset)
+        self._blocks: List[Optional[Tuple[str, int, int, int]]] = []
+        self._file_blocks: Dict[str, List[int]] = {}
+        self._dead = 0
+        self.ready = False
+
+    def build(self, project_index: Dict[str, FileInfo]):
+        """Index every file in project_index from scratch"""
+        self.__init__()
+        for file_info in project_index.values():
+            self.add_file(file_info.path, file_info.content)
+        self.ready = True
+
+    def add_file(self, path: str, content: str):
+        """Index a file that is not in the index yet"""
+        block_ids = [self._add_block((path, PATH_BLOCK, 0, 0), trigrams(path))]
+        block_ids.extend(self._add_line_blocks(path, content, 0, len(content), 1))
+        self._file_blocks[path] = block_ids
+
+    def _add_line_blocks(
+        self, path: str, content: str, start: int, stop: int, line: int
+    ) -> List[int]:
+        """Index content[start:stop], which begins at line, in blocks"""
+        block_ids = []
+        while start < stop:
+            end = start
+            for _ in range(BLOCK_LINES):
+                end = content.find("\n", end, stop)
+                if end == -1:
+                    end = stop
+                    break
+                end += 1
+            block = (path, line, start, end)
+            block_ids.append(self._add_block(block, trigrams(content[start:end])))
+            line += BLOCK_LINES
+            start = end
+        return block_ids
+
+    def remove_file(self, path: str):
+        """Forget a file; its postings are cleaned up on compaction"""
+        block_ids = self._file_blocks.pop(path, None)
+        if not block_ids:
+            return
+        for block_id in block_ids:
+            self._blocks[block_id] = None
+        self._dead += len(block_ids)
+
+        if self._dead > len(self._blocks) * COMPACT_RATIO:
+            self._compact()
+
+    def update_file(self, path: str, content: str):
+        """Re-index a file after its content changed"""
+        self.remove_file(path)
+        self.add_file(path, content)
+
+    def splice_file(self, path: str, content: str, hunks: List[LineEdit]):
+        """Re-index only the blocks touched by hunks (see edits.LineEdit).
+
+        Blocks overlapping a hunk are replaced by blocks covering the new
+        text; later blocks keep their postings and only have their line
+        numbers and offsets shifted.
+        """
+        block_ids = self._file_blocks.get(path)
+        if not block_ids or len(block_ids) < 2 or not hunks:
+            self.update_file(path, content)
+            return
+
+        blocks = self._blocks
+        line_ids = block_ids[1:]
+        count = len(line_ids)
+        new_ids = block_ids[:1]
+        line_shift = char_shift = 0
+        h = i = 0
+
+        def block_end_line(index: int) -> float:
+            # First old line (0-based) after block index
+            if index + 1 < count:
+                return blocks[line_ids[index + 1]][1] - 1
+            return float("inf")
+
+        while i < count:
+            _, line, start, end = blocks[line_ids[i]]
+            end_line = block_end_line(i)
+            if h == len(hunks) or hunks[h].old_start >= end_line:
+                if line_shift or char_shift:
+                    blocks[line_ids[i]] = (
+                        path,
+                        line + line_shift,
+                        start + char_shift,
+                        end + char_shift,
+                    )
+                new_ids.append(line_ids[i])
+                i += 1
+                continue
+
+            # A run of blocks touched by one or more hunks
+            new_line = line + line_shift
+            new_start = start + char_shift
+            j = i
+            while h < len(hunks) and hunks[h].old_start < end_line:
+                hunk = hunks[h]
+                while hunk.old_start + hunk.old_count > end_line and j + 1 < count:
+                    j += 1
+                    end_line = block_end_line(j)
+                line_shift += hunk.line_delta
+                char_shift += hunk.char_delta
+                h += 1
+
+            for k in range(i, j + 1):
+                blocks[line_ids[k]] = None
+            self._dead += j + 1 - i
+            if j + 1 < count:
+                new_stop = blocks[line_ids[j + 1]][2] + char_shift
+            else:
+                new_stop = len(content)
+            new_ids.extend(
+                self._add_line_blocks(path, content, new_start, new_stop, new_line)
+            )
+            i = j + 1
+
+        self._file_blocks[path] = new_ids
+        if self._dead > len(self._blocks) * COMPACT_RATIO:
+            self._compact()
+
+    def search(
+        self, project_index: Dict[str, FileInfo], query: str
+    ) -> Iterator[Tuple[str, int, str]]:
+        """Yield (path, line, text) for case-insensitive substring matches.
+
+        A line number of PATH_BLOCK means the file path itself matched.
+        """
+        needle = query.lower()
+        for path, line, start, end in self._candidate_blocks([needle]):
+            if line == PATH_BLOCK:
+                if needle in path.lower():
+                    yield path, PATH_BLOCK, path
+                continue
+
+            text = project_index[path].content[start:end]
+            lowered = text.lower()
+            if needle not in lowered:
+                continue
+            for offset, line_text in enumerate(text.split("\n")):
+                if needle in line_text.lower():
+                    yield path, line + offset, line_text.strip()
+
+    def search_regex(
+        self, project_index: Dict[str, FileInfo], pattern: str
+    ) -> Iterator[Tuple[str, int, str]]:
+        """Yield (path, line, text) for lines matching a regex (ignoring case)"""
+        regex = re.compile(pattern, re.IGNORECASE)
+        literals = [literal.lower() for literal in required_literals(pattern)]
+
+        for path, line, start, end in self._candidate_blocks(literals):
+            if line == PATH_BLOCK:
+                if regex.search(path):
+                    yield path, PATH_BLOCK, path
+                continue
+
+            text = project_index[path].content[start:end]
+            if text.endswith("\n"):
+                text = text[:-1]
+            for offset, line_text in enumerate(text.split("\n")):
+                if regex.search(line_text):
+                    yield path, line + offset, line_text.strip()
+
+    def candidate_paths(self, literals: List[str]) -> Set[str]:
+        """Files whose content may contain every literal (ignoring case).
+
+        Literals are matched block by block, so they may sit in different
+        blocks of a file. Literals spanning lines can cross a block boundary
+        and are not used for narrowing.
+        """
+        paths = None
+        for literal in literals:
+            if "\n" in literal:
+                continue
+            found = {
+                path
+                for path, line, _, _ in self._candidate_blocks([literal.lower()])
+                if line != PATH_BLOCK
+            }
+            paths = found if paths is None else paths & found
+        if paths is None:
+            return set(self._file_blocks)
+        return paths
+
+    def memory_usage(self) -> int:
+        """Approximate number of bytes held by the index"""
+        size = sys.getsizeof(self._postings) + sys.getsizeof(self._blocks)
+        for gram, block_ids in self._postings.items():
+            size += sys.getsizeof(gram) + sys.getsizeof(block_ids)
+        for block in self._blocks:
+            if block is not None:
+                size += sys.getsizeof(block)
+        size += sys.getsizeof(self._file_blocks)
+        for block_ids in self._file_blocks.values():
+            size += sys.getsizeof(block_ids)
+        # One int object per live block id, shared by all postings
+        size += sys.getsizeof(1 << 40) * (len(self._blocks) - self._dead)
+        return size
+
+    def describe(self) -> str:
+        """One-line summary of the index size"""
+        return (
+            f"{len(self._postings):,} trigrams, "
+            f"{len(self._blocks) - self._dead:,} blocks in "
+            f"{len(self._file_blocks):,} files "
+            f"(~{self.memory_usage() / (1024 * 1024):.1f} MB)"
+        )
+
+    def _add_block(self, block: Tuple[str, int, int, int], grams: Set[str]) -> int:
+        block_id = len(self._blocks)
+        self._blocks.append(block)
+        postings = self._postings
+        for gram in grams:
+            block_ids = postings.get(gram)
+            if block_ids is None:
+                postings[gram] = {block_id}
+            else:
+                block_ids.add(block_id)
+        return block_id
+
+    def _candidate_blocks(self, literals: List[str]) -> List[Tuple[str, int, int, int]]:
+        """Live blocks containing every trigram of every literal, in file order"""
+        grams = set()
+        for literal in literals:
+            grams.update(trigrams(literal))
+
+        if grams:
+            posting_lists = []
+            for gram in grams:
+                block_ids = self._postings.get(gram)
+                if not block_ids:
+                    return []
+                posting_lists.append(block_ids)
+            posting_lists.sort(key=len)
+            candidates = set(posting_lists[0])
+            for block_ids in posting_lists[1:]:
+                candidates &= block_ids
+                if not candidates:
+                    return []
+        else:
+            # Too short to narrow down: every block is a candidate
+            candidates = range(len(self._blocks))
+
+        blocks = [self._blocks[i] for i in candidates]
+        return sorted(block for block in blocks if block is not None)
+
+    def _compact(self):
+        """Renumber live blocks and drop postings of removed ones"""
+        remap = {}
+        blocks = []
+        for old_id, block in enumerate(self._blocks):
+            if block is not None:
+                remap[old_id] = len(blocks)
+                blocks.append(block)
+
+        postings = {}
+        for gram, block_ids in self._postings.items():
+            live = {remap[i] for i in block_ids if i in remap}
+            if live:
+                postings[gram] = live
+
+        self._blocks = blocks
+        self._postings = postings
+        self._file_blocks = {
+            path: [remap[i] for i in block_ids]
+            for path, block_ids in self._file_blocks.items()
+        }
+        self._dead = 0
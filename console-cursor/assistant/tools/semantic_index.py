@@ -0,0 +1,581 @@
+"""
+Semantic search over functions, classes and docstrings with a vector index.
+"""
+
+import os
+import re
+import math
+import heapq
+import pickle
+import hashlib
+import tempfile
+import zlib
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Optional: vectors are kept in arrays and scanned in Python
+    np = None
+
+from ..models.file_info import FileInfo
+from .index_cache import default_cache_dir
+from .tracing import tracer
+
+# Size of hashing-vectorizer vectors
+DEFAULT_DIMENSIONS = 256
+# Weight of a character trigram relative to a whole word
+TRIGRAM_WEIGHT = 0.25
+# Symbols embedded per call to the embedder
+EMBED_BATCH_SIZE = 1024
+# Rows per block of the matrix; a search scores one block at a time
+BLOCK_ROWS = 16384
+# Rewrite the matrix once this share of rows belongs to removed symbols
+COMPACT_RATIO = 0.5
+# Bumped whenever the stored layout or the documents change
+METADATA_VERSION = 1
+
+# (path, line, kind, qualified name, first docstring line)
+SymbolDoc = Tuple[str, int, str, str, str]
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in is it of on or the to with self cls".split()
+)
+_TOKEN = re.compile(r"[A-Za-z0-9_]+")
+_SUBWORD = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def _features(text: str):
+    """(feature, weight) pairs: identifiers, their words and word trigrams"""
+    for token in _TOKEN.findall(text):
+        words = [
+            word.lower()
+            for piece in token.split("_")
+            for word in _SUBWORD.findall(piece)
+        ]
+        if len(words) > 1:
+            yield "i:" + token.lower(), 1.0
+        for word in words:
+            if len(word) < 2 or word in _STOPWORDS:
+                continue
+            yield "w:" + word, 1.0
+            padded = f" {word} "
+            for i in range(len(padded) - 2):
+                yield "t:" + padded[i : i + 3], TRIGRAM_WEIGHT
+
+
+class HashingEmbedder:
+    """Bag-of-words vectors hashed into a fixed number of signed dimensions.
+
+    Identifiers are split at underscores and case changes, and character
+    trigrams make related word forms ("parse", "parser") overlap. It needs
+    no model or network, and gives the same vectors on every machine, so
+    stored vectors stay valid between sessions.
+    """
+
+    def __init__(self, dimensions: int = DEFAULT_DIMENSIONS):
+        self.dimensions = dimensions
+        self.name = f"hashing-{dimensions}"
+        # feature -> (dimension, sign)
+        self._slots: Dict[str, Tuple[int, float]] = {}
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """Unit-length vectors for texts"""
+        return [self._vector(text) for text in texts]
+
+    def _vector(self, text: str) -> List[float]:
+        weights: Dict[int, float] = {}
+        for feature, weight in _features(text):
+            slot = self._slots.get(feature)
+            if slot is None:
+                if len(self._slots) > 1 << 20:
+                    self._slots.clear()
+                code = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if code & 0x80000000 else -1.0
+                slot = self._slots[feature] = (code % self.dimensions, sign)
+            dimension, sign = slot
+            weights[dimension] = weights.get(dimension, 0.0) + sign * weight
+
+        vector = [0.0] * self.dimensions
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        if norm:
+            for dimension, weight in weights.items():
+                vector[dimension] = weight / norm
+        return vector
+
+
+class SentenceTransformerEmbedder:
+    """A local sentence-transformers model, loaded from a directory or the
+    local model cache; nothing is downloaded"""
+
+    def __init__(self, model: str):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ValueError(
+                "sentence-transformers is not installed "
+                "(pip install sentence-transformers)"
+            ) from None
+        self.model = SentenceTransformer(model, local_files_only=True)
+        self.dimensions = self.model.get_sentence_embedding_dimension()
+        self.name = "st-" + os.path.basename(model.rstrip("/"))
+
+    def embed(self, texts: Sequence[str]):
+        return self.model.encode(
+            list(texts), batch_size=64, normalize_embeddings=True
+        )
+
+
+EMBEDDERS = {
+    "hashing": HashingEmbedder,
+    "sentence-transformers": SentenceTransformerEmbedder,
+}
+
+
+def load_embedder(spec: str):
+    """Embedder from "name" or "name:argument", e.g. "sentence-transformers:DIR" """
+    name, _, argument = spec.partition(":")
+    if name not in EMBEDDERS:
+        raise ValueError(
+            f"Unknown embedder '{name}' (choose from {', '.join(EMBEDDERS)})"
+        )
+    if name == "hashing":
+        return HashingEmbedder(int(argument) if argument else DEFAULT_DIMENSIONS)
+    if not argument:
+        raise ValueError(f"Embedder '{name}' needs a model: {name}:<model>")
+    return EMBEDDERS[name](argument)
+
+
+def symbol_documents(file_info: FileInfo) -> List[Tuple[SymbolDoc, str]]:
+    """(symbol, text to embed) for each function, method and class of a file"""
+    module_words = os.path.splitext(file_info.path)[0].replace(os.sep, " ")
+    owners = {
+        method.line: cls.name for cls in file_info.classes for method in cls.methods
+    }
+    documents = []
+    for function in file_info.functions:
+        owner = owners.get(function.line)
+        qualname = f"{owner}.{function.name}" if owner else function.name
+        text = (
+            f"{qualname} {' '.join(function.args)} "
+            f"{function.docstring} {module_words}"
+        )
+        symbol = (
+            file_info.path,
+            function.line,
+            "method" if owner else "function",
+            qualname,
+            _summary(function.docstring),
+        )
+        documents.append((symbol, text))
+    for cls in file_info.classes:
+        methods = " ".join(method.name for method in cls.methods)
+        text = f"{cls.name} {cls.docstring} {methods} {module_words}"
+        symbol = (file_info.path, cls.line, "class", cls.name, _summary(cls.docstring))
+        documents.append((symbol, text))
+    return documents
+
+
+def _summary(docstring: str) -> str:
+    return docstring.strip().split("\n", 1)[0] if docstring else ""
+
+
+class _Rows:
+    """Growable matrix of unit vectors.
+
+    With NumPy, rows are stored in blocks of ``BLOCK_ROWS``, each block
+    column-major (dimensions x rows), so a sparse query (as the hashing
+    embedder produces) only reads the columns of its nonzero dimensions,
+    and growing means adding a block, which a memory-mapped file can do in
+    place. Without NumPy rows are kept in a flat array and scanned in
+    Python.
+    """
+
+    def __init__(self, dimensions: int, path: Optional[str] = None, rows: int = 0):
+        self.dimensions = dimensions
+        self.path = path
+        self.count = rows
+        if np is None:
+            self.path = None
+            self.data = array("f", bytes(4 * dimensions * rows))
+            return
+        blocks = max(1, -(-rows // BLOCK_ROWS))
+        if self.path is None:
+            self.data = np.zeros((blocks, dimensions, BLOCK_ROWS), dtype=np.float32)
+        else:
+            self.data = self._map(blocks)
+
+    def _map(self, blocks: int):
+        """Map the file at path, growing it to a number of blocks if smaller"""
+        size = blocks * self.dimensions * BLOCK_ROWS * 4
+        with open(self.path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(
+            self.path,
+            dtype=np.float32,
+            mode="r+",
+            shape=(blocks, self.dimensions, BLOCK_ROWS),
+        )
+
+    def append(self, vectors) -> List[int]:
+        """Add vectors as new rows, returning their row numbers"""
+        first = self.count
+        if np is None:
+            for vector in vectors:
+                self.data.extend(vector)
+                self.count += 1
+            return list(range(first, self.count))
+
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimensions)
+        needed = first + len(vectors)
+        blocks = -(-needed // BLOCK_ROWS)
+        if blocks > len(self.data):
+            blocks = max(blocks, 2 * len(self.data))
+            if self.path is None:
+                grown = np.zeros(
+                    (blocks, self.dimensions, BLOCK_ROWS), dtype=np.float32
+                )
+                grown[: len(self.data)] = self.data
+                self.data = grown
+            else:
+                self.data.flush()
+                self.data = self._map(blocks)
+
+        row = first
+        while row < needed:
+            block, offset = divmod(row, BLOCK_ROWS)
+            take = min(BLOCK_ROWS - offset, needed - row)
+            self.data[block, :, offset : offset + take] = vectors[
+                row - first : row - first + take
+            ].T
+            row += take
+        self.count = needed
+        return list(range(first, needed))
+
+    def get(self, row_ids: List[int]):
+        """Vectors of rows, one per row"""
+        if np is None:
+            dimensions = self.dimensions
+            return [
+                self.data[row * dimensions : (row + 1) * dimensions]
+                for row in row_ids
+            ]
+        blocks, offsets = np.divmod(np.asarray(row_ids, dtype=np.int64), BLOCK_ROWS)
+        return self.data[blocks, :, offsets]
+
+    def clear(self, row_ids: List[int]):
+        """Zero rows of removed symbols so they never score"""
+        if np is None:
+            zeros = array("f", bytes(4 * self.dimensions))
+            for row in row_ids:
+                start = row * self.dimensions
+                self.data[start : start + self.dimensions] = zeros
+        elif row_ids:
+            blocks, offsets = np.divmod(
+                np.asarray(row_ids, dtype=np.int64), BLOCK_ROWS
+            )
+            self.data[blocks, :, offsets] = 0
+
+    def top_k(self, query: Sequence[float], k: int) -> List[Tuple[float, int]]:
+        """(score, row) of the k rows with the highest dot product, best first"""
+        if not self.count:
+            return []
+        if np is None:
+            return self._top_k_python(query, k)
+
+        query = np.asarray(query, dtype=np.float32)
+        dims = np.flatnonzero(query)
+        # Sparse queries only read their own dimensions' columns
+        sparse = len(dims) < self.dimensions // 2
+        weights = query[dims]
+        best_scores = []
+        best_rows = []
+        for block in range(-(-self.count // BLOCK_ROWS)):
+            rows = min(BLOCK_ROWS, self.count - block * BLOCK_ROWS)
+            if sparse:
+                scores = weights @ self.data[block, dims, :rows]
+            else:
+                scores = query @ self.data[block, :, :rows]
+            if rows > k:
+                top = np.argpartition(scores, -k)[-k:]
+                scores = scores[top]
+            else:
+                top = np.arange(rows)
+            best_scores.append(scores)
+            best_rows.append(top + block * BLOCK_ROWS)
+        scores = np.concatenate(best_scores)
+        rows = np.concatenate(best_rows)
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [(float(scores[i]), int(rows[i])) for i in order]
+
+    def _top_k_python(self, query: Sequence[float], k: int) -> List[Tuple[float, int]]:
+        # Hashed vectors are sparse, so only the query's nonzero dimensions count
+        terms = [(d, w) for d, w in enumerate(query) if w]
+        data = self.data
+        dimensions = self.dimensions
+        scores = (
+            (sum(data[base + d] * w for d, w in terms), row)
+            for row, base in enumerate(range(0, self.count * dimensions, dimensions))
+        )
+        return heapq.nlargest(k, scores)
+
+    def flush(self):
+        if self.path is not None:
+            self.data.flush()
+
+
+class SemanticIndex:
+    """Vectors for every function, method and class, searched by cosine.
+
+    Symbols are embedded once; afterwards only files whose symbols changed
+    are embedded again. Rows of replaced symbols are zeroed and reclaimed
+    by an occasional compaction. With ``mmap`` the matrix lives in a file
+    in the cache directory, next to the symbol list, so a new session only
+    embeds what changed since the last one. The stored symbol list is
+    dropped before the matrix is first changed in place and written again
+    by ``save``, so a session that ends early never leaves a list that
+    disagrees with the matrix.
+    """
+
+    def __init__(
+        self,
+        target_dir: str,
+        embedder=None,
+        mmap: bool = False,
+        cache_dir: Optional[str] = None,
+    ):
+        self.embedder = embedder or HashingEmbedder()
+        self.dimensions = self.embedder.dimensions
+        self.mmap = mmap and np is not None
+        key = hashlib.sha1(os.path.abspath(target_dir).encode("utf-8")).hexdigest()
+        self._base_path = os.path.join(
+            cache_dir or default_cache_dir(),
+            "semantic",
+            f"{key[:16]}-{self.embedder.name}",
+        )
+        self._rows: Optional[_Rows] = None
+        # row -> symbol, None for removed symbols
+        self._symbols: List[Optional[SymbolDoc]] = []
+        # path -> (digest of the embedded texts, rows)
+        self._files: Dict[str, Tuple[str, List[int]]] = {}
+        self._dead = 0
+        # Whether the stored symbol list describes the matrix as it is now
+        self._saved = False
+        self.ready = False
+
+    def _new_rows(self, suffix: str = ".f32") -> _Rows:
+        """Empty matrix, in memory or in a new file"""
+        if not self.mmap:
+            return _Rows(self.dimensions)
+        os.makedirs(os.path.dirname(self._base_path), exist_ok=True)
+        path = self._base_path + suffix
+        if os.path.exists(path):
+            os.unlink(path)
+        return _Rows(self.dimensions, path)
+
+    def __len__(self) -> int:
+        """Live symbols"""
+        return len(self._symbols) - self._dead
+
+    def build(self, project_index: Dict[str, FileInfo]):
+        """Embed every symbol, reusing stored vectors of unchanged files"""
+        with tracer.span("semantic.build", files=len(project_index)):
+            if self._rows is None and not (self.mmap and self._load()):
+                self._rows = self._new_rows()
+            pending = []
+            for file_info in project_index.values():
+                if not (file_info.functions or file_info.classes) and (
+                    file_info.path not in self._files
+                ):
+                    continue
+                documents = symbol_documents(file_info)
+                digest = _digest(documents)
+                if self._files.get(file_info.path, (None,))[0] == digest:
+                    continue
+                self._remove_rows(file_info.path)
+                pending.append((file_info.path, digest, documents))
+
+            # Files that left the project since the vectors were stored
+            for path in set(self._files) - set(project_index):
+                self._remove_rows(path)
+
+            self._embed(pending)
+            self._maybe_compact()
+            self.save()
+        self.ready = True
+
+    def update_file(self, file_info: FileInfo):
+        """Re-embed a file's symbols if they changed"""
+        documents = symbol_documents(file_info)
+        digest = _digest(documents)
+        if self._files.get(file_info.path, (None,))[0] == digest:
+            return
+        self._remove_rows(file_info.path)
+        self._embed([(file_info.path, digest, documents)])
+        self._maybe_compact()
+
+    def remove_file(self, path: str):
+        self._remove_rows(path)
+
+    def save_if_changed(self):
+        """Store the symbol list if files changed since it was last stored"""
+        if not self._saved and self._rows is not None:
+            self.save()
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[float, SymbolDoc]]:
+        """(cosine similarity, symbol) of the k closest symbols, best first"""
+        if self._rows is None or k < 1:
+            return []
+        with tracer.span("semantic.search"):
+            (vector,) = self.embedder.embed([query])
+            # Removed symbols score 0 and are dropped below
+            results = []
+            for score, row in self._rows.top_k(vector, k):
+                symbol = self._symbols[row]
+                if symbol is not None and score > 0:
+                    results.append((score, symbol))
+            return results
+
+    def _embed(self, pending: List[Tuple[str, str, List[Tuple[SymbolDoc, str]]]]):
+        """Embed the documents of several files in batches and add them"""
+        batch_symbols: List[SymbolDoc] = []
+        batch_texts: List[str] = []
+        owners: List[Tuple[str, str, int]] = []
+
+        def flush_batch():
+            if not batch_texts:
+                return
+            with tracer.span("semantic.embed", symbols=len(batch_texts)):
+                vectors = self.embedder.embed(batch_texts)
+            rows = self._rows.append(vectors)
+            self._symbols.extend(batch_symbols)
+            tracer.add("semantic.symbols_embedded", len(batch_texts))
+            position = 0
+            for path, digest, count in owners:
+                taken = rows[position : position + count]
+                self._files[path] = (digest, self._files[path][1] + taken)
+                position += count
+            batch_symbols.clear()
+            batch_texts.clear()
+            owners.clear()
+
+        for path, digest, documents in pending:
+            self._files[path] = (digest, [])
+            for start in range(0, len(documents), EMBED_BATCH_SIZE):
+                chunk = documents[start : start + EMBED_BATCH_SIZE]
+                batch_symbols.extend(symbol for symbol, _ in chunk)
+                batch_texts.extend(text for _, text in chunk)
+                owners.append((path, digest, len(chunk)))
+                if len(batch_texts) >= EMBED_BATCH_SIZE:
+                    flush_batch()
+        flush_batch()
+
+    def _remove_rows(self, path: str):
+        _, rows = self._files.pop(path, (None, []))
+        if rows:
+            self._discard_saved()
+            self._rows.clear(rows)
+            for row in rows:
+                self._symbols[row] = None
+            self._dead += len(rows)
+
+    def _maybe_compact(self):
+        """Copy live rows to a fresh matrix once most rows are dead"""
+        if self._dead < BLOCK_ROWS or self._dead < COMPACT_RATIO * len(
+            self._symbols
+        ):
+            return
+        with tracer.span("semantic.compact", rows=len(self._symbols)):
+            self._discard_saved()
+            old_rows, old_symbols = self._rows, self._symbols
+            # A memory-mapped matrix is rebuilt next to the old file
+            self._rows = self._new_rows(".f32.tmp")
+            self._symbols = []
+            self._dead = 0
+            for path, (digest, rows) in self._files.items():
+                new_rows = self._rows.append(old_rows.get(rows)) if rows else []
+                self._symbols.extend(old_symbols[row] for row in rows)
+                self._files[path] = (digest, new_rows)
+            if self.mmap:
+                self._rows.flush()
+                os.replace(self._rows.path, self._base_path + ".f32")
+                self._rows.path = self._base_path + ".f32"
+
+    def save(self):
+        """Store the symbol list next to a memory-mapped matrix"""
+        if not self.mmap:
+            return
+        self._rows.flush()
+        metadata = {
+            "version": METADATA_VERSION,
+            "embedder": self.embedder.name,
+            "dimensions": self.dimensions,
+            "rows": self._rows.count,
+            "symbols": self._symbols,
+            "files": self._files,
+        }
+        directory = os.path.dirname(self._base_path)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(metadata, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._base_path + ".meta")
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._saved = True
+
+    def _discard_saved(self):
+        """Delete the stored symbol list before the matrix changes under it"""
+        if not (self.mmap and self._saved):
+            return
+        try:
+            os.unlink(self._base_path + ".meta")
+        except FileNotFoundError:
+            pass
+        self._saved = False
+
+    def _load(self) -> bool:
+        """Adopt the stored matrix and symbols if they match the embedder"""
+        try:
+            with open(self._base_path + ".meta", "rb") as f:
+                metadata = pickle.load(f)
+            if (
+                metadata.get("version") != METADATA_VERSION
+                or metadata["embedder"] != self.embedder.name
+                or metadata["dimensions"] != self.dimensions
+                or os.path.getsize(self._base_path + ".f32")
+                < metadata["rows"] * self.dimensions * 4
+            ):
+                return False
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable semantic index: {str(e)}")
+            return False
+
+        self._rows = _Rows(self.dimensions, self._base_path + ".f32", metadata["rows"])
+        self._symbols = metadata["symbols"]
+        self._files = metadata["files"]
+        self._dead = sum(1 for symbol in self._symbols if symbol is None)
+        self._saved = True
+        return True
+
+    def describe(self) -> str:
+        backend = "NumPy" if np is not None else "pure Python"
+        if self.mmap:
+            backend += ", memory-mapped"
+        return (
+            f"{len(self):,} symbols, {self.dimensions} dimensions, "
+            f"{self.embedder.name} ({backend})"
+        )
+
+
+def _digest(documents: List[Tuple[SymbolDoc, str]]) -> str:
+    digest = hashlib.sha1()
+    for symbol, text in documents:
+        digest.update(repr(symbol).encode("utf-8"))
+        digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
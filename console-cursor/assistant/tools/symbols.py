@@ -0,0 +1,181 @@
+"""
+Project-wide symbol table with definitions, references and imports.
+"""
+
+import os
+from typing import Dict, List, Set, Tuple
+
+from ..models.file_info import FileInfo
+from .python_structure import python_structure
+
+# (path, line, kind, qualified name)
+Definition = Tuple[str, int, str, str]
+
+
+def module_name_for_path(rel_path: str) -> str:
+    """Dotted module name for a Python file path relative to the project"""
+    module = os.path.splitext(rel_path)[0].replace(os.sep, ".")
+    if module.endswith(".__init__"):
+        module = module[: -len(".__init__")]
+    return module
+
+
+def resolve_import(
+    module_name: str, level: int, current_module: str, is_package: bool
+) -> str:
+    """Turn a (possibly relative) import into an absolute module name"""
+    if not level:
+        return module_name
+    parts = current_module.split(".")
+    # A module's own package is one level up; a package is its own package
+    drop = level - 1 if is_package else level
+    base = parts[: len(parts) - drop] if drop else parts
+    return ".".join(base + ([module_name] if module_name else []))
+
+
+class SymbolTable:
+    """Definitions, references and the import graph of all Python files.
+
+    Lookups are dictionary accesses keyed by symbol or module name. Each
+    file's contributions are remembered so re-indexing a single file only
+    touches the entries that file produced.
+    """
+
+    def __init__(self):
+        self.definitions: Dict[str, List[Definition]] = {}
+        self.references: Dict[str, Dict[str, List[int]]] = {}
+        self.importers: Dict[str, Set[str]] = {}
+        # path -> (defined keys, referenced names, imported modules)
+        self._contributions: Dict[str, Tuple[Set[str], Set[str], Set[str]]] = {}
+        self.ready = False
+
+    def build(self, project_index: Dict[str, FileInfo]):
+        """Collect symbols from every Python file in project_index"""
+        self.__init__()
+        for file_info in project_index.values():
+            self.update_file(file_info)
+        self.ready = True
+
+    def update_file(self, file_info: FileInfo):
+        """Replace everything a single file contributes to the table"""
+        self.remove_file(file_info.path)
+        if file_info.language != "python":
+            return
+
+        structure, error = python_structure(file_info.content)
+        if error is not None:
+            return
+
+        path = file_info.path
+        defined = set()
+        for name, line, kind, qualname in structure.definitions:
+            definition = (path, line, kind, qualname)
+            for key in {name, qualname}:
+                self.definitions.setdefault(key, []).append(definition)
+                defined.add(key)
+
+        referenced = set()
+        for name, line in structure.references:
+            self.references.setdefault(name, {}).setdefault(path, []).append(line)
+            referenced.add(name)
+
+        imported = self._imported_modules(path, structure)
+        for module in imported:
+            self.importers.setdefault(module, set()).add(path)
+
+        self._contributions[path] = (defined, referenced, imported)
+
+    def remove_file(self, path: str):
+        """Drop everything a file contributed to the table"""
+        contribution = self._contributions.pop(path, None)
+        if contribution is None:
+            return
+        defined, referenced, imported = contribution
+
+        for key in defined:
+            remaining = [d for d in self.definitions.get(key, []) if d[0] != path]
+            if remaining:
+                self.definitions[key] = remaining
+            else:
+                self.definitions.pop(key, None)
+
+        for name in referenced:
+            by_file = self.references.get(name)
+            if by_file is not None:
+                by_file.pop(path, None)
+                if not by_file:
+                    del self.references[name]
+
+        for module in imported:
+            paths = self.importers.get(module)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self.importers[module]
+
+    def _imported_modules(self, path: str, structure) -> Set[str]:
+        """Absolute names of the modules (and imported members) of a file"""
+        current = module_name_for_path(path)
+        is_package = os.path.basename(path) == "__init__.py"
+        imported = set()
+        for module, level, names in structure.import_modules:
+            if not names:
+                imported.add(module)
+                continue
+            base = resolve_import(module, level, current, is_package)
+            if base:
+                imported.add(base)
+            for name in names:
+                if name != "*":
+                    imported.add(f"{base}.{name}" if base else name)
+        return imported
+
+    def find_definitions(self, name: str) -> List[Definition]:
+        return self.definitions.get(name, [])
+
+    def find_references(self, name: str) -> Dict[str, List[int]]:
+        # Qualified names are referenced by their last component
+        return self.references.get(name.rsplit(".", 1)[-1], {})
+
+    def find_importers(self, module: str) -> Set[str]:
+        return self.importers.get(module, set())
+
+    def show_definitions(self, name: str):
+        """Print where a symbol is defined"""
+        definitions = self.find_definitions(name)
+        if not definitions:
+            print(f"No definition found for '{name}'")
+            return
+
+        print(f"📍 Definitions of '{name}':")
+        for path, line, kind, qualname in sorted(definitions):
+            print(f"  {path}:{line}  {kind} {qualname}")
+
+    def show_references(self, name: str, limit: int = 20):
+        """Print where a symbol is referenced"""
+        by_file = self.find_references(name)
+        if not by_file:
+            print(f"No references found for '{name}'")
+            return
+
+        total = sum(len(lines) for lines in by_file.values())
+        print(f"🔗 {total} references to '{name}' in {len(by_file)} files:")
+        shown = 0
+        for path in sorted(by_file):
+            for line in sorted(by_file[path]):
+                if shown == limit:
+                    print(f"  ... and {total - shown} more references")
+                    return
+                print(f"  {path}:{line}")
+                shown += 1
+
+    def show_importers(self, module: str):
+        """Print the files importing a module"""
+        paths = self.find_importers(module)
+        if not paths:
+            print(f"No files import '{module}'")
+            return
+
+        print(f"📦 {len(paths)} files import '{module}':")
+        for path in sorted(paths):
+            print(f"  {path}")
@@ -0,0 +1,215 @@
+"""
+Lightweight tracing spans and counters for the assistant's hot paths.
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+import functools
+from typing import Any, Callable, Dict, List, Optional
+
+# Timeline events kept for --trace; later spans are only counted
+MAX_TRACE_EVENTS = 200_000
+
+
+class _SpanStats:
+    """Totals for every span with the same name"""
+
+    __slots__ = ("count", "total_ns", "max_ns")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "started")
+
+    def __init__(self, tracer: "Tracer", name: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self) -> "_Span":
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer._finish(self, time.perf_counter_ns())
+        return False
+
+
+class Tracer:
+    """Per-name span totals and counters, plus an optional event timeline.
+
+    Totals are always kept since they cost a lock and a few additions per
+    span. The timeline, needed for a Chrome trace, is only recorded once
+    ``start_timeline`` is called. Spans are meant for phases and per-file
+    work, not for tight inner loops.
+    """
+
+    def __init__(self):
+        self._spans: Dict[str, _SpanStats] = {}
+        self._counters: Dict[str, int] = {}
+        self._events: Optional[List[dict]] = None
+        self._dropped = 0
+        self._origin_ns = time.perf_counter_ns()
+        self._lock = threading.Lock()
+
+    def span(self, name: str, **args) -> _Span:
+        """Context manager timing a block under a name"""
+        return _Span(self, name, args)
+
+    def add(self, name: str, amount: int = 1):
+        """Increase a counter"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+            if self._events is not None and len(self._events) < MAX_TRACE_EVENTS:
+                self._events.append(
+                    {
+                        "name": name,
+                        "ph": "C",
+                        "ts": self._micros(time.perf_counter_ns()),
+                        "pid": os.getpid(),
+                        "args": {"value": self._counters[name]},
+                    }
+                )
+
+    def start_timeline(self):
+        """Record every span and counter change from now on"""
+        with self._lock:
+            if self._events is None:
+                self._events = []
+
+    def reset(self):
+        """Forget recorded spans, counters and events"""
+        with self._lock:
+            self._spans = {}
+            self._counters = {}
+            if self._events is not None:
+                self._events = []
+            self._dropped = 0
+
+    def _after_fork(self):
+        """Fresh state in a forked worker, whose parent may hold the lock"""
+        self._lock = threading.Lock()
+        self._events = None
+
+    def _finish(self, span: _Span, finished: int):
+        elapsed = finished - span.started
+        with self._lock:
+            stats = self._spans.get(span.name)
+            if stats is None:
+                stats = self._spans[span.name] = _SpanStats()
+            stats.count += 1
+            stats.total_ns += elapsed
+            if elapsed > stats.max_ns:
+                stats.max_ns = elapsed
+
+            if self._events is None:
+                return
+            if len(self._events) >= MAX_TRACE_EVENTS:
+                self._dropped += 1
+                return
+            event = {
+                "name": span.name,
+                "cat": span.name.split(".", 1)[0],
+                "ph": "X",
+                "ts": self._micros(span.started),
+                "dur": elapsed / 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+            }
+            if span.args:
+                event["args"] = span.args
+            self._events.append(event)
+
+    def _micros(self, ns: int) -> float:
+        return (ns - self._origin_ns) / 1000
+
+    def report(self) -> str:
+        """Time per span name, slowest first, and counter values"""
+        with self._lock:
+            spans = sorted(
+                self._spans.items(), key=lambda item: item[1].total_ns, reverse=True
+            )
+            counters = sorted(self._counters.items())
+
+        lines = ["📊 Profile:"]
+        if not spans and not counters:
+            lines.append("  Nothing recorded yet")
+            return "\n".join(lines)
+        if spans:
+            lines.append(
+                f"  {'span':<28} {'count':>7} {'total ms':>10} "
+                f"{'mean ms':>9} {'max ms':>9}"
+            )
+            for name, stats in spans:
+                lines.append(
+                    f"  {name:<28} {stats.count:>7} "
+                    f"{stats.total_ns / 1e6:>10.1f} "
+                    f"{stats.total_ns / stats.count / 1e6:>9.2f} "
+                    f"{stats.max_ns / 1e6:>9.2f}"
+                )
+        if counters:
+            lines.append(f"  {'counter':<28} {'value':>7}")
+            for name, value in counters:
+                lines.append(f"  {name:<28} {value:>7,}")
+        return "\n".join(lines)
+
+    def write_trace(self, path: str) -> int:
+        """Write the timeline as Chrome trace events, returning the event count.
+
+        The file loads in chrome://tracing or https://ui.perfetto.dev.
+        """
+        with self._lock:
+            events = list(self._events or [])
+            dropped = self._dropped
+        metadata = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": os.getpid(),
+                "tid": thread.ident,
+                "args": {"name": thread.name},
+            }
+            for thread in threading.enumerate()
+        ]
+        trace = {
+            "traceEvents": metadata + events,
+            "displayTimeUnit": "ms",
+            "otherData": {"dropped_events": dropped},
+        }
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(trace, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return len(events)
+
+
+def traced(name: str) -> Callable:
+    """Decorator recording each call of a function as a span"""
+
+    def decorate(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+# Shared by every tool in the process
+tracer = Tracer()
+os.register_at_fork(after_in_child=tracer._after_fork)
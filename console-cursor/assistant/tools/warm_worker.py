@@ -0,0 +1,484 @@
+"""
+Warm Python worker for the run command.
+
+A long-lived "zygote" process keeps the interpreter, pytest and the project's
+modules imported. Each eligible ``run python …`` or ``run pytest …`` is served
+by forking the zygote, so the child starts with everything already imported
+and still gets a fresh copy of that state for every run.
+"""
+
+import os
+import sys
+import json
+import shlex
+import shutil
+import signal
+import socket
+import asyncio
+import itertools
+import selectors
+import threading
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+# Commands using shell syntax always go through the shell
+SHELL_OPERATORS = set("|&;<>()$`\n")
+MAX_MESSAGE_SIZE = 1 << 16
+STARTUP_TIMEOUT = 10.0
+
+
+def parse_command(command: str, target_dir: str) -> Optional[Tuple[str, List[str]]]:
+    """Return (kind, args) if a command can run in the warm worker.
+
+    kind is "pytest", "module" (``python -m mod``) or "script"
+    (``python file.py``); anything else returns None and runs in a shell, as
+    does a command whose program would not run the zygote's interpreter.
+    """
+    if SHELL_OPERATORS & set(command):
+        return None
+    try:
+        tokens = shlex.split(command)
+    except ValueError:
+        return None
+    if not tokens:
+        return None
+
+    program, rest = os.path.basename(tokens[0]), tokens[1:]
+    if program in ("pytest", "py.test"):
+        parsed = "pytest", rest
+    else:
+        version = f"python{sys.version_info.major}.{sys.version_info.minor}"
+        if program not in ("python", "python3", version) or not rest:
+            return None
+        if rest[0] == "-m" and len(rest) >= 2:
+            if rest[1] == "pytest":
+                parsed = "pytest", rest[2:]
+            else:
+                parsed = "module", rest[1:]
+        elif rest[0].endswith(".py") and not rest[0].startswith("-"):
+            parsed = "script", rest
+        else:
+            return None
+    if not _runs_this_interpreter(tokens[0], target_dir):
+        return None
+    return parsed
+
+
+def _runs_this_interpreter(program: str, target_dir: str) -> bool:
+    """Whether the shell would run program with the zygote's interpreter.
+
+    The program is looked up on PATH like the shell does; a console script
+    such as pytest is followed to the interpreter in its ``#!`` line. Only
+    an executable in the same directory as this interpreter counts, so a
+    virtualenv's python is never mistaken for the one it links to.
+    """
+    if "/" in program:
+        path: Optional[str] = os.path.join(target_dir, program)
+    else:
+        path = shutil.which(program)
+    if path and not os.path.basename(program).startswith("python"):
+        path = _shebang_interpreter(path)
+    if not path:
+        return False
+    try:
+        same_file = os.path.samefile(path, sys.executable)
+    except OSError:
+        return False
+    directory = os.path.dirname(os.path.abspath(path))
+    return same_file and directory == os.path.dirname(os.path.abspath(sys.executable))
+
+
+def _shebang_interpreter(script: str) -> Optional[str]:
+    """The interpreter named by a script's #! line"""
+    try:
+        with open(script, "rb") as f:
+            first_line = f.readline(1024)
+    except OSError:
+        return None
+    if not first_line.startswith(b"#!"):
+        return None
+    words = first_line[2:].decode("utf-8", "replace").split()
+    if words and os.path.basename(words[0]) == "env":
+        words = [shutil.which(words[1])] if len(words) == 2 else []
+    return words[0] if words else None
+
+
+class WarmProcess:
+    """A forked child of the zygote, shaped like asyncio's Process"""
+
+    def __init__(self, pid: int, stdout, stderr, exited: asyncio.Future):
+        self.pid = pid
+        self.stdout = stdout
+        self.stderr = stderr
+        self.returncode: Optional[int] = None
+        self._exited = exited
+
+    async def wait(self) -> int:
+        self.returncode = await self._exited
+        return self.returncode
+
+    def kill(self):
+        os.kill(self.pid, signal.SIGKILL)
+
+
+class WarmWorker:
+    """Runs Python commands by forking a zygote with the project preloaded.
+
+    Project modules loaded in the zygote are checked before every fork;
+    if any of their files changed on disk, all project modules are dropped
+    and imported again so runs never see stale code.
+    """
+
+    def __init__(self, target_dir: str):
+        self.target_dir = os.path.abspath(target_dir)
+        self.has_pytest = False
+        self._sock: Optional[socket.socket] = None
+        self._process = None
+        self._ready = threading.Event()
+        self._send_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        # request id -> (loop, future for the pid, future for the exit code)
+        self._pending: Dict[int, Tuple] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def start(self):
+        """Start the zygote in the background"""
+        if self.running:
+            return
+
+        parent, child = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self._process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), self.target_dir]
+            + [str(child.fileno())],
+            cwd=self.target_dir,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            pass_fds=[child.fileno()],
+            start_new_session=True,
+        )
+        child.close()
+        self._sock = parent
+        self._ready.clear()
+        threading.Thread(
+            target=self._read_replies, args=(parent,), name="warm-worker", daemon=True
+        ).start()
+
+    def stop(self):
+        """Stop the zygote; running children are left to finish"""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+            self._process = None
+
+    async def spawn(self, command: str) -> Optional[WarmProcess]:
+        """Fork a warm child for the command, or None to use the shell"""
+        parsed = parse_command(command, self.target_dir)
+        if parsed is None:
+            return None
+        if not self.running:
+            self.start()
+        if not await asyncio.to_thread(self._ready.wait, STARTUP_TIMEOUT):
+            return None
+        kind, args = parsed
+        if kind == "pytest" and not self.has_pytest:
+            return None
+        if kind == "script" and not os.path.isfile(
+            os.path.join(self.target_dir, args[0])
+        ):
+            # Let the real interpreter report the missing file
+            return None
+
+        loop = asyncio.get_running_loop()
+        request_id = next(self._ids)
+        started, exited = loop.create_future(), loop.create_future()
+        self._pending[request_id] = (loop, started, exited)
+
+        out_read, out_write = os.pipe()
+        err_read, err_write = os.pipe()
+        try:
+            message = json.dumps({"id": request_id, "kind": kind, "args": args})
+            with self._send_lock:
+                socket.send_fds(
+                    self._sock, [message.encode("utf-8")], [out_write, err_write]
+                )
+        except (OSError, AttributeError):
+            self._pending.pop(request_id, None)
+            for fd in (out_read, err_read):
+                os.close(fd)
+            return None
+        finally:
+            os.close(out_write)
+            os.close(err_write)
+
+        pid, reloaded = await started
+        if reloaded:
+            print(f"♻️ Reloaded project modules changed on disk ({reloaded})")
+        return WarmProcess(
+            pid,
+            await self._reader(loop, out_read),
+            await self._reader(loop, err_read),
+            exited,
+        )
+
+    async def _reader(self, loop, fd: int) -> asyncio.StreamReader:
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(fd, "rb", 0)
+        )
+        return reader
+
+    def _read_replies(self, sock: socket.socket):
+        """Dispatch zygote replies to the futures of their requests"""
+        while True:
+            try:
+                data = sock.recv(MAX_MESSAGE_SIZE)
+            except OSError:
+                data = b""
+            if not data:
+                break
+            reply = json.loads(data)
+            if "hello" in reply:
+                self.has_pytest = reply["pytest"]
+                self._ready.set()
+                continue
+
+            entry = self._pending.get(reply["id"])
+            if entry is None:
+                continue
+            loop, started, exited = entry
+            if "pid" in reply:
+                result = (reply["pid"], reply["reloaded"])
+                loop.call_soon_threadsafe(_resolve, started, result)
+            else:
+                del self._pending[reply["id"]]
+                loop.call_soon_threadsafe(_resolve, exited, reply["exit"])
+
+        # The zygote is gone: fail whatever was still waiting on it
+        for loop, started, exited in self._pending.values():
+            for future in (started, exited):
+                loop.call_soon_threadsafe(_fail, future)
+        self._pending.clear()
+
+
+def _resolve(future: asyncio.Future, result):
+    if not future.done():
+        future.set_result(result)
+
+
+def _fail(future: asyncio.Future):
+    if not future.done():
+        future.set_exception(RuntimeError("warm worker exited"))
+
+
+# --- zygote side -------------------------------------------------------------
+
+
+def _is_test_module(path: str) -> bool:
+    # pytest rewrites asserts when it imports these, so they must stay cold
+    name = os.path.basename(path)
+    return (
+        name.startswith("test_")
+        or name.endswith("_test.py")
+        or name == "conftest.py"
+    )
+
+
+class _Zygote:
+    def __init__(self, target_dir: str, sock: socket.socket):
+        self.target_dir = target_dir
+        self.sock = sock
+        self.warm: List[str] = []
+        self.mtimes: Dict[str, Tuple[str, float]] = {}
+        self.children: Dict[int, int] = {}
+        self.reports: Dict[int, int] = {}
+
+    def serve(self):
+        has_pytest = self.warm_up(["pytest"])
+        self.send({"hello": True, "pytest": has_pytest})
+
+        selector = selectors.DefaultSelector()
+        selector.register(self.sock, selectors.EVENT_READ)
+        self.selector = selector
+        while True:
+            for key, _ in selector.select(timeout=0.1):
+                if key.fileobj is self.sock:
+                    message, fds, _, _ = socket.recv_fds(
+                        self.sock, MAX_MESSAGE_SIZE, 2
+                    )
+                    if not message:
+                        return
+                    self.fork_child(json.loads(message), fds)
+                else:
+                    self.read_report(key.fileobj)
+            self.reap()
+
+    def send(self, message: dict):
+        self.sock.send(json.dumps(message).encode("utf-8"))
+
+    def project_modules(self) -> Dict[str, str]:
+        prefix = self.target_dir + os.sep
+        modules = {}
+        for name, module in list(sys.modules.items()):
+            path = getattr(module, "__file__", None)
+            if path and os.path.abspath(path).startswith(prefix):
+                modules[name] = path
+        return modules
+
+    def warm_up(self, names: List[str]) -> bool:
+        """Import modules into the zygote; returns whether all succeeded"""
+        import importlib
+
+        ok = True
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except BaseException:
+                ok = False
+                continue
+            if name not in self.warm:
+                self.warm.append(name)
+        self.mtimes = {}
+        for name, path in self.project_modules().items():
+            try:
+                self.mtimes[name] = (path, os.stat(path).st_mtime_ns)
+            except OSError:
+                continue
+        return ok
+
+    def reload_stale(self) -> int:
+        """Drop every project module if any of them changed on disk"""
+        stale = 0
+        for path, mtime in self.mtimes.values():
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    stale += 1
+            except OSError:
+                stale += 1
+        if stale:
+            import importlib
+
+            for name in self.project_modules():
+                del sys.modules[name]
+            importlib.invalidate_caches()
+            self.warm_up(list(self.warm))
+        return stale
+
+    def fork_child(self, request: dict, fds: List[int]):
+        reloaded = self.reload_stale()
+        report_read, report_write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                os.close(report_read)
+                code = self.run_child(request, fds, report_write)
+            finally:
+                os._exit(code)
+
+        os.close(report_write)
+        for fd in fds:
+            os.close(fd)
+        report = os.fdopen(report_read, "rb")
+        self.selector.register(report, selectors.EVENT_READ, pid)
+        self.children[pid] = request["id"]
+        self.send({"id": request["id"], "pid": pid, "reloaded": reloaded})
+
+    def run_child(self, request: dict, fds: List[int], report_fd: int) -> int:
+        import runpy
+        import traceback
+
+        os.setsid()
+        self.sock.close()
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(fds[0], 1)
+        os.dup2(fds[1], 2)
+        for fd in fds + [devnull]:
+            os.close(fd)
+        sys.stdout.reconfigure(line_buffering=True)
+        sys.stderr.reconfigure(line_buffering=True)
+
+        before = set(sys.modules)
+        kind, args = request["kind"], request["args"]
+        code = 0
+        try:
+            if kind == "pytest":
+                import pytest
+
+                sys.argv = ["pytest"] + args
+                code = int(pytest.main(args))
+            elif kind == "module":
+                sys.argv = list(args)
+                runpy.run_module(args[0], run_name="__main__", alter_sys=True)
+            else:
+                sys.argv = list(args)
+                sys.path[0] = os.path.dirname(os.path.abspath(args[0]))
+                runpy.run_path(args[0], run_name="__main__")
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+
+        # Tell the zygote which modules this run needed so the next one is warm
+        new_modules = []
+        for name in set(sys.modules) - before:
+            path = getattr(sys.modules[name], "__file__", None)
+            if name != "__main__" and path and not _is_test_module(path):
+                new_modules.append(name)
+        with os.fdopen(report_fd, "w", encoding="utf-8") as report:
+            json.dump(new_modules, report)
+        return code
+
+    def read_report(self, report):
+        self.selector.unregister(report)
+        try:
+            names = json.loads(report.read() or b"[]")
+        except ValueError:
+            names = []
+        report.close()
+        self.warm_up([name for name in names if name not in sys.modules])
+
+    def reap(self):
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            request_id = self.children.pop(pid, None)
+            if request_id is not None:
+                code = os.waitstatus_to_exitcode(status)
+                self.send({"id": request_id, "exit": code})
+
+
+def zygote_main(target_dir: str, fd: int):
+    """Entry point of the zygote process"""
+    sys.path.insert(0, target_dir)
+    os.chdir(target_dir)
+    sock = socket.socket(fileno=fd)
+    try:
+        _Zygote(target_dir, sock).serve()
+    except (OSError, KeyboardInterrupt):
+        pass
+
+
+if __name__ == "__main__":
+    # This file is run directly, so drop its own directory from sys.path
+    sys.path.pop(0)
+    zygote_main(sys.argv[1], int(sys.argv[2]))
@@ -0,0 +1,271 @@
+"""
+Tool for watching the project directory and reporting changed files.
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+from .ignore_rules import GITIGNORE_FILE, PROJECT_IGNORE_FILE
+
+# inotify event flags (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Hidden files that still matter because they change what gets indexed
+WATCHED_HIDDEN_FILES = (GITIGNORE_FILE, PROJECT_IGNORE_FILE)
+
+
+def _skip_file(name: str) -> bool:
+    return name.startswith(".") and name not in WATCHED_HIDDEN_FILES
+
+
+class _InotifyBackend:
+    """Linux inotify backend with one watch per directory"""
+
+    def __init__(self, target_dir: str, skip_dir: Callable[[str], bool]):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.target_dir = target_dir
+        self._skip_dir = skip_dir
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, str] = {}
+        self._add_tree(target_dir)
+
+    def _add_tree(self, top: str):
+        if top != self.target_dir and self._skip_dir(top):
+            return
+        for root, dirs, _ in os.walk(top):
+            dirs[:] = [d for d in dirs if not self._skip_dir(os.path.join(root, d))]
+            wd = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(root), WATCH_MASK
+            )
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOENT:
+                    continue
+                raise OSError(err, f"inotify_add_watch failed for {root}")
+            self._dirs[wd] = root
+
+    def poll(self, timeout: float) -> Set[str]:
+        """Wait up to timeout seconds and return changed absolute paths"""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        try:
+            data = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset : offset + name_len].rstrip(b"\0")
+            offset += name_len
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped: fall back to rescanning everything
+                changed.add(self.target_dir)
+                continue
+
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._dirs[wd]
+                continue
+
+            path = os.path.join(directory, os.fsdecode(name)) if name else directory
+            if name and _skip_file(os.fsdecode(name)):
+                continue
+            changed.add(path)
+
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self._add_tree(path)
+
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+class _PollingBackend:
+    """Portable backend comparing stat snapshots of the project"""
+
+    def __init__(
+        self, target_dir: str, interval: float, skip_dir: Callable[[str], bool]
+    ):
+        self.target_dir = target_dir
+        self.interval = interval
+        self._skip_dir = skip_dir
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for root, dirs, files in os.walk(self.target_dir):
+            dirs[:] = [d for d in dirs if not self._skip_dir(os.path.join(root, d))]
+            for file in files:
+                if _skip_file(file):
+                    continue
+                path = os.path.join(root, file)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, timeout: float) -> Set[str]:
+        time.sleep(min(timeout, self.interval))
+        current = self._scan()
+        previous = self._snapshot
+        self._snapshot = current
+
+        changed = {path for path in current if previous.get(path) != current[path]}
+        changed.update(path for path in previous if path not in current)
+        return changed
+
+    def close(self):
+        pass
+
+
+class ProjectWatcher:
+    """Watch the project tree and report changed paths in debounced batches.
+
+    ``on_changes`` is called from a background thread with a set of paths
+    relative to the project root once no new events have arrived for
+    ``debounce`` seconds, or at the latest after ``max_delay`` seconds, so a
+    burst such as a branch checkout is delivered as one batch.
+    """
+
+    def __init__(
+        self,
+        target_dir: str,
+        on_changes: Callable[[Set[str]], None],
+        debounce: float = 0.3,
+        max_delay: float = 2.0,
+        poll_interval: float = 1.0,
+        backend: str = "auto",
+        ignore_rules=None,
+    ):
+        self.target_dir = os.path.abspath(target_dir)
+        self.on_changes = on_changes
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.backend_name = backend
+        self.ignore_rules = ignore_rules
+        self._backend = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start watching in a background thread"""
+        if self.running:
+            return
+
+        self._backend = self._create_backend()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="project-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching and wait for the background thread to exit"""
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._backend.close()
+        self._backend = None
+
+    def _create_backend(self):
+        if self.backend_name in ("auto", "inotify") and sys.platform.startswith(
+            "linux"
+        ):
+            try:
+                backend = _InotifyBackend(self.target_dir, self._skip_dir)
+                self.backend_name = "inotify"
+                return backend
+            except (OSError, AttributeError) as e:
+                print(f"⚠️ inotify unavailable ({str(e)}), falling back to polling")
+
+        self.backend_name = "polling"
+        return _PollingBackend(self.target_dir, self.poll_interval, self._skip_dir)
+
+    def _skip_dir(self, path: str) -> bool:
+        """Directories not worth watching, as decided by the indexer's rules"""
+        if self.ignore_rules is None:
+            return os.path.basename(path).startswith(".")
+        rel_path = os.path.relpath(path, self.target_dir)
+        return self.ignore_rules.is_ignored(rel_path, is_dir=True)
+
+    def _run(self):
+        pending: Set[str] = set()
+        first_event = 0.0
+        last_event = 0.0
+
+        while not self._stop.is_set():
+            changed = self._backend.poll(self.debounce)
+            now = time.monotonic()
+
+            if changed:
+                if not pending:
+                    first_event = now
+                pending.update(changed)
+                last_event = now
+
+            if pending and (
+                now - last_event >= self.debounce or now - first_event >= self.max_delay
+            ):
+                batch = self._relative(pending)
+                pending = set()
+                try:
+                    self.on_changes(batch)
+                except Exception as e:
+                    print(f"❌ Error applying file changes: {str(e)}")
+
+    def _relative(self, paths: Iterable[str]) -> Set[str]:
+        return {os.path.relpath(path, self.target_dir) for path in paths}
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Compare difflib.unified_diff with the Myers and patience line diffs on large
+inputs: a source file with scattered edits, a lockfile full of repeated lines
+and a generated file rewritten in blocks.
+
+Usage: python benchmarks/diff_engine.py [number_of_lines]
+"""
+import difflib
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assistant.tools.edits import apply_line_edits
+from assistant.tools.line_diff import DIFF_ALGORITHMS, diff_lines
+
+
+def source_file(size: int, rng: random.Random):
+    """Mostly unique lines with a few hundred scattered edits"""
+    old = [f"    value_{i} = compute({i}, {i % 7})" for i in range(size)]
+    new = list(old)
+    for _ in range(300):
+        i = rng.randrange(len(new))
+        choice = rng.random()
+        if choice < 0.4:
+            new[i] = new[i] + "  # changed"
+        elif choice < 0.7:
+            new.insert(i, f"    inserted_{i} = None")
+        else:
+            del new[i]
+    return old, new
+
+
+def lockfile(size: int, rng: random.Random):
+    """Few distinct lines repeated many times, with versions bumped"""
+    old = []
+    for i in range(size // 4):
+        old += ["[[package]]", f'name = "pkg-{i}"', f'version = "1.{i % 9}.0"', ""]
+    new = list(old)
+    for _ in range(200):
+        i = rng.randrange(len(new) // 4) * 4 + 2
+        new[i] = 'version = "2.0.0"'
+    return old, new
+
+
+def rewritten_blocks(size: int, rng: random.Random):
+    """Generated code where whole blocks are regenerated"""
+    old = [f"entry_{i} = {rng.random():.6f}" for i in range(size)]
+    new = list(old)
+    for _ in range(20):
+        start = rng.randrange(len(new) - 500)
+        for i in range(start, start + 500):
+            new[i] = f"entry_{i} = {rng.random():.6f}"
+    return old, new
+
+
+def check(old, new, hunks):
+    """Applying the hunks to old must give new"""
+    edits = [
+        (h.old_start, h.old_count, new[h.new_start : h.new_start + h.new_count])
+        for h in hunks
+    ]
+    result, _ = apply_line_edits(old, edits)
+    assert result == new, "diff does not reproduce the new file"
+
+
+def timed(action):
+    started = time.perf_counter()
+    result = action()
+    return result, time.perf_counter() - started
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(42)
+    cases = {
+        "source edits": source_file(size, rng),
+        "lockfile": lockfile(size, rng),
+        "rewritten blocks": rewritten_blocks(size, rng),
+    }
+
+    print(f"{'case':<18} {'algorithm':<10} {'time':>9} {'hunks':>7} {'changed':>9}")
+    for name, (old, new) in cases.items():
+        output, elapsed = timed(
+            lambda: list(difflib.unified_diff(old, new, lineterm=""))
+        )
+        changed = sum(
+            1 for line in output if line[:1] in "+-" and line[:3] not in ("+++", "---")
+        )
+        hunk_count = sum(1 for line in output if line.startswith("@@"))
+        print(
+            f"{name:<18} {'difflib':<10} {elapsed:8.3f}s {hunk_count:7d} {changed:9d}"
+        )
+
+        for algorithm in DIFF_ALGORITHMS:
+            hunks, elapsed = timed(lambda: list(diff_lines(old, new, algorithm)))
+            check(old, new, hunks)
+            changed = sum(h.old_count + h.new_count for h in hunks)
+            print(
+                f"{name:<18} {algorithm:<10} {elapsed:8.3f}s "
+                f"{len(hunks):7d} {changed:9d}"
+            )
+
+        # Time to the first hunk, as seen by a pager showing the top of the diff
+        _, elapsed = timed(lambda: next(diff_lines(old, new), None))
+        print(f"{name:<18} {'first':<10} {elapsed:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Compare the memory used by extracted structure as plain dicts versus the
+slotted FunctionInfo/ClassInfo records.
+
+Usage: python benchmarks/fileinfo_memory.py [number_of_files]
+"""
+import ast
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assistant.models.file_info import FileInfo
+from assistant.tools.indexer import ProjectIndexer
+
+
+def make_source(index: int) -> str:
+    """A module with a few classes and functions sharing common docstrings"""
+    parts = ["import os", "from typing import List", ""]
+    for i in range(10):
+        parts.append(f"class Model{index}_{i}:")
+        parts.append('    """Data model backed by the database."""')
+        for j in range(5):
+            parts.append(f"    def method_{j}(self, value, other=None):")
+            parts.append('        """Return the processed value."""')
+            parts.append("        return value")
+        parts.append("")
+        parts.append(f"def helper_{index}_{i}(path, mode):")
+        parts.append(f'    """Helper number {i} for module {index}."""')
+        parts.append("    return path")
+        parts.append("")
+    return "\n".join(parts)
+
+
+def extract_as_dicts(file_info: FileInfo):
+    """The dict-based extraction used before the slotted records"""
+    tree = ast.parse(file_info.content)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for name in node.names:
+                file_info.imports.append(f"import {name.name}")
+        elif isinstance(node, ast.ImportFrom):
+            for name in node.names:
+                file_info.imports.append(f"from {node.module or ''} import {name.name}")
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef):
+            file_info.functions.append(
+                {
+                    "name": node.name,
+                    "line": node.lineno,
+                    "args": [arg.arg for arg in node.args.args],
+                    "docstring": ast.get_docstring(node) or "",
+                }
+            )
+        elif isinstance(node, ast.ClassDef):
+            methods = [
+                {
+                    "name": item.name,
+                    "line": item.lineno,
+                    "args": [arg.arg for arg in item.args.args],
+                    "docstring": ast.get_docstring(item) or "",
+                }
+                for item in node.body
+                if isinstance(item, ast.FunctionDef)
+            ]
+            file_info.classes.append(
+                {
+                    "name": node.name,
+                    "line": node.lineno,
+                    "methods": methods,
+                    "docstring": ast.get_docstring(node) or "",
+                }
+            )
+
+
+def measure(sources, extract) -> int:
+    """Bytes still allocated by the structures after extraction"""
+    gc.collect()
+    tracemalloc.start()
+    infos = []
+    for path, content in sources:
+        file_info = FileInfo(path=path, content=content, language="python")
+        extract(file_info)
+        infos.append(file_info)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del infos
+    return current
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    sources = [(f"pkg/module_{i}.py", make_source(i)) for i in range(count)]
+    indexer = ProjectIndexer(".", use_cache=False)
+
+    before = measure(sources, extract_as_dicts)
+    after = measure(sources, indexer.extract_python_structure)
+
+    print(f"Files:          {count}")
+    print(f"dict records:   {before / (1024 * 1024):8.1f} MB")
+    print(f"slotted records:{after / (1024 * 1024):8.1f} MB")
+    print(f"Saved:          {100 * (before - after) / before:8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Time embedding and top-k search of the semantic index on synthetic symbols,
+and check the results against a full sort of every score.
+
+Usage: python benchmarks/semantic_search.py [number_of_symbols]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_repo import WORDS
+
+from assistant.tools.semantic_index import (
+    EMBED_BATCH_SIZE,
+    HashingEmbedder,
+    _Rows,
+    np,
+)
+
+QUERIES = [
+    "parse request token",
+    "load cache from disk",
+    "merge sorted queue items",
+    "validate user session",
+]
+
+
+def symbol_text(rng: random.Random, number: int) -> str:
+    """Name, arguments and docstring of a made-up function"""
+    words = rng.sample(WORDS, 4)
+    return (
+        f"{words[0]}_{words[1]}_{number} {words[2]} limit "
+        f"Return the {words[1]} of every {words[3]}"
+    )
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(42)
+    embedder = HashingEmbedder()
+    rows = _Rows(embedder.dimensions)
+
+    started = time.perf_counter()
+    for start in range(0, size, EMBED_BATCH_SIZE):
+        count = min(EMBED_BATCH_SIZE, size - start)
+        rows.append(
+            embedder.embed([symbol_text(rng, start + i) for i in range(count)])
+        )
+    elapsed = time.perf_counter() - started
+    backend = "NumPy" if np is not None else "pure Python"
+    print(f"Embedded {size:,} symbols in {elapsed:.1f}s ({backend})")
+
+    print(f"{'query':<28} {'first':>9} {'p50':>9} {'max':>9}")
+    for query in QUERIES:
+        (vector,) = embedder.embed([query])
+        timings = []
+        for _ in range(10):
+            started = time.perf_counter()
+            top = rows.top_k(vector, 10)
+            timings.append((time.perf_counter() - started) * 1000)
+        if np is not None:
+            scores = rows.get(list(range(rows.count))) @ np.asarray(vector, np.float32)
+            expected = np.sort(scores)[::-1][:10]
+            found = np.array([score for score, _ in top], dtype=np.float32)
+            assert np.allclose(found, expected), "top-k differs from a full sort"
+        ordered = sorted(timings)
+        print(
+            f"{query:<28} {timings[0]:8.2f}ms {ordered[len(ordered) // 2]:8.2f}ms "
+            f"{ordered[-1]:8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Benchmark indexing, search, bug scans, edits and structure parsers on a
+synthetic project, and compare the results with a stored baseline.
+
+Usage: python benchmarks/suite.py [--files N] [--lines N] [--mix SPEC]
+           [--depth N] [--seed N] [--repeat N] [--workers N]
+           [--output results.json] [--baseline baseline.json] [--tolerance 0.1]
+
+Results are written as JSON with --output. With --baseline, every metric is
+compared with the stored run and the exit status is 1 if any got slower by
+more than the tolerance.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_repo import (
+    DEFAULT_MIX,
+    EXTENSIONS,
+    WORDS,
+    file_content,
+    generate_repo,
+    parse_mix,
+)
+
+from assistant.tools.analysis_cache import analysis_cache
+from assistant.tools.bug_finder import BugFinder
+from assistant.tools.file_editor import FileEditor
+from assistant.tools.indexer import ProjectIndexer
+from assistant.tools.language_parsers import LANGUAGE_PARSERS, source_outline
+from assistant.tools.python_structure import python_structure
+
+# Bumped when metrics change meaning, so old baselines are not compared
+RESULTS_VERSION = 3
+# Differences in timings below this are noise, whatever the ratio
+NOISE_FLOOR_MS = 0.5
+# Generated files per language when timing the structure parsers
+PARSE_SAMPLE_FILES = 50
+
+SEARCH_QUERIES = {
+    "literal": [f"{word}_total" for word in WORDS[:10]],
+    "regex": [r"/def \w+_total\(/", r"/load_\w+_\d+\(path/", r"/^class \w+Model1/"],
+    "miss": ["no_such_identifier_anywhere", "zzqx"],
+    # Match most lines: only the first page should be paid for
+    "broad": ["return", r"/\w+ = /"],
+}
+
+
+def timed(action: Callable) -> float:
+    """Milliseconds taken by action(), with its output discarded"""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        action()
+        return (time.perf_counter() - started) * 1000
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of the samples"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float], unit: str = "ms") -> Dict[str, float]:
+    return {
+        "value": percentile(samples, 0.5),
+        "unit": unit,
+        "p50": percentile(samples, 0.5),
+        "p90": percentile(samples, 0.9),
+        "p99": percentile(samples, 0.99),
+        "min": min(samples),
+        "samples": len(samples),
+    }
+
+
+def run_suite(project: str, cache_dir: str, args) -> Dict[str, dict]:
+    """Every metric, by name"""
+    results = {}
+    # The index cache lives in CODE_ASSISTANT_CACHE_DIR
+    os.environ["CODE_ASSISTANT_CACHE_DIR"] = cache_dir
+
+    def new_indexer() -> ProjectIndexer:
+        return ProjectIndexer(project, use_cache=True, workers=args.workers)
+
+    # Cold: no index cache on disk and no parse results in memory
+    cold = []
+    for _ in range(args.repeat):
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        analysis_cache.clear()
+        cold.append(timed(lambda: new_indexer().index_project()))
+    results["index.cold"] = summarize(cold)
+
+    warm = [timed(lambda: new_indexer().index_project()) for _ in range(args.repeat)]
+    results["index.warm"] = summarize(warm)
+
+    indexer = new_indexer()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        project_index = indexer.index_project()
+
+    for kind, queries in SEARCH_QUERIES.items():
+        latencies = [
+            timed(lambda: indexer.find_in_codebase(project_index, query))
+            for _ in range(args.repeat * 5)
+            for query in queries
+        ]
+        results[f"search.{kind}"] = summarize(latencies)
+
+    python_files = sorted(
+        path for path, info in project_index.items() if info.language == "python"
+    )
+    bug_finder = BugFinder(project, interactive=False, indexer=indexer)
+    for label in ("cold", "warm"):
+        if label == "cold":
+            analysis_cache.clear()
+        elapsed = timed(lambda: bug_finder.analyze_project_for_bugs(project_index))
+        results[f"bugs.scan_{label}"] = summarize([elapsed])
+        results[f"bugs.scan_{label}_rate"] = {
+            "value": len(python_files) / (elapsed / 1000),
+            "unit": "files/s",
+            "higher_is_better": True,
+        }
+
+    def check_antipatterns():
+        for path in python_files:
+            bug_finder.check_python_antipatterns(path, project_index[path].content)
+
+    analysis_cache.clear()
+    results["bugs.antipatterns_cold"] = summarize([timed(check_antipatterns)])
+    results["bugs.antipatterns_warm"] = summarize([timed(check_antipatterns)])
+
+    # Edit round-trips: change one line of a file and change it back
+    editor = FileEditor(project, indexer=indexer, interactive=False)
+    commits = []
+    for path in python_files[: args.repeat * 5]:
+        transaction = editor.begin(path)
+        middle = len(transaction.lines) // 2 + 1
+        line = transaction.lines[middle - 1]
+        for new_line in (line + "  # edited", line):
+            transaction.replace(middle, middle, [new_line])
+            commits.append(timed(lambda: transaction.commit(project_index)))
+    if commits:
+        results["edit.commit"] = summarize(commits)
+
+    results.update(parse_rates(args))
+    return results
+
+
+def parse_rates(args) -> Dict[str, dict]:
+    """Structure extraction throughput of each language, in MB of source/s"""
+    results = {}
+    languages = ["python"] + sorted(set(LANGUAGE_PARSERS) & set(EXTENSIONS))
+    for language in languages:
+        rng = random.Random(args.seed)
+        samples = [
+            file_content(rng, language, number, args.lines)
+            for number in range(PARSE_SAMPLE_FILES)
+        ]
+        megabytes = sum(len(sample) for sample in samples) / 1e6
+
+        def parse_all():
+            for sample in samples:
+                if language == "python":
+                    python_structure(sample)
+                else:
+                    source_outline(language, sample)
+
+        timings = []
+        for _ in range(args.repeat):
+            # Cold every time: the cache would otherwise answer
+            analysis_cache.clear()
+            timings.append(timed(parse_all))
+        results[f"parse.{language}_rate"] = {
+            "value": megabytes / (percentile(timings, 0.5) / 1000),
+            "unit": "MB/s",
+            "higher_is_better": True,
+        }
+    return results
+
+
+def environment() -> Dict[str, str]:
+    try:
+        pylint = subprocess.run(
+            ["pylint", "--version"], capture_output=True, text=True, check=True
+        ).stdout.split("\n")[0]
+    except (subprocess.SubprocessError, FileNotFoundError):
+        pylint = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "pylint": pylint,
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float):
+    """Print current against baseline values, returning the regressed metrics"""
+    regressions = []
+    print(f"\n{'metric':<26} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, metric in results.items():
+        base = baseline.get(name)
+        if base is None or not base["value"]:
+            print(f"{name:<26} {'-':>12} {metric['value']:>12.2f}")
+            continue
+        change = metric["value"] / base["value"] - 1
+        slower = -change if metric.get("higher_is_better") else change
+        flag = ""
+        if metric["unit"] == "ms" and abs(metric["value"] - base["value"]) < (
+            NOISE_FLOOR_MS
+        ):
+            slower = 0
+        if slower > tolerance:
+            flag = " ⚠️ slower"
+            regressions.append(name)
+        elif slower < -tolerance:
+            flag = " ✅ faster"
+        print(
+            f"{name:<26} {base['value']:>12.2f} {metric['value']:>12.2f} "
+            f"{change:>+8.1%}{flag}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the code assistant")
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--lines", type=int, default=200)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--output", metavar="FILE", help="Write results as JSON")
+    parser.add_argument(
+        "--baseline", metavar="FILE", help="Compare with a results file"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.10,
+        help="Slowdown reported as a regression (default: 0.10 = 10%%)",
+    )
+    args = parser.parse_args()
+
+    config = {
+        "files": args.files,
+        "lines": args.lines,
+        "mix": args.mix,
+        "depth": args.depth,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "workers": args.workers,
+    }
+    work_dir = tempfile.mkdtemp(prefix="console-cursor-bench-")
+    try:
+        project = os.path.join(work_dir, "project")
+        started = time.perf_counter()
+        paths = generate_repo(
+            project, args.files, args.lines, args.mix, args.depth, args.seed
+        )
+        print(f"Generated {len(paths)} files in {time.perf_counter() - started:.1f}s")
+        results = run_suite(project, os.path.join(work_dir, "cache"), args)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"\n{'metric':<26} {'value':>12} {'unit':<8} {'p90':>10} {'p99':>10}")
+    for name, metric in results.items():
+        p90 = f"{metric['p90']:.2f}" if "p90" in metric else ""
+        p99 = f"{metric['p99']:.2f}" if "p99" in metric else ""
+        print(
+            f"{name:<26} {metric['value']:>12.2f} {metric['unit']:<8} "
+            f"{p90:>10} {p99:>10}"
+        )
+
+    report = {
+        "version": RESULTS_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "config": config,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("version") != RESULTS_VERSION:
+            print("⚠️ Baseline was written by another version of the suite")
+            return 0
+        if baseline.get("config") != config:
+            print("⚠️ Baseline was run with different options, compare with care")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        if regressions:
+            print(
+                f"\n❌ {len(regressions)} metrics regressed: {', '.join(regressions)}"
+            )
+            return 1
+        print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
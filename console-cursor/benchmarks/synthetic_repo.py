@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Generate a deterministic synthetic project for benchmarks: the same options
+and seed always give byte-identical files.
+
+Usage: python benchmarks/synthetic_repo.py <output_dir> [--files N] [--lines N]
+           [--mix python=0.7,javascript=0.2,markdown=0.1] [--depth N] [--seed N]
+"""
+import argparse
+import os
+import random
+from typing import Dict, List
+
+# Extension written for each language of the mix
+EXTENSIONS = {
+    "python": ".py",
+    "javascript": ".js",
+    "typescript": ".ts",
+    "go": ".go",
+    "java": ".java",
+    "rust": ".rs",
+    "cpp": ".cpp",
+    "ruby": ".rb",
+    "php": ".php",
+    "bash": ".sh",
+    "markdown": ".md",
+    "json": ".json",
+}
+DEFAULT_MIX = {"python": 0.7, "javascript": 0.2, "markdown": 0.1}
+
+WORDS = (
+    "account alpha batch buffer cache client config cursor delta event "
+    "field filter graph handler index item job key layer loader matrix "
+    "message node order packet parser query queue record request result "
+    "router schema session signal state stream task token user value "
+    "vector worker"
+).split()
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """'python=0.7,javascript=0.3' as {language: weight}"""
+    mix = {}
+    for part in text.split(","):
+        language, _, weight = part.partition("=")
+        language = language.strip()
+        if language not in EXTENSIONS:
+            raise ValueError(f"Unknown language: {language}")
+        mix[language] = float(weight or 1)
+    return mix
+
+
+def generate_repo(
+    root: str,
+    files: int = 1000,
+    lines: int = 200,
+    mix: Dict[str, float] = None,
+    depth: int = 3,
+    seed: int = 0,
+) -> List[str]:
+    """Write a synthetic project under root and return its relative paths.
+
+    File sizes vary around ``lines``, directories nest up to ``depth``
+    levels, and Python modules import each other, define functions and
+    classes, and contain a few anti-patterns and the odd syntax error.
+    """
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    languages = sorted(mix)
+    weights = [mix[language] for language in languages]
+
+    directories = [""]
+    for _ in range(max(1, files // 20)):
+        parent = rng.choice(directories)
+        level = parent.count(os.sep) + 2 if parent else 1
+        directory = os.path.join(parent, f"{rng.choice(WORDS)}_pkg")
+        if level <= depth and directory not in directories:
+            directories.append(directory)
+
+    paths = []
+    modules = []
+    for number in range(files):
+        language = rng.choices(languages, weights)[0]
+        directory = rng.choice(directories)
+        name = f"{rng.choice(WORDS)}_{number}{EXTENSIONS[language]}"
+        rel_path = os.path.join(directory, name)
+        size = max(5, int(rng.gauss(lines, lines / 3)))
+
+        content = file_content(rng, language, number, size, modules)
+        if language == "python":
+            modules.append(_module_name(rel_path))
+
+        full_path = os.path.join(root, rel_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        paths.append(rel_path)
+
+    # Packages, so imports between generated modules resolve
+    for directory in directories[1:]:
+        with open(os.path.join(root, directory, "__init__.py"), "w") as f:
+            f.write("")
+    return paths
+
+
+def file_content(
+    rng: random.Random,
+    language: str,
+    number: int,
+    size: int,
+    modules: List[str] = (),
+) -> str:
+    """Text of one generated file of about size lines"""
+    if language == "python":
+        return _python_module(rng, number, size, modules)
+    if language in ("javascript", "typescript"):
+        return _script_module(rng, number, size)
+    if language in SOURCE_TEMPLATES:
+        return _source_module(rng, language, number, size)
+    if language == "markdown":
+        return _markdown(rng, number, size)
+    return _json(rng, size)
+
+
+def _module_name(rel_path: str) -> str:
+    return os.path.splitext(rel_path)[0].replace(os.sep, ".")
+
+
+def _python_module(
+    rng: random.Random, number: int, size: int, modules: List[str]
+) -> str:
+    lines = ['"""Generated module."""', "import os", "import json"]
+    for module in rng.sample(modules, min(len(modules), rng.randint(0, 3))):
+        lines.append(f"from {module} import *")
+    lines.append("")
+
+    while len(lines) < size:
+        word = rng.choice(WORDS)
+        kind = rng.random()
+        if kind < 0.25:
+            lines += [
+                "",
+                f"class {word.title()}Model{number}_{len(lines)}:",
+                f'    """Holds a {word}"""',
+                "",
+                "    def __init__(self, value):",
+                "        self.value = value",
+                "",
+                f"    def {word}_total(self, items):",
+                "        total = 0",
+                "        for item in items:",
+                "            total += item * self.value",
+                "        return total",
+            ]
+        elif kind < 0.3:
+            # Anti-patterns for the bug scan to find
+            lines += [
+                "",
+                f"def load_{word}_{len(lines)}(path, seen=[]):",
+                "    try:",
+                "        return json.load(open(path))",
+                "    except:",
+                "        return None",
+            ]
+        else:
+            lines += [
+                "",
+                f"def {word}_{number}_{len(lines)}(data, limit=10):",
+                f'    """Process {word} data"""',
+                "    result = []",
+                "    for index, entry in enumerate(data):",
+                "        if index >= limit:",
+                "            break",
+                f"        result.append(entry.get('{word}', index))",
+                "    return result",
+            ]
+    if rng.random() < 0.01:
+        lines.append("def broken(:")
+    return "\n".join(lines) + "\n"
+
+
+def _script_module(rng: random.Random, number: int, size: int) -> str:
+    lines = ["'use strict';", ""]
+    while len(lines) < size:
+        word = rng.choice(WORDS)
+        lines += [
+            f"function {word}{number}_{len(lines)}(items, limit) {{",
+            "  const result = [];",
+            "  for (let i = 0; i < items.length && i < limit; i++) {",
+            f"    result.push(items[i].{word});",
+            "  }",
+            "  return result;",
+            "}",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+# (header, function, class) per language, filled in with {word}, {Word}
+# and {n}
+SOURCE_TEMPLATES = {
+    "go": (
+        'package main\n\nimport (\n\t"fmt"\n\t"strings"\n)\n',
+        "// {word}Total{n} adds up {word} values.\n"
+        "func {word}Total{n}(items []int, limit int) int {{\n"
+        "\ttotal := 0\n\tfor i, item := range items {{\n"
+        "\t\tif i >= limit {{\n\t\t\tbreak\n\t\t}}\n"
+        "\t\ttotal += item\n\t}}\n\treturn total\n}}\n",
+        "// {Word}{n} holds a {word}.\ntype {Word}{n} struct {{\n"
+        "\tname string\n\tvalue int\n}}\n\n"
+        "func (w *{Word}{n}) Describe(prefix string) string {{\n"
+        '\treturn fmt.Sprintf("%s{{%s}}", prefix, strings.ToUpper(w.name))\n}}\n',
+    ),
+    "java": (
+        "package bench;\n\nimport java.util.List;\nimport java.util.Map;\n",
+        "class {Word}Util{n} {{\n"
+        "    /** Adds up {word} values. */\n"
+        "    static int {word}Total(List<Integer> items, int limit) {{\n"
+        "        int total = 0;\n        for (int item : items) {{\n"
+        "            total += item;\n        }}\n        return total;\n"
+        "    }}\n}}\n",
+        "/** Holds a {word}. */\npublic class {Word}{n} {{\n"
+        "    private final Map<String, Integer> values;\n\n"
+        "    public {Word}{n}(Map<String, Integer> values) {{\n"
+        "        this.values = values;\n    }}\n\n"
+        "    @Override\n    public String toString() {{\n"
+        '        return "{Word}{{" + values + "}}";\n    }}\n}}\n',
+    ),
+    "rust": (
+        "use std::collections::HashMap;\nuse std::fmt;\n",
+        "/// Adds up {word} values.\n"
+        "pub fn {word}_total_{n}(items: &[i64], limit: usize) -> i64 {{\n"
+        "    items.iter().take(limit).sum()\n}}\n",
+        "/// Holds a {word}.\n#[derive(Debug)]\npub struct {Word}{n} {{\n"
+        "    values: HashMap<String, i64>,\n}}\n\n"
+        "impl {Word}{n} {{\n    pub fn get(&self, key: &str) -> Option<&i64> {{\n"
+        "        self.values.get(key)\n    }}\n}}\n",
+    ),
+    "cpp": (
+        "#include <string>\n#include <vector>\n",
+        "// Adds up {word} values.\n"
+        "static int {word}_total_{n}(const std::vector<int>& items, int limit) {{\n"
+        "    int total = 0;\n    for (int item : items) {{\n"
+        "        total += item;\n    }}\n    return total;\n}}\n",
+        "// Holds a {word}.\nclass {Word}{n} {{\npublic:\n"
+        "    explicit {Word}{n}(int value) : value_(value) {{}}\n"
+        "    int get() const {{ return value_; }}\nprivate:\n"
+        "    int value_;\n}};\n",
+    ),
+    "ruby": (
+        "require 'json'\n",
+        "# Adds up {word} values\ndef {word}_total_{n}(items, limit = 10)\n"
+        "  items.take(limit).each do |item|\n    puts item\n  end\nend\n",
+        "# Holds a {word}\nclass {Word}{n}\n  def initialize(value)\n"
+        "    @value = value\n  end\n\n  def to_s\n"
+        '    "#{{@value}}"\n  end\nend\n',
+    ),
+    "php": (
+        "<?php\nuse App\\Models\\Record;\n",
+        "/** Adds up {word} values. */\n"
+        "function {word}_total_{n}($items, $limit) {{\n"
+        "    return array_sum(array_slice($items, 0, $limit));\n}}\n",
+        "/** Holds a {word}. */\nclass {Word}{n} {{\n"
+        "    public function __construct(private array $values) {{}}\n\n"
+        "    public function get($key) {{\n"
+        "        return $this->values[$key] ?? null;\n    }}\n}}\n",
+    ),
+    "bash": (
+        "#!/bin/bash\nsource ./common.sh\n",
+        "# Adds up {word} values\n{word}_total_{n}() {{\n"
+        '  local total=0\n  for item in "$@"; do\n'
+        "    total=$((total + item))\n  done\n"
+        '  echo "${{total}}"\n}}\n',
+        "# Shows a {word}\nfunction show_{word}_{n} {{\n"
+        '  echo "{word}: $1"\n}}\n',
+    ),
+}
+
+
+def _source_module(rng: random.Random, language: str, number: int, size: int) -> str:
+    header, function, cls = SOURCE_TEMPLATES[language]
+    parts = [header]
+    lines = header.count("\n")
+    while lines < size:
+        word = rng.choice(WORDS)
+        template = cls if rng.random() < 0.25 else function
+        part = template.format(word=word, Word=word.title(), n=f"{number}_{lines}")
+        parts.append(part)
+        lines += part.count("\n") + 1
+    return "\n".join(parts)
+
+
+def _markdown(rng: random.Random, number: int, size: int) -> str:
+    lines = [f"# Notes {number}", ""]
+    while len(lines) < size:
+        lines.append(" ".join(rng.choice(WORDS) for _ in range(12)))
+    return "\n".join(lines) + "\n"
+
+
+def _json(rng: random.Random, size: int) -> str:
+    entries = [
+        f'  "{rng.choice(WORDS)}_{i}": {rng.randint(0, 1000)}' for i in range(size)
+    ]
+    return "{\n" + ",\n".join(entries) + "\n}\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic project")
+    parser.add_argument("output_dir")
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--lines", type=int, default=200)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = generate_repo(
+        args.output_dir, args.files, args.lines, args.mix, args.depth, args.seed
+    )
+    print(f"Generated {len(paths)} files in {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Code Assistant client - Send requests to a running `main.py --daemon`.
+"""
+import os
+import sys
+import json
+import argparse
+from assistant.rpc import RPCClient, RPCError, default_socket_path
+
+
+def main():
+    """Entry point for the daemon client"""
+    parser = argparse.ArgumentParser(
+        description="Query a running Code Assistant daemon"
+    )
+    parser.add_argument(
+        "method",
+        choices=["find", "analyze", "fix", "structure", "ping", "shutdown"],
+        help="Request to send",
+    )
+    parser.add_argument(
+        "argument",
+        nargs="?",
+        help="Query for find, file path for analyze/fix/structure",
+    )
+    parser.add_argument(
+        "--project",
+        default=".",
+        help="Project the daemon serves (default: current directory)",
+    )
+    parser.add_argument("--socket", metavar="PATH", help="Daemon socket to use")
+    parser.add_argument(
+        "--limit", type=int, default=100, help="Maximum matches for find"
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print the raw JSON result"
+    )
+
+    args = parser.parse_args()
+
+    params = {}
+    if args.method == "find":
+        if args.argument is None:
+            parser.error("find needs a query")
+        params = {"query": args.argument, "limit": args.limit}
+    elif args.method in ("analyze", "fix"):
+        if args.argument is None:
+            parser.error(f"{args.method} needs a file path")
+        params = {"path": args.argument}
+    elif args.method == "structure" and args.argument is not None:
+        params = {"path": args.argument}
+
+    socket_path = args.socket or default_socket_path(os.path.abspath(args.project))
+    try:
+        with RPCClient(socket_path) as client:
+            result = client.call(args.method, **params)
+    except OSError as e:
+        print(f"❌ Could not reach the daemon at {socket_path}: {str(e)}")
+        sys.exit(2)
+    except RPCError as e:
+        print(f"❌ {e.message}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    elif args.method == "find":
+        for match in result["matches"]:
+            print(f"{match['path']}:{match['line']}: {match['text']}")
+        if result["truncated"]:
+            print(f"... more than {args.limit} matches")
+    elif "output" in result:
+        print(result["output"], end="")
+        if not result["ok"]:
+            sys.exit(1)
+    else:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ import os
 import sys
 import argparse
 from assistant.code_assistant import CodeAssistant
+from assistant.tools.line_diff import DIFF_ALGORITHMS
 
 
 def main():
@@ -19,6 +20,99 @@ def main():
         default=".",
         help="Target directory to analyze (default: current directory)",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the on-disk index cache and re-read every file",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used for indexing (default: 1, 0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep the index in sync with file changes made outside the assistant",
+    )
+    parser.add_argument(
+        "--lazy-content",
+        action="store_true",
+        help="Read file contents on demand instead of keeping them in memory",
+    )
+    parser.add_argument(
+        "--content-budget",
+        type=int,
+        default=64,
+        metavar="MB",
+        help="Memory for cached file contents with --lazy-content (default: 64)",
+    )
+    parser.add_argument(
+        "--max-file-size",
+        type=int,
+        default=2048,
+        metavar="KB",
+        help="Skip files larger than this when indexing (default: 2048, 0 = no limit)",
+    )
+    parser.add_argument(
+        "--run-timeout",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Kill commands started with run after this many seconds",
+    )
+    parser.add_argument(
+        "--warm-run",
+        action="store_true",
+        help="Serve `run python …` and `run pytest …` from a preloaded interpreter",
+    )
+    parser.add_argument(
+        "--diff-algorithm",
+        choices=sorted(DIFF_ALGORITHMS),
+        default="myers",
+        help="Line diff used to show edits (default: myers)",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Run commands from FILE ('-' for stdin) and print results as JSON lines",
+    )
+    parser.add_argument(
+        "--batch-jobs",
+        type=int,
+        default=4,
+        metavar="N",
+        help="Read-only batch commands run concurrently (default: 4)",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep the index in memory and serve requests from client.py",
+    )
+    parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="Unix socket for --daemon (default: one per project in the cache dir)",
+    )
+    parser.add_argument(
+        "--embedder",
+        default="hashing",
+        metavar="NAME[:MODEL]",
+        help="Vectors for `search`: hashing (default, no model needed) or "
+        "sentence-transformers:<local model>",
+    )
+    parser.add_argument(
+        "--semantic-mmap",
+        action="store_true",
+        help="Keep `search` vectors in a memory-mapped file reused across runs "
+        "(needs NumPy)",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Write a Chrome trace of the session to FILE on exit",
+    )
     parser.add_argument("--version", action="version", version="Code Assistant v0.1.0")
 
     args = parser.parse_args()
@@ -30,8 +124,36 @@ def main():
         sys.exit(1)
 
     # Initialize and run the assistant
-    assistant = CodeAssistant(target_dir)
-    assistant.run()
+    try:
+        assistant = CodeAssistant(
+            target_dir,
+            use_cache=not args.no_cache,
+            workers=args.workers,
+            watch=args.watch,
+            lazy_content=args.lazy_content,
+            content_budget=args.content_budget * 1024 * 1024,
+            max_file_size=args.max_file_size * 1024,
+            run_timeout=args.run_timeout,
+            warm_run=args.warm_run,
+            interactive=args.batch is None and not args.daemon,
+            diff_algorithm=args.diff_algorithm,
+            trace_path=args.trace,
+            embedder=args.embedder,
+            semantic_mmap=args.semantic_mmap,
+        )
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
+
+    if args.daemon:
+        assistant.serve(args.socket)
+    elif args.batch is None:
+        assistant.run()
+    elif args.batch == "-":
+        sys.exit(1 if assistant.run_batch(sys.stdin, args.batch_jobs) else 0)
+    else:
+        with open(args.batch, "r", encoding="utf-8") as f:
+            sys.exit(1 if assistant.run_batch(f, args.batch_jobs) else 0)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,95 @@
+"""
+Anti-pattern rule engine.
+"""
+
+import ast
+
+import pytest
+
+from assistant.tools.antipatterns import Finding, RuleEngine, register_default_rules
+
+
+def _regex_engine(*rules):
+    engine = RuleEngine()
+    for name, pattern in rules:
+        engine.regex_rule(name, pattern, name)
+    return engine
+
+
+def test_overlapping_regex_rules_are_all_reported():
+    engine = _regex_engine(
+        ("print-call", r"^[ \t]*print\("),
+        ("debug-print", r"print\(\s*['\"]debug"),
+        ("multi-line-call", r"call\(\n[^)]*\)"),
+        ("secret", r"password"),
+    )
+    content = 'print("debug", value)\ncall(\n    password\n)\n'
+
+    assert engine.check(content) == [
+        Finding(1, "debug-print", "debug-print"),
+        Finding(1, "print-call", "print-call"),
+        Finding(2, "multi-line-call", "multi-line-call"),
+        Finding(3, "secret", "secret"),
+    ]
+
+
+def test_regex_rule_does_not_match_inside_its_own_match():
+    engine = _regex_engine(("run", r"x+"))
+    assert engine.check("xxx yy x") == [Finding(1, "run", "run")] * 2
+
+
+def test_patterns_that_cannot_be_merged_run_on_their_own():
+    engine = _regex_engine(
+        ("named", r"(?P<word>todo)\b"),
+        ("named-again", r"(?P<word>fixme)"),
+        ("ignore-case", r"(?i)xxx"),
+        ("repeated", r"\b(\w+) \1\b"),
+        ("grouped", r"(a)(b)"),
+    )
+    content = "todo ab\nthe the XXX\nfixme\n"
+
+    assert engine.check(content) == [
+        Finding(1, "grouped", "grouped"),
+        Finding(1, "named", "named"),
+        Finding(2, "ignore-case", "ignore-case"),
+        Finding(2, "repeated", "repeated"),
+        Finding(3, "named-again", "named-again"),
+    ]
+
+
+def test_invalid_pattern_is_rejected_when_registered():
+    with pytest.raises(ValueError, match="Invalid pattern for rule broken"):
+        _regex_engine(("broken", r"(unclosed"))
+
+
+def test_default_rules():
+    engine = RuleEngine()
+    register_default_rules(engine)
+    content = "def f(a=[]):\n    breakpoint()\n    try:\n        pass\n    except:\n"
+    content += "        return a == None; x = 1\n"
+
+    assert [(f.line, f.rule) for f in engine.check(content, ast.parse(content))] == [
+        (1, "mutable-default-argument"),
+        (2, "debugger-call"),
+        (5, "bare-except"),
+        (6, "comparison-to-none"),
+        (6, "statement-semicolon"),
+    ]
+
+
+def test_fingerprint_covers_rule_logic():
+    def engine_with(check, pattern):
+        engine = RuleEngine()
+        engine.ast_rule("rule", ast.Name, "message")(check)
+        engine.regex_rule("regex", pattern, "message")
+        return engine.fingerprint()
+
+    def is_x(node):
+        return node.id == "x"
+
+    def is_y(node):
+        return node.id == "y"
+
+    assert engine_with(is_x, "a") == engine_with(is_x, "a")
+    assert engine_with(is_x, "a") != engine_with(is_y, "a")
+    assert engine_with(is_x, "a") != engine_with(is_x, "b")
@@ -0,0 +1,78 @@
+"""
+Cached pylint results.
+"""
+
+import os
+import subprocess
+
+from assistant.tools.bug_finder import BugFinder
+from assistant.tools.index_cache import content_hash
+from assistant.tools.indexer import ProjectIndexer
+
+SOURCE = "from . import models\n"
+
+
+def test_identical_files_keep_their_own_pylint_messages(tmp_path, monkeypatch):
+    paths = [os.path.join("app", "views.py"), os.path.join("lib", "views.py")]
+    hashes = {path: content_hash(SOURCE) for path in paths}
+    runs = []
+
+    def run_pylint(batch):
+        runs.append(list(batch))
+        messages = {
+            path: [{"line": 1, "message": f"in {path}", "symbol": "import-error"}]
+            for path in batch
+        }
+        return messages, 0.0
+
+    bug_finder = BugFinder(str(tmp_path), workers=1, interactive=False)
+    monkeypatch.setattr(bug_finder, "_run_pylint", run_pylint)
+
+    for _ in range(2):
+        issues = list(bug_finder._lint_project(hashes, "pylint 3.0"))
+        assert [issue["file"] for issue in issues] == paths
+        assert [issue["message"] for issue in issues] == [
+            f"in {path} (import-error)" for path in paths
+        ]
+    # The second scan is answered from the cache
+    assert runs == [paths]
+
+
+def test_changed_import_relints_the_files_importing_it(tmp_path, monkeypatch):
+    (tmp_path / "models.py").write_text("VALUE = 1\n")
+    (tmp_path / "views.py").write_text("from models import VALUE\n")
+    (tmp_path / "other.py").write_text("import json\n")
+    indexer = ProjectIndexer(str(tmp_path), use_cache=False)
+    project_index = indexer.index_project()
+    runs = []
+
+    def run_pylint(batch):
+        runs.append(sorted(batch))
+        return {path: [] for path in batch}, 0.0
+
+    bug_finder = BugFinder(
+        str(tmp_path), workers=1, interactive=False, indexer=indexer
+    )
+    monkeypatch.setattr(bug_finder, "_get_pylint_version", lambda: "pylint 3.0")
+    monkeypatch.setattr(bug_finder, "_run_pylint", run_pylint)
+
+    bug_finder.analyze_project_for_bugs(project_index)
+    bug_finder.analyze_project_for_bugs(project_index)
+    (tmp_path / "models.py").write_text("OTHER = 1\n")
+    bug_finder.analyze_project_for_bugs(project_index)
+
+    assert runs == [["models.py", "other.py", "views.py"], ["models.py", "views.py"]]
+
+
+def test_batched_runs_leave_out_duplicate_code(tmp_path, monkeypatch):
+    commands = []
+
+    def run(command, **kwargs):
+        commands.append(command)
+        return subprocess.CompletedProcess(command, 0, stdout="[]")
+
+    monkeypatch.setattr(subprocess, "run", run)
+    BugFinder(str(tmp_path))._run_pylint(["a.py", "b.py"])
+
+    assert "--disable=duplicate-code" in commands[0]
+    assert commands[0][-2:] == ["a.py", "b.py"]
@@ -0,0 +1,37 @@
+"""
+Shared docstrings of function and class records.
+"""
+
+from assistant.models import code_symbols
+from assistant.models.code_symbols import FunctionInfo, intern_docstring
+from assistant.tools.indexer import ProjectIndexer
+
+
+def _copy(text):
+    return "".join(list(text))
+
+
+def test_identical_docstrings_are_shared():
+    first = FunctionInfo("a", 1, [], _copy("Load the config"))
+    second = FunctionInfo("b", 5, [], _copy("Load the config"))
+    assert first.docstring is second.docstring
+
+
+def test_table_is_bounded(monkeypatch):
+    monkeypatch.setattr(code_symbols, "_docstrings", {})
+    monkeypatch.setattr(code_symbols, "MAX_INTERNED_DOCSTRINGS", 2)
+    kept = [intern_docstring(_copy(text)) for text in ("one", "two", "three")]
+
+    assert list(code_symbols._docstrings) == ["one", "two"]
+    assert intern_docstring(_copy("two")) is kept[1]
+    assert intern_docstring(_copy("three")) is not kept[2]
+
+
+def test_full_index_forgets_earlier_docstrings(tmp_path, monkeypatch):
+    monkeypatch.setattr(code_symbols, "_docstrings", {})
+    (tmp_path / "app.py").write_text('def run():\n    """Run the app"""\n')
+    intern_docstring("Docstring of an edit since undone")
+
+    ProjectIndexer(str(tmp_path), use_cache=False).index_project()
+
+    assert list(code_symbols._docstrings) == ["Run the app"]
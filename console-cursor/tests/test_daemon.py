@@ -0,0 +1,42 @@
+"""
+JSON-RPC requests handled by the daemon, without a socket.
+"""
+
+import json
+import sys
+
+import pytest
+
+from assistant.code_assistant import CodeAssistant
+from assistant.daemon import AssistantDaemon
+from assistant.rpc import INVALID_PARAMS
+from assistant.tools.output_capture import ThreadLocalStdout
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    (tmp_path / "app.py").write_text("def load_config():\n    return {}\n")
+    assistant = CodeAssistant(str(tmp_path), use_cache=False, interactive=False)
+    assistant.prepare_index()
+    socket_path = str(tmp_path / "daemon.sock")
+    yield AssistantDaemon(assistant, socket_path, ThreadLocalStdout(sys.stdout))
+    assistant.executor.shutdown()
+
+
+def _call(daemon, method, **params):
+    request = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+    return daemon.handle_line(json.dumps(request).encode("utf-8"))
+
+
+def test_find(daemon):
+    response = _call(daemon, "find", query="load_config", limit=1)
+    assert response["result"] == {
+        "matches": [{"path": "app.py", "line": 1, "text": "def load_config():"}],
+        "truncated": False,
+    }
+
+
+@pytest.mark.parametrize("limit", [0, -1, "5", 2.5, True])
+def test_find_rejects_invalid_limit(daemon, limit):
+    response = _call(daemon, "find", query="load_config", limit=limit)
+    assert response["error"]["code"] == INVALID_PARAMS
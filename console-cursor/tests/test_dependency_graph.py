@@ -0,0 +1,52 @@
+"""
+Import graph between project files.
+"""
+
+from assistant.tools.dependency_graph import DependencyGraph
+from assistant.tools.indexer import ProjectIndexer
+
+
+def _graph(root, files):
+    for path, content in files.items():
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(content)
+    graph = DependencyGraph()
+    graph.build(ProjectIndexer(str(root), use_cache=False).index_project())
+    return graph
+
+
+def test_relative_imports(tmp_path):
+    graph = _graph(
+        tmp_path,
+        {
+            "pkg/__init__.py": "def helper():\n    pass\n",
+            "pkg/models.py": "x = 1\n",
+            "pkg/views.py": "from . import helper\nfrom .models import x\n",
+            "pkg/sub/api.py": "from .. import models\nfrom ..views import *\n",
+            "main.py": "import pkg\n",
+        },
+    )
+
+    assert graph.dependencies["pkg/views.py"] == {"pkg/__init__.py", "pkg/models.py"}
+    assert graph.dependencies["pkg/sub/api.py"] == {"pkg/models.py", "pkg/views.py"}
+    assert graph.transitive_dependents(["pkg/__init__.py"]) == {
+        "main.py",
+        "pkg/views.py",
+        "pkg/sub/api.py",
+    }
+
+
+def test_invalidation_order_puts_imports_first(tmp_path):
+    graph = _graph(
+        tmp_path,
+        {
+            "base.py": "VALUE = 1\n",
+            "a.py": "import base\nimport b\n",
+            "b.py": "import a\n",
+            "app.py": "import a\n",
+            "unrelated.py": "import os\n",
+        },
+    )
+
+    order = graph.invalidation_order(["base.py"])
+    assert order == ["base.py", "a.py", "b.py", "app.py"]
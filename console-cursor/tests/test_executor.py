@@ -0,0 +1,62 @@
+"""
+Reading command output.
+"""
+
+import asyncio
+import threading
+
+from assistant.tools import executor as executor_module
+from assistant.tools.executor import CommandExecutor
+
+
+def _pump(tmp_path, chunks):
+    async def run():
+        stream = asyncio.StreamReader()
+        for chunk in chunks:
+            stream.feed_data(chunk)
+        stream.feed_eof()
+        lines = []
+        executor = CommandExecutor(str(tmp_path))
+        await executor._pump(stream, "stdout", lambda name, line: lines.append(line))
+        return lines
+
+    return asyncio.run(run())
+
+
+def test_lines_split_across_chunks(tmp_path):
+    chunks = [b"first\r\nsec", b"ond\n", b"\nlast"]
+    assert _pump(tmp_path, chunks) == ["first", "second", "", "last"]
+
+
+def test_long_line_is_truncated(tmp_path, monkeypatch):
+    monkeypatch.setattr(executor_module, "MAX_LINE_BYTES", 8)
+    chunks = [b"short\n0123", b"456789", b"abc\nnext\n", b"x" * 20]
+
+    assert _pump(tmp_path, chunks) == [
+        "short",
+        "01234567 … [5 more bytes]",
+        "next",
+        "xxxxxxxx … [12 more bytes]",
+    ]
+
+
+def test_command_that_cannot_start_ends_its_job(tmp_path, capsys):
+    executor = CommandExecutor(str(tmp_path / "missing"))
+    try:
+        # Run in a thread so a job that never ends fails the test, not hangs it
+        foreground = threading.Thread(
+            target=executor.execute_code, args=("echo hi", 2), daemon=True
+        )
+        foreground.start()
+        foreground.join(10)
+        assert not foreground.is_alive()
+        job = executor.start_background("echo hi")
+        job.future.result(timeout=5)
+    finally:
+        executor.shutdown()
+
+    output = capsys.readouterr().out
+    assert "❌ Command could not be started" in output
+    assert "No such file or directory" in output
+    assert (job.done, job.status, job.returncode) == (True, "failed", None)
+    assert job.output[0][0] == "stderr"
@@ -0,0 +1,47 @@
+"""
+Which files the indexer skips.
+"""
+
+import os
+
+from assistant.tools.ignore_rules import IgnoreRules
+
+
+def _walked(root):
+    return sorted(
+        os.path.relpath(os.path.join(directory, name), root)
+        for directory, files in IgnoreRules(str(root)).walk()
+        for name in files
+    )
+
+
+def _write(root, paths):
+    for path in paths:
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text("x = 1\n")
+
+
+def test_default_directories_are_skipped(tmp_path):
+    _write(tmp_path, ["app.py", "target/out.py", "node_modules/lib.js"])
+    assert _walked(tmp_path) == ["app.py"]
+
+
+def test_ignore_files_can_re_include_default_directories(tmp_path):
+    _write(
+        tmp_path,
+        ["app.py", "target/out.py", "pkg/build/gen.py", ".git/config", "env/x.py"],
+    )
+    (tmp_path / ".gitignore").write_text("!target/\n")
+    (tmp_path / "pkg" / ".gitignore").write_text("!build/\n")
+    (tmp_path / ".assistantignore").write_text("!*/\n")
+
+    assert _walked(tmp_path) == [
+        ".assistantignore",
+        ".gitignore",
+        "app.py",
+        "env/x.py",
+        "pkg/.gitignore",
+        "pkg/build/gen.py",
+        "target/out.py",
+    ]
+    assert IgnoreRules(str(tmp_path)).is_ignored(".git/config")
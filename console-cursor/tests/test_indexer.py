@@ -0,0 +1,171 @@
+"""
+Project indexing.
+"""
+
+import pytest
+
+from assistant.models.file_info import FileInfo
+from assistant.tools import indexer as indexer_module
+from assistant.tools.edits import apply_line_edits
+from assistant.tools.indexer import ProjectIndexer
+from assistant.tools.python_structure import parse_python
+
+MAX_FILE_SIZE = 4096
+
+
+def _write_tree(root):
+    for number in range(12):
+        (root / "pkg").mkdir(exist_ok=True)
+        (root / "pkg" / f"module_{number}.py").write_text(
+            "import os\n"
+            "from . import shared\n\n\n"
+            f"class Model{number}:\n"
+            '    """A model"""\n\n'
+            "    def save(self, path):\n"
+            "        return os.path.join(path, 'x')\n\n\n"
+            f"def helper_{number}(value, *args, **kwargs):\n"
+            '    """Double a value"""\n'
+            "    return value * 2\n"
+        )
+    (root / "broken.py").write_text("def broken(:\n    pass\n")
+    (root / "large.py").write_text("x = 1\n" * MAX_FILE_SIZE)
+    (root / "app.js").write_text(
+        'import { join } from "path";\n\n'
+        "export function start(port) {\n    return port;\n}\n"
+    )
+    (root / "notes.md").write_text("# Notes\n")
+
+
+def _index(root, workers, use_cache):
+    return ProjectIndexer(
+        str(root), use_cache=use_cache, workers=workers, max_file_size=MAX_FILE_SIZE
+    ).index_project()
+
+
+def _fields(file_info):
+    return (
+        file_info.language,
+        file_info.content,
+        file_info.functions,
+        file_info.classes,
+        file_info.imports,
+    )
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+@pytest.mark.parametrize("workers", [2, 3])
+def test_parallel_index_matches_serial(
+    tmp_path, monkeypatch, capsys, workers, use_cache
+):
+    root = tmp_path / "project"
+    root.mkdir()
+    _write_tree(root)
+    monkeypatch.setattr(indexer_module, "PARALLEL_MIN_FILES", 2)
+    monkeypatch.setattr(indexer_module, "INDEX_CHUNK_SIZE", 3)
+    monkeypatch.setattr(indexer_module, "_worker_indexer", None)
+
+    # Each run starts from an empty cache, so both read and parse every file
+    monkeypatch.setenv("CODE_ASSISTANT_CACHE_DIR", str(tmp_path / "serial"))
+    serial = _index(root, 1, use_cache)
+    assert "workers" not in capsys.readouterr().out
+    # The serial path parses with the indexer itself, not worker state
+    assert indexer_module._worker_indexer is None
+    monkeypatch.setenv("CODE_ASSISTANT_CACHE_DIR", str(tmp_path / "parallel"))
+    parallel = _index(root, workers, use_cache)
+    assert f"with {workers} workers" in capsys.readouterr().out
+
+    assert list(parallel) == list(serial)
+    assert "large.py" not in serial
+    assert serial["broken.py"].functions == []
+    assert serial["pkg/module_0.py"].classes[0].methods[0].name == "save"
+    for path, file_info in serial.items():
+        assert _fields(parallel[path]) == _fields(file_info), path
+
+
+DECORATED_SOURCE = """\
+import os
+
+
+@register
+
+# Handles one event
+def handler(event):
+    return event
+
+
+@route(
+    "/users",
+    methods=["GET"],
+)
+def users():
+    return []
+
+
+class Service:
+    @property
+    def name(self):
+        return "service"
+
+
+@cached
+# Spelled out
+@retry(
+    times=3,
+)
+def fetch(url):
+    return os.path.basename(url)
+"""
+
+
+def _line(source, text):
+    return source.split("\n").index(text)
+
+
+# (description, [(old line text, lines replacing it)])
+EDITS = [
+    (
+        "body of a function decorated across a comment",
+        [("    return event", ["    return [event]"])],
+    ),
+    (
+        "body of a function with a multi-line decorator",
+        [("    return []", ["    users = []", "    return users"])],
+    ),
+    ("argument of a multi-line decorator", [('    "/users",', ['    "/people",'])]),
+    ("decorator separated by a blank line", [("@register", ["@handles"])]),
+    ("decorator removed before a comment", [("@cached", [])]),
+    (
+        "bodies of two blocks",
+        [
+            ("    return event", ["    return None"]),
+            ('        return "service"', ['        return "other"']),
+        ],
+    ),
+    (
+        "decorator added to a method",
+        [("    @property", ["    @property", "    @cached"])],
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "replacements", [edit for _, edit in EDITS], ids=[name for name, _ in EDITS]
+)
+def test_apply_edit_matches_full_parse(tmp_path, replacements):
+    indexer = ProjectIndexer(str(tmp_path), use_cache=False)
+    file_info = FileInfo("app.py", content=DECORATED_SOURCE, language="python")
+    indexer.extract_structure(file_info)
+    old_lines = DECORATED_SOURCE.split("\n")
+    edits = [
+        (_line(DECORATED_SOURCE, text), 1, replacement)
+        for text, replacement in replacements
+    ]
+    new_lines, hunks = apply_line_edits(old_lines, edits)
+    content = "\n".join(new_lines)
+
+    indexer.apply_edit(file_info, content, old_lines, new_lines, hunks)
+
+    expected = parse_python(content).structure
+    assert file_info.functions == expected.functions
+    assert file_info.classes == expected.classes
+    assert file_info.imports == expected.imports
@@ -0,0 +1,447 @@
+"""
+Outline parsers on realistic multi-function files, one per registered language.
+"""
+
+import pytest
+
+from assistant.tools.language_parsers import LANGUAGE_PARSERS
+
+C_SOURCE = """\
+#include <stdio.h>
+#include <stdlib.h>
+#include "list.h"
+
+/* A node of the list */
+struct node {
+    int value;
+    struct node *next;
+};
+
+/* Allocate an empty list */
+struct list *list_new(void)
+{
+    return calloc(1, sizeof(struct list));
+}
+
+static void list_free(struct list *list)
+{
+    free(list);
+}
+
+// Sum of two numbers
+static inline int add(int a, int b) {
+    return a + b;
+}
+
+unsigned long
+hash_string(const char *text, size_t length)
+{
+    return 0;
+}
+
+int main(int argc, char **argv) {
+    if (argc > 1) {
+        printf("%d\\n", add(1, 2));
+    }
+    return 0;
+}
+"""
+
+CPP_SOURCE = """\
+#include <string>
+#include <vector>
+#include "shape.hpp"
+
+namespace geometry {
+
+/// A shape with an area
+class Shape {
+public:
+    virtual ~Shape();
+    virtual double area() const = 0;
+    std::string name() const;
+};
+
+double Circle::area() const {
+    return 3.14 * radius * radius;
+}
+
+std::vector<int> collect(const std::vector<int>& items, int limit)
+{
+    return items;
+}
+
+}  // namespace geometry
+
+int main() {
+    return 0;
+}
+"""
+
+JAVASCRIPT_SOURCE = """\
+import { readFile } from "fs/promises";
+import config from "./config.js";
+const path = require("path");
+
+/**
+ * Load a JSON file.
+ */
+export async function loadJson(file, encoding = "utf8") {
+    return JSON.parse(await readFile(file, encoding));
+}
+
+const double = (value) => value * 2;
+
+export class Cache {
+    constructor(limit) {
+        this.limit = limit;
+    }
+
+    get(key) {
+        return this.items[key];
+    }
+
+    static create() {
+        return new Cache(10);
+    }
+}
+
+function helper() {
+    return "{";
+}
+"""
+
+TYPESCRIPT_SOURCE = """\
+import { Request, Response } from "express";
+import { User } from "./models/user";
+
+export interface Repository {
+    find(id: string): Promise<User>;
+}
+
+export class UserService {
+    constructor(private readonly repository: Repository) {}
+
+    async getUser(id: string): Promise<User> {
+        return this.repository.find(id);
+    }
+
+    private format(user: User): string {
+        return user.name;
+    }
+}
+
+export function handler(request: Request, response: Response): void {
+    response.send("ok");
+}
+
+export const parseId = (raw: string): number => parseInt(raw, 10);
+"""
+
+GO_SOURCE = """\
+package store
+
+import (
+    "fmt"
+    "strings"
+
+    "example.com/app/internal/cache"
+)
+
+// Store keeps items in memory.
+type Store struct {
+    items map[string]string
+}
+
+// NewStore returns an empty store.
+func NewStore() *Store {
+    return &Store{items: map[string]string{}}
+}
+
+// Get returns the item for key.
+func (s *Store) Get(key string) (string, bool) {
+    value, ok := s.items[key]
+    return value, ok
+}
+
+func (s Store) Len() int {
+    return len(s.items)
+}
+
+func normalize(key string) string {
+    return strings.ToLower(fmt.Sprint(key))
+}
+"""
+
+JAVA_SOURCE = """\
+package com.example.app;
+
+import java.util.List;
+import java.util.Map;
+import com.example.app.model.*;
+
+/**
+ * Keeps track of users.
+ */
+public class UserRegistry {
+    private final Map<String, User> users;
+
+    public UserRegistry(Map<String, User> users) {
+        this.users = users;
+    }
+
+    /** Find a user by name. */
+    public User find(String name) {
+        return users.get(name);
+    }
+
+    @Override
+    public String toString() { return "UserRegistry"; }
+
+    private static List<User> sorted(List<User> input, int limit) throws Exception {
+        return input;
+    }
+}
+"""
+
+RUST_SOURCE = """\
+use std::collections::HashMap;
+use crate::config::Settings;
+mod parser;
+
+/// An in-memory key-value store.
+pub struct Store {
+    items: HashMap<String, String>,
+}
+
+impl Store {
+    /// Create an empty store.
+    pub fn new() -> Self {
+        Store { items: HashMap::new() }
+    }
+
+    pub fn get(&self, key: &str) -> Option<&String> {
+        self.items.get(key)
+    }
+}
+
+#[derive(Debug)]
+pub enum Command {
+    Get(String),
+    Set(String, String),
+}
+
+pub fn run(settings: &Settings, command: Command) -> Result<(), String> {
+    Ok(())
+}
+
+fn helper() {}
+"""
+
+PHP_SOURCE = """\
+<?php
+namespace App\\Http;
+
+use App\\Models\\User;
+require_once 'config.php';
+
+/**
+ * Handles user requests.
+ */
+class UserController
+{
+    public function show($id)
+    {
+        return User::find($id);
+    }
+
+    private static function format(User $user, $verbose = false)
+    {
+        return $user->name;
+    }
+}
+
+function helper($value)
+{
+    return $value;
+}
+"""
+
+RUBY_SOURCE = """\
+require 'json'
+require_relative 'lib/cache'
+
+# Keeps users in memory
+class UserStore
+  def initialize(limit = 10)
+    @limit = limit
+  end
+
+  # Find a user
+  def find(name)
+    @users.each do |user|
+      return user if user.name == name
+    end
+  end
+
+  def self.build
+    new
+  end
+end
+
+module Helpers
+  def format(value)
+    value.to_s
+  end
+end
+
+def main(args)
+  UserStore.build
+end
+"""
+
+BASH_SOURCE = """\
+#!/usr/bin/env bash
+source ./lib/common.sh
+. "$HOME/.profile"
+
+# Print usage
+usage() {
+    echo "usage: $0 [build|test]"
+}
+
+function build {
+    make all
+}
+
+run_tests() {
+    if [ -n "$1" ]; then
+        pytest "$1"
+    fi
+}
+
+main() {
+    case "$1" in
+        build) build ;;
+        *) usage ;;
+    esac
+}
+
+main "$@"
+"""
+
+# language: (source, functions and methods in file order, {class: methods},
+# imports)
+CASES = {
+    "c": (
+        C_SOURCE,
+        ["list_new", "list_free", "add", "hash_string", "main"],
+        {"node": []},
+        ["include stdio.h", "include stdlib.h", "include list.h"],
+    ),
+    "cpp": (
+        CPP_SOURCE,
+        ["~Shape", "area", "name", "area", "collect", "main"],
+        {"Shape": ["~Shape", "area", "name"]},
+        ["include string", "include vector", "include shape.hpp"],
+    ),
+    "javascript": (
+        JAVASCRIPT_SOURCE,
+        ["loadJson", "double", "constructor", "get", "create", "helper"],
+        {"Cache": ["constructor", "get", "create"]},
+        ["import fs/promises", "import ./config.js", "import path"],
+    ),
+    "typescript": (
+        TYPESCRIPT_SOURCE,
+        ["find", "constructor", "getUser", "format", "handler", "parseId"],
+        {
+            "Repository": ["find"],
+            "UserService": ["constructor", "getUser", "format"],
+        },
+        ["import express", "import ./models/user"],
+    ),
+    "go": (
+        GO_SOURCE,
+        ["NewStore", "Get", "Len", "normalize"],
+        {"Store": ["Get", "Len"]},
+        ["import fmt", "import strings", "import example.com/app/internal/cache"],
+    ),
+    "java": (
+        JAVA_SOURCE,
+        ["UserRegistry", "find", "toString", "sorted"],
+        {"UserRegistry": ["UserRegistry", "find", "toString", "sorted"]},
+        [
+            "import java.util.List",
+            "import java.util.Map",
+            "import com.example.app.model.*",
+        ],
+    ),
+    "rust": (
+        RUST_SOURCE,
+        ["new", "get", "run", "helper"],
+        {"Store": ["new", "get"], "Command": []},
+        ["use std::collections::HashMap", "use crate::config::Settings", "mod parser"],
+    ),
+    "php": (
+        PHP_SOURCE,
+        ["show", "format", "helper"],
+        {"UserController": ["show", "format"]},
+        ["use App\\Models\\User", "require config.php"],
+    ),
+    "ruby": (
+        RUBY_SOURCE,
+        ["initialize", "find", "build", "format", "main"],
+        {"UserStore": ["initialize", "find", "build"], "Helpers": ["format"]},
+        ["require json", "require lib/cache"],
+    ),
+    "bash": (
+        BASH_SOURCE,
+        ["usage", "build", "run_tests", "main"],
+        {},
+        ["source ./lib/common.sh", "source $HOME/.profile"],
+    ),
+}
+
+
+def test_every_registered_language_has_a_case():
+    assert set(LANGUAGE_PARSERS) == set(CASES)
+
+
+@pytest.mark.parametrize("language", sorted(CASES))
+def test_outline(language):
+    source, functions, classes, imports = CASES[language]
+    outline = LANGUAGE_PARSERS[language](source)
+
+    assert [f.name for f in outline.functions] == functions
+    assert {c.name: [m.name for m in c.methods] for c in outline.classes} == classes
+    assert sorted(outline.imports) == sorted(imports)
+
+
+@pytest.mark.parametrize("language", sorted(CASES))
+def test_outline_lines_point_at_declarations(language):
+    source, _, _, _ = CASES[language]
+    lines = source.split("\n")
+    outline = LANGUAGE_PARSERS[language](source)
+    symbols = [*outline.functions, *outline.classes]
+    symbols += [m for c in outline.classes for m in c.methods]
+    for symbol in symbols:
+        assert symbol.name.lstrip("~") in lines[symbol.line - 1], symbol
+
+
+def test_c_definition_after_blank_line():
+    outline = LANGUAGE_PARSERS["c"](
+        "#include <stdio.h>\n\nstatic int add(int a, int b) {\n    return a + b;\n}\n"
+    )
+    assert [(f.name, f.line, f.args) for f in outline.functions] == [
+        ("add", 3, ("a", "b"))
+    ]
+
+
+def test_doc_comments():
+    outline = LANGUAGE_PARSERS["c"](C_SOURCE)
+    docs = {f.name: f.docstring for f in outline.functions}
+    assert docs["list_new"] == "Allocate an empty list"
+    assert docs["add"] == "Sum of two numbers"
+
+    go = LANGUAGE_PARSERS["go"](GO_SOURCE)
+    assert go.classes[0].methods[0].docstring == "Get returns the item for key."
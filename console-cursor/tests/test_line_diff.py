@@ -0,0 +1,94 @@
+"""
+Line diffs.
+"""
+
+import random
+
+import pytest
+
+from assistant.tools import line_diff
+from assistant.tools.edits import LineEdit, apply_line_edits
+from assistant.tools.line_diff import DIFF_ALGORITHMS, diff_lines, refine_hunks
+
+
+def _apply(old_lines, new_lines, hunks):
+    edits = [
+        (hunk.old_start, hunk.old_count, new_lines[hunk.new_start :][: hunk.new_count])
+        for hunk in hunks
+    ]
+    return apply_line_edits(old_lines, edits)[0]
+
+
+def _changed_lines(old_lines, new_lines):
+    """Lines deleted plus lines inserted by a minimal diff"""
+    lengths = [[0] * (len(new_lines) + 1) for _ in range(len(old_lines) + 1)]
+    for i, old in enumerate(old_lines):
+        for j, new in enumerate(new_lines):
+            if old == new:
+                lengths[i + 1][j + 1] = lengths[i][j] + 1
+            else:
+                lengths[i + 1][j + 1] = max(lengths[i][j + 1], lengths[i + 1][j])
+    return len(old_lines) + len(new_lines) - 2 * lengths[-1][-1]
+
+
+def _random_pair(rng):
+    old_lines = [rng.choice("abcdef") for _ in range(rng.randint(0, 30))]
+    new_lines = list(old_lines)
+    for _ in range(rng.randint(0, 6)):
+        position = rng.randint(0, len(new_lines))
+        if new_lines and rng.random() < 0.5:
+            del new_lines[position:][: rng.randint(1, 3)]
+        else:
+            inserted = rng.choices("abcdefxyz", k=rng.randint(1, 3))
+            new_lines[position:position] = inserted
+    return old_lines, new_lines
+
+
+@pytest.mark.parametrize("algorithm", sorted(DIFF_ALGORITHMS))
+def test_applying_the_diff_reproduces_the_new_lines(algorithm):
+    rng = random.Random(7)
+    for _ in range(300):
+        old_lines, new_lines = _random_pair(rng)
+        hunks = list(diff_lines(old_lines, new_lines, algorithm))
+
+        assert _apply(old_lines, new_lines, hunks) == new_lines
+        for hunk in hunks:
+            # Each line counts with its newline
+            removed = old_lines[hunk.old_start :][: hunk.old_count]
+            added = new_lines[hunk.new_start :][: hunk.new_count]
+            delta = sum(len(line) + 1 for line in added)
+            assert hunk.char_delta == delta - sum(len(line) + 1 for line in removed)
+
+
+def test_myers_diff_is_minimal():
+    rng = random.Random(11)
+    for _ in range(300):
+        old_lines, new_lines = _random_pair(rng)
+        hunks = list(diff_lines(old_lines, new_lines, "myers"))
+        changed = sum(hunk.old_count + hunk.new_count for hunk in hunks)
+        assert changed == _changed_lines(old_lines, new_lines)
+
+
+def test_diff_beyond_the_cost_limit_is_still_correct(monkeypatch):
+    monkeypatch.setattr(line_diff, "MYERS_MAX_COST", 2)
+    rng = random.Random(3)
+    for _ in range(100):
+        old_lines, new_lines = _random_pair(rng)
+        hunks = list(diff_lines(old_lines, new_lines, "myers"))
+        assert _apply(old_lines, new_lines, hunks) == new_lines
+
+
+@pytest.mark.parametrize("algorithm", sorted(DIFF_ALGORITHMS))
+def test_refined_hunks_reproduce_the_new_lines(algorithm):
+    old_lines = ["keep", "a", "b", "c", "keep", "d", "e"]
+    new_lines = ["keep", "a", "x", "c", "keep", "e", "f"]
+    coarse = [LineEdit(1, 3, 1, 3, 0), LineEdit(5, 2, 5, 2, 0)]
+
+    hunks = list(refine_hunks(old_lines, new_lines, coarse, algorithm))
+
+    assert [(hunk.old_start, hunk.old_count) for hunk in hunks] == [
+        (2, 1),
+        (5, 1),
+        (7, 0),
+    ]
+    assert _apply(old_lines, new_lines, hunks) == new_lines
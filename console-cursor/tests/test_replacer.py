@@ -0,0 +1,143 @@
+"""
+Project-wide regex replace and symbol rename.
+"""
+
+import os
+
+import pytest
+
+from assistant.code_assistant import CodeAssistant
+
+
+@pytest.fixture
+def project(tmp_path):
+    assistants = []
+
+    def build(files):
+        for path, content in files.items():
+            (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / path).write_text(content)
+        assistant = CodeAssistant(str(tmp_path), use_cache=False, interactive=False)
+        assistant.prepare_index()
+        assistants.append(assistant)
+        return assistant
+
+    yield build
+    for assistant in assistants:
+        assistant.executor.shutdown()
+
+
+def _replace(assistant, arguments):
+    assistant.replacer.replace(arguments, assistant.project_index)
+
+
+def _read(assistant, path):
+    with open(os.path.join(assistant.target_dir, path)) as f:
+        return f.read()
+
+
+def test_regex_replace_previews_and_writes(project, capsys):
+    assistant = project(
+        {"a.py": "x = old_value(1)\n", "notes.md": "old_value and old_value\n"}
+    )
+    _replace(assistant, r"/old_(\w+)/ new_\1")
+
+    output = capsys.readouterr().out
+    assert "Found 3 occurrences in 2 files" in output
+    assert "-x = old_value(1)" in output and "+x = new_value(1)" in output
+    assert _read(assistant, "a.py") == "x = new_value(1)\n"
+    assert _read(assistant, "notes.md") == "new_value and new_value\n"
+
+
+def test_rename_leaves_attributes_keywords_and_locals(project):
+    assistant = project(
+        {
+            "app.py": (
+                "name = 'app'\n\n\n"
+                "def load(obj, f):\n"
+                "    return obj.name + f(name=1) + name\n\n\n"
+                "def local():\n"
+                "    name = 2\n"
+                "    return name\n"
+            )
+        }
+    )
+    _replace(assistant, "name title")
+
+    assert _read(assistant, "app.py") == (
+        "title = 'app'\n\n\n"
+        "def load(obj, f):\n"
+        "    return obj.name + f(name=1) + title\n\n\n"
+        "def local():\n"
+        "    name = 2\n"
+        "    return name\n"
+    )
+
+
+def test_rename_follows_imports_across_files(project, capsys):
+    assistant = project(
+        {
+            "pkg/__init__.py": "from .io import *\n",
+            "pkg/io.py": "def load(path):\n    return path\n",
+            "main.py": (
+                "import pkg.io\n"
+                "from pkg import load\n"
+                "from pkg.io import load as read\n"
+                "from json import load as json_load\n\n"
+                "load('a')\nread('b')\npkg.io.load('c')\n"
+            ),
+            "other.py": "from json import load\n\nload('d')\n",
+        }
+    )
+    _replace(assistant, "load fetch")
+
+    assert "Found 5 occurrences in 2 files" in capsys.readouterr().out
+    assert _read(assistant, "pkg/io.py") == "def fetch(path):\n    return path\n"
+    assert _read(assistant, "main.py") == (
+        "import pkg.io\n"
+        "from pkg import fetch\n"
+        "from pkg.io import fetch as read\n"
+        "from json import load as json_load\n\n"
+        "fetch('a')\nread('b')\npkg.io.fetch('c')\n"
+    )
+    assert _read(assistant, "other.py") == "from json import load\n\nload('d')\n"
+    assert "def fetch(path)" in assistant.project_index["pkg/io.py"].content
+
+
+def test_failed_write_leaves_every_file_unchanged(project, monkeypatch, capsys):
+    assistant = project({"a.py": "old = 1\n", "b.py": "old = 2\n"})
+    failing_path = os.path.join(assistant.target_dir, "b.py")
+    replace = os.replace
+
+    def replace_failing_b(src, dst):
+        if dst == failing_path:
+            raise OSError("disk full")
+        replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", replace_failing_b)
+    _replace(assistant, "/old/ new")
+
+    assert "Error writing files, nothing was replaced: disk full" in (
+        capsys.readouterr().out
+    )
+    assert _read(assistant, "a.py") == "old = 1\n"
+    assert _read(assistant, "b.py") == "old = 2\n"
+    assert sorted(os.listdir(assistant.target_dir)) == ["a.py", "b.py"]
+
+
+def test_file_changed_on_disk_is_not_overwritten(project, monkeypatch, capsys):
+    assistant = project({"a.py": "old = 1\n", "b.py": "old = 2\n"})
+    compute = assistant.replacer._compute
+
+    def compute_then_edit(tasks):
+        results = compute(tasks)
+        with open(os.path.join(assistant.target_dir, "b.py"), "w") as f:
+            f.write("old = 3\n")
+        return results
+
+    monkeypatch.setattr(assistant.replacer, "_compute", compute_then_edit)
+    _replace(assistant, "/old/ new")
+
+    assert "b.py changed on disk, nothing was replaced" in capsys.readouterr().out
+    assert _read(assistant, "a.py") == "old = 1\n"
+    assert _read(assistant, "b.py") == "old = 3\n"
@@ -0,0 +1,48 @@
+"""
+Memory-mapped semantic index stored between sessions.
+"""
+
+import pytest
+
+from assistant.models.code_symbols import FunctionInfo
+from assistant.models.file_info import FileInfo
+from assistant.tools.semantic_index import SemanticIndex
+
+pytest.importorskip("numpy")
+
+
+def _file(docstring):
+    function = FunctionInfo("load_config", 1, ["path"], docstring)
+    return FileInfo("settings.py", language="python", functions=[function])
+
+
+def _session(tmp_path):
+    return SemanticIndex(str(tmp_path / "project"), mmap=True, cache_dir=str(tmp_path))
+
+
+def test_edit_without_save_is_not_loaded_as_current(tmp_path):
+    original = {"settings.py": _file("Load config from a file")}
+    first = _session(tmp_path)
+    first.build(original)
+    # Edited and reverted within a session that ends before storing
+    first.update_file(_file("Read settings"))
+
+    second = _session(tmp_path)
+    second.build(original)
+    assert [symbol[3] for _, symbol in second.search("load config")] == [
+        "load_config"
+    ]
+
+
+def test_save_if_changed_stores_incremental_updates(tmp_path):
+    first = _session(tmp_path)
+    first.build({"settings.py": _file("Load config from a file")})
+    first.update_file(_file("Read settings"))
+    first.save_if_changed()
+
+    second = _session(tmp_path)
+    assert second._load()
+    second.ready = True
+    assert [symbol[4] for _, symbol in second.search("read settings")] == [
+        "Read settings"
+    ]
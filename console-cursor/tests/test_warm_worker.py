@@ -0,0 +1,59 @@
+"""
+Which commands the warm worker serves.
+"""
+
+import os
+import sys
+
+import pytest
+
+from assistant.tools.warm_worker import parse_command
+
+
+@pytest.fixture
+def interpreter(tmp_path, monkeypatch):
+    """A bin directory holding the running interpreter, first on PATH"""
+    real = os.path.realpath(sys.executable)
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for name in ("python", "python3"):
+        (bin_dir / name).symlink_to(real)
+    monkeypatch.setattr(sys, "executable", str(bin_dir / "python3"))
+    monkeypatch.setenv("PATH", str(bin_dir))
+    return bin_dir
+
+
+def _script(path, shebang):
+    path.write_text(f"#!{shebang}\nimport pytest\n")
+    path.chmod(0o755)
+
+
+def test_commands_run_by_this_interpreter_are_warm(tmp_path, interpreter):
+    _script(interpreter / "pytest", interpreter / "python")
+
+    assert parse_command("python app.py --fast", str(tmp_path)) == (
+        "script",
+        ["app.py", "--fast"],
+    )
+    assert parse_command("python3 -m pytest -x", str(tmp_path)) == ("pytest", ["-x"])
+    assert parse_command("pytest -q", str(tmp_path)) == ("pytest", ["-q"])
+    assert parse_command("bin/python -m http.server", str(tmp_path)) == (
+        "module",
+        ["http.server"],
+    )
+    assert parse_command("python app.py | cat", str(tmp_path)) is None
+
+
+def test_other_interpreters_run_in_a_shell(tmp_path, interpreter, monkeypatch):
+    # A virtualenv links to the same binary but has its own packages
+    venv = tmp_path / "venv" / "bin"
+    venv.mkdir(parents=True)
+    (venv / "python").symlink_to(os.path.realpath(sys.executable))
+    _script(interpreter / "pytest", venv / "python")
+
+    assert parse_command("venv/bin/python app.py", str(tmp_path)) is None
+    assert parse_command("pytest -q", str(tmp_path)) is None
+
+    monkeypatch.setenv("PATH", str(venv))
+    assert parse_command("python app.py", str(tmp_path)) is None
+    assert parse_command("python3 app.py", str(tmp_path)) is None